@@ -1,18 +1,43 @@
 # api.py
-from fastapi import FastAPI, HTTPException, Body, Request, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Body, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
-import sys
+import time
 import asyncio
-from notion_client import Client as NotionClient
-from typing import List, Dict
+import functools
+from typing import TYPE_CHECKING, List, Dict, Optional
 from collections import defaultdict
-from neo4j import AsyncGraphDatabase
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pymongo import ReplaceOne, DeleteOne
+from pymongo.errors import PyMongoError
+
+from areas_cache import AreasTreeCache, etag_matches
+from graph_access import GraphAccess, GraphBusy, create_driver, is_read_only
+from graph_cache import QueryCache, bump_graph_version, params_key, read_graph_version
+from graph_edges import EDGE_BATCH_CHUNK_SIZE, EDGE_BATCH_MAX_ITEMS, REL_TYPE, resolve_labels, upsert_edges
+from graph_queries import load_registry
+from instrumentation import CONTENT_TYPE, counter, get_logger, histogram, render, timed
+from mirror_scheduler import MIRROR_LEASE_ID, MirrorScheduler
+from notion_databases import NotionDatabase, by_notion_id, load_databases
+from page_sync import PAGE_EVENTS, PageSyncQueue, classify_event
+from hierarchy import build_relation_hierarchy, normalize_page, read_normalized_pages
+from tree_encoding import dumps, iter_ndjson
+
+if TYPE_CHECKING:
+    from notion_source import NotionSource
 
 app = FastAPI()
 
+log = get_logger("api")
+
+MIRROR_SECONDS = histogram("notion_mirror_seconds", "Duration of Notion → Mongo mirror runs")
+MIRROR_RUNS = counter("notion_mirror_runs_total", "Mirror runs, by database, mode and outcome", ["database", "mode", "outcome"])
+MIRROR_PAGES = counter(
+    "notion_mirror_pages_total", "Pages written to Mongo by the mirror, by database and operation", ["database", "mode", "op"]
+)
+GRAPH_REQUEST_SECONDS = histogram("api_graph_request_seconds", "Latency of the /graph endpoints", ["endpoint"])
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -25,63 +50,255 @@ app.add_middleware(
 # MongoDB Configuration
 MONGO_DETAILS = os.environ.get("MONGO_DETAILS", "mongodb://localhost:27017")
 DATABASE_NAME = "areas_db"
-COLLECTION_NAME = "areas"
+# Mirrored Notion databases, each into its own collection (NOTION_DATABASES,
+# see notion_databases.py). The first, primary one backs /areas-structured.
+NOTION_DATABASES = load_databases()
+COLLECTION_NAME = NOTION_DATABASES[0].collection if NOTION_DATABASES else "areas"
+# Databases mirrored at the same time; all of them share one Notion client
+# and so one rate limiter.
+NOTION_MIRROR_CONCURRENCY = int(os.environ.get("NOTION_MIRROR_CONCURRENCY", "4"))
+SYNC_STATE_COLLECTION = "sync_state"  # bookkeeping docs (mirror high-water mark, …)
+MIRROR_STATE_ID = "notion_mirror"
+# Pages deleted by webhook page events, shared by every API process:
+# {"database": <key>, "page_id": ..., "deleted_at": <epoch s>}. A full mirror
+# re-applies the ones recorded since it started (less TOMBSTONE_SLACK_SECONDS
+# for clock skew between hosts) and then drops the older ones.
+TOMBSTONE_COLLECTION = "page_tombstones"
+TOMBSTONE_SLACK_SECONDS = float(os.environ.get("TOMBSTONE_SLACK_SECONDS", "60"))
+
+# Notion → Mongo mirror mode: "incremental" only pulls pages edited since the
+# last run, "full" re-mirrors the whole database every time.
+NOTION_MIRROR_MODE = os.environ.get("NOTION_MIRROR_MODE", "incremental")
+# Incremental runs still fall back to a full reconciliation at least this often
+# (seconds); that is also what removes pages deleted outright in Notion. Each
+# API process also requests one on this interval, since webhook edits are
+# otherwise applied page by page.
+NOTION_FULL_RECONCILE_SECONDS = float(os.environ.get("NOTION_FULL_RECONCILE_SECONDS", "21600"))
 
 # Neo4j Configuration (fail fast if missing)
 NEO4J_URI = os.environ["NEO4J_URI"]
 NEO4J_USER = os.environ["NEO4J_USER"]
 NEO4J_PASSWORD = os.environ["NEO4J_PASSWORD"]
 
+# Seconds /readyz waits for MongoDB to answer.
+READINESS_TIMEOUT = float(os.environ.get("READINESS_TIMEOUT", "2"))
+
+# Seconds a graph read waits for the graph version in Mongo before it skips
+# the query cache and goes straight to Neo4j.
+GRAPH_VERSION_TIMEOUT = float(os.environ.get("GRAPH_VERSION_TIMEOUT", "0.5"))
+
 @app.on_event("startup")
 async def startup_db_client():
     app.mongodb_client = AsyncIOMotorClient(MONGO_DETAILS)
     app.mongodb = app.mongodb_client[DATABASE_NAME]
-    print("Connected to MongoDB")
+    log.info("Connected to MongoDB")
+
+@app.on_event("startup")
+async def startup_areas_cache():
+    app.areas_cache = AreasTreeCache(_load_areas_tree)
+    # Serve the on-disk copy (AREAS_SNAPSHOT_PATH) right away, if there is
+    # one, and build the tree in the background either way so the first
+    # /areas-structured request after a cold start rarely waits for Mongo.
+    app.areas_cache.load_snapshot()
+    app.areas_cache.schedule_refresh()
+    app.areas_watch_task = asyncio.create_task(_watch_areas_for_cache())
+
+@app.on_event("startup")
+async def startup_mirror_scheduler():
+    # One mirror per Notion database at a time, across every worker sharing
+    # this Mongo database; different Notion databases mirror side by side.
+    app.mirror_schedulers = {
+        db.key: MirrorScheduler(
+            functools.partial(_mirror_database, db),
+            app.mongodb[SYNC_STATE_COLLECTION],
+            lease_id=db.state_id(MIRROR_LEASE_ID),
+        )
+        for db in NOTION_DATABASES
+    }
+    app.page_sync = PageSyncQueue(_sync_pages)
+    app.reconcile_task = asyncio.create_task(_schedule_reconciles())
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    app.areas_watch_task.cancel()
+    app.reconcile_task.cancel()
+    await app.page_sync.close()
+    for scheduler in app.mirror_schedulers.values():
+        await scheduler.close()
     app.mongodb_client.close()
-    print("Disconnected from MongoDB")
+    log.info("Disconnected from MongoDB")
 
 @app.on_event("startup")
-async def startup_neo4j():
-    app.neo4j_driver = AsyncGraphDatabase.driver(
-        NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD)
-    )
-    print("Connected to Neo4j")
+async def startup_graph():
+    # The Neo4j driver itself is created on first use (see _graph).
+    app.graph = None
+    app.graph_cache = QueryCache()
+    app.graph_queries = load_registry()
+
+@app.on_event("shutdown")
+async def shutdown_notion():
+    if getattr(app, "notion_source", None):
+        await app.notion_source.aclose()
 
 @app.on_event("shutdown")
 async def shutdown_neo4j():
-    await app.neo4j_driver.close()
-    print("Disconnected from Neo4j")
+    if getattr(app, "graph", None) is not None:
+        await app.graph.close()
+        log.info("Disconnected from Neo4j")
+
+def _graph() -> GraphAccess:
+    """The Neo4j access layer, created (and ``neo4j`` imported) on first use."""
+    if getattr(app, "graph", None) is None:
+        app.graph = GraphAccess(create_driver(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD))
+        log.info("Created Neo4j driver")
+    return app.graph
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Areas of Human Existence API - Structured Version"}
 
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the process is up and serving; touches no backend."""
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: /areas-structured can be served, because MongoDB answers a
+    ping or a copy of the tree (possibly from the on-disk snapshot) is held.
+
+    Neo4j is not probed; its driver is only created by the first /graph call.
+    """
+    try:
+        await asyncio.wait_for(app.mongodb.command("ping"), READINESS_TIMEOUT)
+        mongo = "ok"
+    except Exception as exc:
+        mongo = str(exc) or type(exc).__name__
+    cache = app.areas_cache
+    body = {
+        "status": "ok" if mongo == "ok" or cache.body is not None else "unavailable",
+        "mongo": mongo,
+        "areas_cache": "empty" if cache.body is None else "snapshot" if cache.from_snapshot else
+                       "stale" if cache.stale else "warm",
+        "neo4j": "connected" if getattr(app, "graph", None) is not None else "idle",
+    }
+    return JSONResponse(body, status_code=200 if body["status"] == "ok" else 503)
+
 @app.get("/areas-structured")
-async def get_areas_structured():
-    """Return hierarchy using 'Sub-item' relation property, excluding sub-areas."""
-    collection = app.mongodb[COLLECTION_NAME]
-    pages = [p async for p in collection.find({})]
-    return _build_relation_hierarchy(pages)
+async def get_areas_structured(request: Request, format: str = Query("json", pattern="^(json|ndjson)$")):
+    """Return hierarchy using 'Sub-item' relation property, excluding sub-areas.
+
+    Served from the materialized cache; honours If-None-Match with a 304.
+    ``format=ndjson`` streams one flat row per node instead (``id, parent_id,
+    depth, Name, Symbol, Category``), depth-first with parents first.
+
+    A copy not confirmed against Mongo (the startup snapshot, or the last
+    good copy while Mongo is unreachable) carries ``X-Areas-Stale``, its age
+    in seconds.
+    """
+    cache = await app.areas_cache.get()
+    etag = cache.etag if format == "json" else cache.etag[:-1] + '-ndjson"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if cache.stale_for is not None:
+        headers["X-Areas-Stale"] = str(int(cache.stale_for))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if format == "ndjson":
+        return StreamingResponse(iter_ndjson(cache.tree), media_type="application/x-ndjson", headers=headers)
+    return Response(content=cache.body, media_type="application/json", headers=headers)
+
+@app.get("/areas/search")
+async def search_areas(prefix: str = Query(..., min_length=1), limit: int = Query(20, ge=1, le=500)):
+    """Areas whose Name starts with ``prefix`` (case-insensitive)."""
+    cache = await app.areas_cache.get()
+    return {"results": cache.index.search(prefix, limit)}
+
+@app.get("/areas/{area_id}")
+async def get_area(area_id: str):
+    """A single node with its parent id, depth and child ids."""
+    index = await _areas_index_for(area_id)
+    return index.summary(area_id)
+
+@app.get("/areas/{area_id}/subtree")
+async def get_area_subtree(area_id: str, depth: Optional[int] = Query(None, ge=0)):
+    """The nested tree below ``area_id``, optionally cut off ``depth`` levels down."""
+    index = await _areas_index_for(area_id)
+    return index.subtree(area_id, depth)
+
+@app.get("/areas/{area_id}/ancestors")
+async def get_area_ancestors(area_id: str):
+    """Path from the root Conjunction down to the node's parent."""
+    index = await _areas_index_for(area_id)
+    return {"results": index.ancestors(area_id)}
+
+async def _areas_index_for(area_id: str):
+    cache = await app.areas_cache.get()
+    if area_id not in cache.index:
+        raise HTTPException(status_code=404, detail=f"Area {area_id} not found")
+    return cache.index
+
+async def _load_areas_tree() -> List[Dict]:
+    pages = await read_normalized_pages(app.mongodb[COLLECTION_NAME])
+    return build_relation_hierarchy(pages)
+
+async def _watch_areas_for_cache():
+    """Mark the cached tree stale on every change to the areas collection.
+
+    Catches writes made by other API instances; on a standalone Mongo without
+    change streams the cache still refreshes after local mirror runs.
+    """
+    resume_token = None
+    while True:
+        try:
+            # A snapshot swap drops the watched collection, which ends the
+            # stream with an "invalidate"; start_after reopens it past that.
+            async with app.mongodb[COLLECTION_NAME].watch(start_after=resume_token) as stream:
+                async for change in stream:
+                    resume_token = change["_id"]
+                    if change["operationType"] == "drop":
+                        # Followed by "invalidate": one refresh is enough.
+                        continue
+                    app.areas_cache.invalidate()
+                    app.areas_cache.schedule_refresh()
+        except asyncio.CancelledError:
+            raise
+        except PyMongoError as exc:
+            # The token may be what Mongo rejected; anything missed meanwhile
+            # is covered by refreshing now.
+            resume_token = None
+            app.areas_cache.invalidate()
+            log.warning("Areas change-stream unavailable; retrying in 30 s", extra={"error": str(exc)})
+            await asyncio.sleep(30)
+        except Exception as exc:
+            log.error("Unexpected error in areas change-stream; retrying in 5 s", extra={"error": str(exc)})
+            await asyncio.sleep(5)
 
 @app.post("/notion-webhook")
-async def notion_webhook(request: Request, background_tasks: BackgroundTasks):
-    """Handle Notion webhook POST events. Respond quickly (<=10 ms) and run the
-    expensive mirror-job in the background so Notion gets a 2xx immediately.
+async def notion_webhook(request: Request):
+    """Handle Notion webhook POST events. Respond quickly (<=10 ms) and do the
+    Mongo work in the background so Notion gets a 2xx immediately.
+
+    Page events queue just that page for ``_sync_pages``; schema-level events
+    request a full mirror of the database they name (all of them if it is not
+    one of ours), which is single-flight (see ``MirrorScheduler``).
     """
 
     payload = await request.json()
-    print("Received Notion event (stdout):", payload)
-    print("Received Notion event (stderr):", payload, file=sys.stderr)
+    log.info("Received Notion event", extra={"payload": payload})
 
     # 1) Verification handshake — just echo the token back once.
     if "verification_token" in payload:
         return {"verification_token": payload["verification_token"]}
 
-    # 2) Defer the heavy sync so we can ACK right away.
-    background_tasks.add_task(_mirror_notion_to_mongo)
+    # 2) Defer the sync so we can ACK right away.
+    action, page_id = classify_event(payload)
+    PAGE_EVENTS.inc(action=action)
+    if page_id:
+        app.page_sync.submit(page_id, action)
+    elif action == "full":
+        _request_mirror(full=True, database_id=(payload.get("entity") or {}).get("id"))
+    elif action == "mirror":
+        _request_mirror()
 
     return {"ok": True}
 
@@ -89,179 +306,523 @@ async def notion_webhook(request: Request, background_tasks: BackgroundTasks):
 async def notion_webhook_healthcheck():
     return PlainTextResponse("ok", status_code=200)
 
-async def _mirror_notion_to_mongo():
-    """Fetch the entire Notion DB and mirror it into MongoDB.
-
-    Runs in the background; errors are logged but won't affect webhook ACKs.
+def _request_mirror(full: bool = False, database_id: Optional[str] = None):
+    """Ask the scheduler of ``database_id`` (every database if it is not one of
+    ours) for a mirror run."""
+    targets = [db for db in NOTION_DATABASES if db.owns(database_id)] or NOTION_DATABASES
+    for db in targets:
+        app.mirror_schedulers[db.key].request(full)
+
+def _mirror_slots() -> asyncio.Semaphore:
+    if getattr(app, "mirror_slots", None) is None:
+        app.mirror_slots = asyncio.Semaphore(NOTION_MIRROR_CONCURRENCY)
+    return app.mirror_slots
+
+async def _mirror_notion_to_mongo(full: bool = False):
+    """Mirror every configured Notion database, concurrently (see
+    ``_mirror_database``)."""
+    await asyncio.gather(*(_mirror_database(db, full) for db in NOTION_DATABASES))
+
+@timed(MIRROR_SECONDS)
+async def _mirror_database(db: NotionDatabase, full: bool = False):
+    """Mirror one Notion database into its MongoDB collection.
+
+    By default only pages whose ``last_edited_time`` is at or after the stored
+    high-water mark are fetched and applied as bulk upserts. ``databases.query``
+    leaves out archived and trashed pages, so removals reach Mongo through the
+    webhook's page events (``_sync_pages``) or the next full mirror. A full
+    re-mirror runs when ``full`` is set, when NOTION_MIRROR_MODE=full, when no
+    high-water mark exists yet, or when the last full reconciliation is older
+    than NOTION_FULL_RECONCILE_SECONDS.
+
+    At most NOTION_MIRROR_CONCURRENCY databases are mirrored at once. Runs in
+    the background; errors are logged but won't affect webhook ACKs.
     """
 
     NOTION_TOKEN = os.environ.get("NOTION_TOKEN")
-    NOTION_DATABASE_ID = os.environ.get("NOTION_DATABASE_ID")
 
-    if not (NOTION_TOKEN and NOTION_DATABASE_ID):
-        print("[ERROR] NOTION_TOKEN or NOTION_DATABASE_ID env vars are missing.")
+    if not (NOTION_TOKEN and db.database_id):
+        log.error("NOTION_TOKEN or the Notion database id is missing", extra={"database": db.key})
         return
 
-    notion = NotionClient(auth=NOTION_TOKEN)
+    notion = _notion_source(NOTION_TOKEN)
+
+    async with _mirror_slots():
+        try:
+            state = await app.mongodb[SYNC_STATE_COLLECTION].find_one({"_id": db.state_id(MIRROR_STATE_ID)}) or {}
+        except Exception as exc:
+            log.warning("Could not read mirror state, falling back to a full mirror", extra={"database": db.key, "error": str(exc)})
+            state = {}
+
+        since = state.get("last_edited_time")
+        reconcile_due = time.time() - state.get("last_full_sync_at", 0) >= NOTION_FULL_RECONCILE_SECONDS
+
+        if full or NOTION_MIRROR_MODE == "full" or not since or reconcile_due:
+            await _full_mirror(notion, db)
+        else:
+            await _incremental_mirror(notion, db, since)
+
+    if db.primary:
+        app.areas_cache.invalidate()
+        app.areas_cache.schedule_refresh()
+
+def _notion_source(token: str) -> "NotionSource":
+    """Process-wide Notion client, so all mirror runs share one connection
+    pool and one rate limiter; ``notion_client`` is imported on first use."""
+    if getattr(app, "notion_source", None) is None:
+        from notion_source import NotionSource
+
+        app.notion_source = NotionSource(token)
+    return app.notion_source
+
+def _page_to_doc(page: Dict) -> Dict:
+    """Raw Notion page plus the compact ``normalized`` form used for reads."""
+    doc = dict(page)
+    doc["_id"] = page["id"]
+    doc["normalized"] = normalize_page(page)
+    return doc
+
+def _is_removed(page: Dict) -> bool:
+    return bool(page.get("archived") or page.get("in_trash"))
+
+def _latest_edit(pages: List[Dict], default: str = None) -> str:
+    """Return the newest ``last_edited_time`` (ISO strings compare lexically)."""
+    times = [p["last_edited_time"] for p in pages if p.get("last_edited_time")]
+    return max(times + ([default] if default else []), default=None)
+
+async def _save_mirror_state(db: NotionDatabase, **fields):
+    await app.mongodb[SYNC_STATE_COLLECTION].update_one(
+        {"_id": db.state_id(MIRROR_STATE_ID)}, {"$set": fields}, upsert=True
+    )
+
+async def _full_mirror(notion: "NotionSource", db: NotionDatabase):
+    """Stream the entire Notion DB into a staging collection, then swap it in.
+
+    Batches are upserted into ``<collection>_staging`` as Notion returns them;
+    once the last one is in, ``renameCollection`` with ``dropTarget``
+    replaces the live collection in one step. Readers see either the old
+    snapshot or the new one, never an empty or half-filled collection, and
+    pages that vanished from Notion simply are not in the new snapshot.
+
+    Pages edited while the run was paging (including page events already
+    applied to the live collection) are re-applied incrementally after the
+    swap, so the older copies in the snapshot do not win. Pages any API
+    process deleted meanwhile (the tombstones ``_sync_pages`` leaves) are
+    deleted again after the swap, since the snapshot may hold a copy fetched
+    before the delete and the query does not return removed pages.
+    """
+    collection = app.mongodb[db.collection]
+    staging = app.mongodb[db.staging_collection]
+    # Notion's last_edited_time has minute resolution; the filter is inclusive.
+    started = time.strftime("%Y-%m-%dT%H:%M:00.000Z", time.gmtime())
+    since_tombstones = time.time() - TOMBSTONE_SLACK_SECONDS
+    count = 0
+    latest = None
 
-    # ---- Pull all pages ---------------------------------------------------
     try:
-        all_pages = []
-        next_cursor = None
-        while True:
-            query_kwargs = {"database_id": NOTION_DATABASE_ID}
-            if next_cursor:
-                query_kwargs["start_cursor"] = next_cursor
-
-            response = notion.databases.query(**query_kwargs)
-            all_pages.extend(response.get("results", []))
-
-            if response.get("has_more"):
-                next_cursor = response.get("next_cursor")
-            else:
-                break
+        # Leftovers from a run that died before its swap.
+        await staging.drop()
+        async for batch in notion.iter_database(db.database_id):
+            ops = [
+                ReplaceOne({"_id": page["id"]}, _page_to_doc(page), upsert=True)
+                for page in batch
+                if not _is_removed(page)
+            ]
+            if ops:
+                await staging.bulk_write(ops, ordered=False)
+            count += len(ops)
+            MIRROR_PAGES.inc(len(ops), database=db.key, mode="full", op="upsert")
+            latest = _latest_edit(batch, latest)
     except Exception as exc:
-        print(f"[ERROR] Failed to fetch pages from Notion: {exc}")
+        MIRROR_RUNS.inc(database=db.key, mode="full", outcome="failed")
+        log.error("Full mirror aborted", extra={"database": db.key, "pages": count, "error": str(exc)})
+        await _drop_quietly(staging)
         return
 
-    # ---- Mirror into MongoDB --------------------------------------------
     try:
-        docs = []
-        for page in all_pages:
-            doc = dict(page)
-            doc["_id"] = page["id"]
-            docs.append(doc)
-
-        collection = app.mongodb[COLLECTION_NAME]
-        await collection.delete_many({})
-        if docs:
-            await collection.insert_many(docs)
-
-        print(f"[INFO] Mirrored {len(docs)} Notion pages into MongoDB.")
+        previous = await collection.estimated_document_count()
+        await staging.rename(db.collection, dropTarget=True)
+        redeleted = await _apply_tombstones(db, since_tombstones)
+        await _save_mirror_state(db, last_edited_time=latest, last_full_sync_at=time.time(), snapshot_pages=count)
+        MIRROR_PAGES.inc(max(0, previous - count), database=db.key, mode="full", op="delete")
+        MIRROR_RUNS.inc(database=db.key, mode="full", outcome="ok")
+        log.info(
+            "Swapped in mirrored Notion snapshot",
+            extra={"database": db.key, "mode": "full", "pages": count, "previous": previous, "redeleted": redeleted},
+        )
     except Exception as exc:
-        print(f"[ERROR] Failed to mirror pages into MongoDB: {exc}")
+        MIRROR_RUNS.inc(database=db.key, mode="full", outcome="failed")
+        log.error("Failed to swap in mirrored snapshot", extra={"database": db.key, "error": str(exc)})
+        await _drop_quietly(staging)
+        return
+
+    await _incremental_mirror(notion, db, started)
+
+async def _apply_tombstones(db: NotionDatabase, since: float) -> int:
+    """Delete the pages tombstoned since ``since`` from ``db``'s collection
+    and forget older tombstones; returns how many were re-applied."""
+    tombstones = app.mongodb[TOMBSTONE_COLLECTION]
+    page_ids = [
+        doc["page_id"]
+        async for doc in tombstones.find({"database": db.key, "deleted_at": {"$gte": since}}, {"page_id": 1})
+    ]
+    if page_ids:
+        await app.mongodb[db.collection].delete_many({"_id": {"$in": page_ids}})
+    await tombstones.delete_many({"database": db.key, "deleted_at": {"$lt": since}})
+    return len(page_ids)
+
+async def _record_tombstones(db: NotionDatabase, deleted: List[str], restored: List[str]):
+    """Remember ``deleted`` for a full mirror that may be paging elsewhere;
+    ``restored`` pages are live again and lose their tombstone."""
+    tombstones = app.mongodb[TOMBSTONE_COLLECTION]
+    now = time.time()
+    ops = [
+        ReplaceOne(
+            {"_id": f"{db.key}:{pid}"}, {"database": db.key, "page_id": pid, "deleted_at": now}, upsert=True
+        )
+        for pid in deleted
+    ]
+    ops += [DeleteOne({"_id": f"{db.key}:{pid}"}) for pid in restored]
+    if ops:
+        await tombstones.bulk_write(ops, ordered=False)
+
+
+async def _drop_quietly(collection):
+    try:
+        await collection.drop()
+    except PyMongoError as exc:
+        log.warning("Could not drop staging collection", extra={"collection": collection.name, "error": str(exc)})
+
+async def _incremental_mirror(notion: "NotionSource", db: NotionDatabase, since: str):
+    """Apply only the pages edited at or after ``since``, one bulk_write per
+    Notion result batch.
+
+    Notion truncates ``last_edited_time`` to the minute, so the filter is
+    inclusive and the boundary pages are simply upserted again.
+
+    Removed pages are not returned by the query, so this never sees them;
+    the delete branch only covers a page archived while the query is paging.
+    """
+    collection = app.mongodb[db.collection]
+    count = 0
+    latest = since
+
+    try:
+        async for batch in notion.iter_database(
+            db.database_id,
+            filter={"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": since}},
+            sorts=[{"timestamp": "last_edited_time", "direction": "ascending"}],
+        ):
+            ops = []
+            deletes = 0
+            for page in batch:
+                if _is_removed(page):
+                    ops.append(DeleteOne({"_id": page["id"]}))
+                    deletes += 1
+                else:
+                    ops.append(ReplaceOne({"_id": page["id"]}, _page_to_doc(page), upsert=True))
+            if ops:
+                await collection.bulk_write(ops, ordered=False)
+            count += len(ops)
+            MIRROR_PAGES.inc(len(ops) - deletes, database=db.key, mode="incremental", op="upsert")
+            MIRROR_PAGES.inc(deletes, database=db.key, mode="incremental", op="delete")
+            latest = _latest_edit(batch, latest)
+        outcome = "ok"
+    except Exception as exc:
+        # Only what has been applied counts towards the high-water mark.
+        outcome = "failed"
+        log.error("Incremental mirror failed", extra={"database": db.key, "pages": count, "error": str(exc)})
+
+    try:
+        await _save_mirror_state(db, last_edited_time=latest)
+        log.info(
+            "Applied changed Notion pages to MongoDB",
+            extra={"database": db.key, "mode": "incremental", "pages": count, "since": since},
+        )
+    except Exception as exc:
+        outcome = "failed"
+        log.error("Failed to save mirror state", extra={"database": db.key, "error": str(exc)})
+    MIRROR_RUNS.inc(database=db.key, mode="incremental", outcome=outcome)
+
+async def _sync_pages(batch: Dict[str, str]):
+    """Apply webhook page events: re-fetch each updated page, one bulk_write
+    per mirrored database.
+
+    ``batch`` maps page id to ``"upsert"`` or ``"delete"``. Fetched pages go
+    to the collection of the database named by their parent. A page that
+    Notion reports missing, archived or outside every mirrored database is
+    deleted from all of them; if some pages cannot be fetched an incremental
+    mirror is requested so their edits are not lost.
+    """
+    NOTION_TOKEN = os.environ.get("NOTION_TOKEN")
+
+    if not (NOTION_TOKEN and NOTION_DATABASES):
+        log.error("NOTION_TOKEN or the Notion database ids are missing")
+        return
+
+    notion = _notion_source(NOTION_TOKEN)
+    owners = by_notion_id(NOTION_DATABASES)
+    upserts = [pid for pid, action in batch.items() if action == "upsert"]
+    fetched = await asyncio.gather(*(notion.retrieve_page(pid) for pid in upserts), return_exceptions=True)
+
+    ops = {db.key: [] for db in NOTION_DATABASES}
+    removed = [pid for pid, action in batch.items() if action == "delete"]
+    placed = {}
+    failed = 0
+    for pid, page in zip(upserts, fetched):
+        if isinstance(page, Exception):
+            if getattr(page, "status", None) == 404:
+                removed.append(pid)
+            else:
+                failed += 1
+                log.warning("Could not fetch page from Notion", extra={"page_id": pid, "error": str(page)})
+            continue
+        db = _owning_database(page, owners)
+        if db is None or _is_removed(page):
+            removed.append(pid)
+        else:
+            ops[db.key].append(ReplaceOne({"_id": pid}, _page_to_doc(page), upsert=True))
+            placed[pid] = db.key
+
+    # The event does not say which database a page was in before: drop removed
+    # pages everywhere, and moved pages from every collection but their own.
+    deleted = {}
+    for db in NOTION_DATABASES:
+        deleted[db.key] = removed + [pid for pid, key in placed.items() if key != db.key]
+        ops[db.key].extend(DeleteOne({"_id": pid}) for pid in deleted[db.key])
+    for db in NOTION_DATABASES:
+        if not ops[db.key]:
+            continue
+        # A full mirror paging in any process may still hold deleted pages.
+        await _record_tombstones(db, deleted[db.key], [pid for pid, key in placed.items() if key == db.key])
+        await app.mongodb[db.collection].bulk_write(ops[db.key], ordered=False)
+        upserted = sum(isinstance(op, ReplaceOne) for op in ops[db.key])
+        MIRROR_PAGES.inc(upserted, database=db.key, mode="page", op="upsert")
+        MIRROR_PAGES.inc(len(ops[db.key]) - upserted, database=db.key, mode="page", op="delete")
+        if db.primary:
+            app.areas_cache.invalidate()
+            app.areas_cache.schedule_refresh()
+    log.info(
+        "Applied Notion page events to MongoDB",
+        extra={"mode": "page", "pages": len(placed) + len(removed), "failed": failed},
+    )
+    if failed:
+        _request_mirror()
+
+def _owning_database(page: Dict, owners: Dict[str, NotionDatabase]) -> Optional[NotionDatabase]:
+    """The mirrored database ``page`` lives in. A page that does not name its
+    parent is taken to be in the only database, when there is just one."""
+    parent = (page.get("parent") or {}).get("database_id")
+    if parent is None:
+        return NOTION_DATABASES[0] if len(NOTION_DATABASES) == 1 else None
+    return owners.get(parent.replace("-", ""))
+
+async def _schedule_reconciles():
+    """Request a mirror run a few times per NOTION_FULL_RECONCILE_SECONDS.
+
+    The run itself turns full only once the shared ``last_full_sync_at`` is
+    old enough (see ``_mirror_database``), so however many API processes
+    run this timer, each database gets one full reconcile per interval.
+    """
+    while True:
+        await asyncio.sleep(NOTION_FULL_RECONCILE_SECONDS / 4)
+        _request_mirror()
+
+async def _graph_call(call):
+    """Await a GraphAccess call, turning a full query queue into a 503."""
+    try:
+        return await call
+    except GraphBusy as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
+
+async def _cached_read(key: tuple, load):
+    """``(value, hit)`` from the graph query cache, keyed on ``key`` plus the
+    current graph version; misses run ``load()`` through ``_graph_call``.
+
+    Without a graph version (Mongo down or slow) the cache is skipped, so
+    graph reads keep working on Neo4j alone.
+    """
+    try:
+        version = await asyncio.wait_for(read_graph_version(app.mongodb[SYNC_STATE_COLLECTION]), GRAPH_VERSION_TIMEOUT)
+    except (PyMongoError, asyncio.TimeoutError) as exc:
+        log.warning("Could not read graph version; skipping the query cache", extra={"error": str(exc)})
+        return await _graph_call(load()), False
+    return await app.graph_cache.get_or_load(key + (version,), lambda: _graph_call(load()))
+
+async def _graph_changed():
+    """Bump the graph version after an API write, so cached reads go stale."""
+    try:
+        await asyncio.wait_for(bump_graph_version(app.mongodb[SYNC_STATE_COLLECTION]), GRAPH_VERSION_TIMEOUT)
+    except (PyMongoError, asyncio.TimeoutError) as exc:
+        # Without the bump cached reads could outlive the write; drop them all.
+        app.graph_cache.clear()
+        log.warning("Could not bump graph version", extra={"error": str(exc)})
 
 @app.post("/graph/query")
-async def run_cypher_query(query: str = Body(..., embed=True)):
-    """Run an arbitrary Cypher query and return the result."""
-    async with app.neo4j_driver.session() as session:
-        result = await session.run(query)
-        records = [record.data() async for record in result]
+@timed(GRAPH_REQUEST_SECONDS, endpoint="query")
+async def run_cypher_query(
+    query: str = Body(..., embed=True),
+    params: dict = Body(default={}),
+    timeout: Optional[float] = Body(default=None, gt=0),
+    page_size: Optional[int] = Body(default=None, gt=0),
+    cursor: Optional[str] = Body(default=None),
+    format: str = Body(default="json", pattern="^(json|ndjson)$"),
+):
+    """Run an arbitrary Cypher query and return the result.
+
+    Read-only queries run as read transactions (routable to replicas);
+    ``timeout`` (seconds) caps the server-side transaction time.
+
+    JSON responses hold at most ``page_size`` (capped by NEO4J_MAX_ROWS)
+    records; pass ``next_cursor`` back as ``cursor`` for the next page.
+    Only read-only queries ending in a plain RETURN are paged; writes and
+    other queries run once and return at most one page with
+    ``next_cursor: null`` (use ``format=ndjson`` for more rows).
+    ``format=ndjson`` streams one record per line instead, as they arrive,
+    up to NEO4J_MAX_STREAM_ROWS.
+
+    Read-only JSON pages are served from the graph query cache while the
+    graph version is unchanged; prefer ``/graph/queries/{name}`` for
+    queries sent repeatedly.
+    """
+    read_only = is_read_only(query)
+    if format == "ndjson":
+        records = await _graph_call(_graph().stream(query, params, timeout=timeout))
+        return StreamingResponse(
+            _ndjson_records(records, changes_graph=not read_only),
+            media_type="application/x-ndjson",
+            headers={"X-Max-Rows": str(_graph().max_stream_rows)},
+        )
+
+    def load():
+        return _graph().query_page(query, params, timeout=timeout, page_size=page_size, cursor=cursor)
+
+    try:
+        if read_only:
+            key = ("cypher", query, params_key(params), page_size, cursor)
+            (records, next_cursor), _ = await _cached_read(key, load)
+        else:
+            records, next_cursor = await _graph_call(load())
+            await _graph_changed()
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"results": records, "next_cursor": next_cursor}
+
+@app.get("/graph/queries")
+async def list_graph_queries():
+    """Registered named queries and their parameters (``null`` = required)."""
+    return {"queries": app.graph_queries.describe()}
+
+@app.post("/graph/queries/{name}")
+@timed(GRAPH_REQUEST_SECONDS, endpoint="named_query")
+async def run_named_query(
+    name: str,
+    response: Response,
+    params: dict = Body(default={}, embed=True),
+):
+    """Run a registered read query by name; results are cached per
+    ``(name, params, graph version)``. ``X-Cache`` tells hit from miss."""
+    named = app.graph_queries.get(name)
+    if named is None:
+        raise HTTPException(status_code=404, detail=f"no query named {name}")
+    try:
+        bound = named.bind(params)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    async def work(tx):
+        result = await tx.run(named.cypher, bound)
+        rows = []
+        async for record in result:
+            rows.append(record.data())
+            if len(rows) >= _graph().max_rows:
+                break
+        return rows
+
+    records, hit = await _cached_read(("named", name, params_key(bound)), lambda: _graph().read(work))
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
     return {"results": records}
 
+async def _ndjson_records(records, rows_per_chunk: int = 500, changes_graph: bool = False):
+    chunk = []
+    try:
+        async for record in records:
+            # default=str covers Neo4j temporal and spatial values
+            chunk.append(dumps(record, default=str))
+            if len(chunk) >= rows_per_chunk:
+                yield b"\n".join(chunk) + b"\n"
+                chunk = []
+        if chunk:
+            yield b"\n".join(chunk) + b"\n"
+    finally:
+        if changes_graph:
+            # The auto-commit transaction is done once the stream is.
+            await _graph_changed()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text-format metrics."""
+    return Response(content=render(), media_type=CONTENT_TYPE)
+
+@app.get("/graph/metrics")
+async def graph_metrics():
+    """Query-slot usage, queue wait and query latency for the Neo4j layer."""
+    return {**_graph().metrics(), "cache": app.graph_cache.stats()}
+
 @app.post("/graph/edge")
+@timed(GRAPH_REQUEST_SECONDS, endpoint="edge")
 async def create_or_update_edge(
     source_id: str = Body(...),
     target_id: str = Body(...),
     rel_type: str = Body(...),
     properties: dict = Body(default={})
 ):
-    """Create or update an edge (relationship) between two nodes."""
-    cypher = (
-        f"MATCH (a),(b) WHERE a.id = $source_id AND b.id = $target_id "
-        f"MERGE (a)-[r:{rel_type}]->(b) "
-        f"SET r += $properties RETURN a, r, b"
-    )
-    async with app.neo4j_driver.session() as session:
-        result = await session.run(
-            cypher, source_id=source_id, target_id=target_id, properties=properties
+    """Create or update an edge (relationship) between two nodes.
+
+    For many edges use ``POST /graph/edges:batch``.
+    """
+    if not REL_TYPE.match(rel_type):
+        raise HTTPException(status_code=400, detail="rel_type must be an identifier ([A-Za-z_][A-Za-z0-9_]*)")
+
+    async def work(tx):
+        # Labelled MATCHes so the per-label id constraints are used.
+        labels = await resolve_labels(tx, [source_id, target_id])
+        if source_id not in labels or target_id not in labels:
+            return []
+        result = await tx.run(
+            f"MATCH (a:`{labels[source_id]}` {{id: $source_id}}) "
+            f"MATCH (b:`{labels[target_id]}` {{id: $target_id}}) "
+            f"MERGE (a)-[r:{rel_type}]->(b) "
+            f"SET r += $properties RETURN a, r, b",
+            source_id=source_id, target_id=target_id, properties=properties,
         )
-        records = [record.data() async for record in result]
+        return [record.data() async for record in result]
+
+    records = await _graph_call(_graph().write(work))
+    if records:
+        await _graph_changed()
     return {"results": records}
 
-def _plain_text_from_rich_text(rich_items: List[Dict]) -> str:
-    """Helper to concatenate plain_text from Notion rich_text array."""
-    return "".join(rt.get("plain_text", "") for rt in rich_items or [])
-
-def _extract_simple_fields(page: Dict) -> Dict:
-    """Extract public fields from a Notion page object."""
-    props = page.get("properties", {})
-    simple = {}
-    # Extract Name (first title-type property)
-    for prop_name, prop_val in props.items():
-        if prop_val.get("type") == "title":
-            simple["Name"] = _plain_text_from_rich_text(prop_val["title"])
-            break
-    # Extract Symbol (rich_text or select named "Symbol" if exists)
-    if "Symbol" in props:
-        sym_prop = props["Symbol"]
-        if sym_prop.get("type") == "rich_text":
-            simple["Symbol"] = _plain_text_from_rich_text(sym_prop["rich_text"])
-        elif sym_prop.get("type") == "select":
-            simple["Symbol"] = sym_prop["select"].get("name")
-    # Extract Category (select or rich_text named "Category")
-    if "Category" in props:
-        cat_prop = props["Category"]
-        if cat_prop.get("type") == "select":
-            simple["Category"] = cat_prop["select"].get("name")
-        elif cat_prop.get("type") == "rich_text":
-            simple["Category"] = _plain_text_from_rich_text(cat_prop["rich_text"])
-    # Fallback: include page id for reference
-    simple["id"] = page.get("id")
-    return simple
-
-def _level_name(page: Dict) -> str:
-    level_prop = page.get("properties", {}).get("Level")
-    if level_prop and level_prop.get("type") == "select" and level_prop.get("select"):
-        return level_prop["select"].get("name", "")
-    return ""
-
-def _is_sub_area(page: Dict) -> bool:
-    return "sub" in _level_name(page).lower()
-
-def _number_value(page: Dict) -> float:
-    """Return numeric order from '#' property if present, else infinity."""
-    num_prop = page.get("properties", {}).get("#")
-    if num_prop and num_prop.get("type") == "number" and num_prop.get("number") is not None:
-        return num_prop["number"]
-    return float("inf")
-
-def _build_relation_hierarchy(pages: List[Dict]) -> List[Dict]:
-    """Build tree using 'Sub-item' relation graph, excluding Sub-Areas."""
-    pages = [p for p in pages if not _is_sub_area(p)]
-    id_to_page: Dict[str, Dict] = {p["id"]: p for p in pages}
-    id_to_node: Dict[str, Dict] = {}
-
-    def node_for(pid: str) -> Dict:
-        if pid not in id_to_node:
-            page = id_to_page[pid]
-            n = _extract_simple_fields(page)
-            n["children"] = []
-            n["_number"] = _number_value(page)
-            id_to_node[pid] = n
-        return id_to_node[pid]
-
-    child_ids = set()
-    for p in pages:
-        rel_prop = p.get("properties", {}).get("Sub-item")
-        if rel_prop and rel_prop.get("type") == "relation":
-            parent_node = node_for(p["id"])
-            for rel in rel_prop.get("relation", []):
-                cid = rel.get("id")
-                if cid in id_to_page:
-                    child_ids.add(cid)
-                    parent_node["children"].append(node_for(cid))
-
-    roots = [node for pid, node in id_to_node.items() if pid not in child_ids]
-
-    def sort_children(node: Dict):
-        node["children"].sort(key=lambda c: (c.get("_number", float("inf")), c.get("Name", "")))
-        for c in node["children"]:
-            sort_children(c)
-    for r in roots:
-        sort_children(r)
-
-    def prune(node: Dict):
-        node.pop("_number", None)
-        if not node["children"]:
-            node.pop("children", None)
-        else:
-            for c in node["children"]:
-                prune(c)
-    for r in roots:
-        prune(r)
+@app.post("/graph/edges:batch")
+@timed(GRAPH_REQUEST_SECONDS, endpoint="edges_batch")
+async def upsert_edges_batch(
+    items: List[dict] = Body(..., embed=True),
+    chunk_size: Optional[int] = Body(default=None, gt=0, le=EDGE_BATCH_CHUNK_SIZE),
+):
+    """Create or update many edges in one request.
 
-    roots.sort(key=lambda c: (c.get("_number", float("inf")), c.get("Name", "")))
-    return roots
+    ``items`` are ``{source_id, target_id, rel_type, properties}``; they are
+    grouped by relationship type and endpoint labels and written with
+    chunked UNWIND MERGEs. Returns a status per item, in request order.
+    """
+    if len(items) > EDGE_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"at most {EDGE_BATCH_MAX_ITEMS} items per batch")
+    results = await _graph_call(upsert_edges(_graph(), items, chunk_size))
+    summary = defaultdict(int)
+    for r in results:
+        summary[r["status"]] += 1
+    if summary.get("created") or summary.get("updated"):
+        await _graph_changed()
+    return {"results": results, "summary": summary}
 
 # Lanza:  uvicorn api:app --port 8000 --reload
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""Materialized copy of the ``/areas-structured`` tree.
+
+The API keeps the last built hierarchy together with its serialized JSON
+body, an ETag and an ``AreasIndex`` for per-node lookups, so a request costs
+a dict lookup instead of a Mongo scan plus a hierarchy build. The copy is
+marked stale by ``invalidate()`` (after a mirror run or on a Mongo change
+event) and rebuilt by ``refresh()``.
+
+With ``snapshot_path`` set, every rebuild is also written to disk
+(``areas_snapshot``) and ``load_snapshot()`` maps it back at startup: the
+copy is served right away while the first rebuild runs in the background.
+When a rebuild fails (Mongo unreachable) the last copy keeps being served;
+``stale_for`` then gives its age, for a staleness header.
+"""
+
+import os
+import asyncio
+import hashlib
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from areas_index import AreasIndex
+from areas_snapshot import read_snapshot, write_snapshot
+from instrumentation import counter, get_logger, histogram, timed
+from tree_encoding import dumps, loads
+
+log = get_logger("areas_cache")
+
+REBUILD_SECONDS = histogram("areas_cache_rebuild_seconds", "Time to rebuild the /areas-structured cache")
+STALE_SERVES = counter("areas_cache_stale_serves_total", "Requests served a copy not confirmed against Mongo")
+
+# Where the built tree is persisted across restarts; unset disables it.
+AREAS_SNAPSHOT_PATH = os.environ.get("AREAS_SNAPSHOT_PATH")
+# How long a request waits for a rebuild before it gets the older copy, and
+# how long after a failed rebuild requests stop trying again (seconds).
+AREAS_FALLBACK_AFTER = float(os.environ.get("AREAS_FALLBACK_AFTER_SECONDS", "2"))
+AREAS_RETRY_AFTER = float(os.environ.get("AREAS_RETRY_AFTER_SECONDS", "5"))
+
+
+def etag_for(body: bytes) -> str:
+    # Content hash rather than a counter so every API instance agrees on it.
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+class AreasTreeCache:
+    def __init__(
+        self,
+        build: Callable[[], Awaitable[List[Dict]]],
+        debounce: float = 0.2,
+        snapshot_path: Optional[str] = AREAS_SNAPSHOT_PATH,
+    ):
+        self._build = build
+        self._debounce = debounce
+        self._snapshot_path = snapshot_path
+        self._lock = asyncio.Lock()
+        self._generation = 0
+        self._stale = True
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._request_refresh: Optional[asyncio.Task] = None
+        self._retry_at = 0.0
+        # Serve the copy loaded from disk without waiting for Mongo, until
+        # the first rebuild or invalidation.
+        self._serve_loaded = False
+
+        self._tree: Optional[List[Dict]] = None
+        self._index: Optional[AreasIndex] = None
+        self.body: Optional[bytes] = None  # a memoryview when loaded from disk
+        self.etag: Optional[str] = None
+        self.built_at: Optional[float] = None
+        self.from_snapshot = False
+        self.degraded = False  # the last rebuild failed
+
+    @property
+    def stale(self) -> bool:
+        return self._stale
+
+    @property
+    def tree(self) -> Optional[List[Dict]]:
+        # A copy loaded from disk is only parsed once something needs it.
+        if self._tree is None and self.body is not None:
+            self._tree = loads(self.body)
+        return self._tree
+
+    @property
+    def index(self) -> Optional[AreasIndex]:
+        if self._index is None and self.tree is not None:
+            self._index = AreasIndex(self.tree)
+        return self._index
+
+    @property
+    def stale_for(self) -> Optional[float]:
+        """Age in seconds of a copy not known to match Mongo, else ``None``."""
+        if not (self.from_snapshot or self.degraded) or self.built_at is None:
+            return None
+        return max(0.0, time.time() - self.built_at)
+
+    def invalidate(self):
+        self._generation += 1
+        self._stale = True
+        self._serve_loaded = False
+
+    def load_snapshot(self) -> bool:
+        """Map the on-disk copy (if any) so it can be served before a rebuild."""
+        if not self._snapshot_path or self.body is not None:
+            return False
+        snapshot = read_snapshot(self._snapshot_path)
+        if snapshot is None:
+            return False
+        self.body, self.etag, self.built_at = snapshot.body, snapshot.etag, snapshot.built_at
+        self._tree = self._index = None
+        self.from_snapshot = self._serve_loaded = True
+        log.info("Loaded /areas-structured snapshot", extra={"bytes": len(snapshot.body), "built_at": snapshot.built_at})
+        return True
+
+    async def refresh(self):
+        """Rebuild if stale. Concurrent callers share one rebuild."""
+        async with self._lock:
+            if not self._stale:
+                return
+            await self._rebuild()
+
+    @timed(REBUILD_SECONDS)
+    async def _rebuild(self):
+        """Build tree, body, ETag and index; caller holds the lock."""
+        generation = self._generation
+        try:
+            tree = await self._build()
+        except Exception:
+            self.degraded = self.body is not None
+            raise
+        body = dumps(tree)
+        etag = etag_for(body)
+        changed = etag != self.etag
+        self._tree, self.body, self.etag = tree, body, etag
+        self._index = AreasIndex(tree)
+        self.built_at = time.time()
+        self.from_snapshot = self.degraded = self._serve_loaded = False
+        # An invalidation that raced the build keeps the copy stale.
+        self._stale = generation != self._generation
+        if self._snapshot_path and changed:
+            await self._save_snapshot(body, etag, self.built_at)
+
+    async def _save_snapshot(self, body: bytes, etag: str, built_at: float):
+        try:
+            await asyncio.to_thread(write_snapshot, self._snapshot_path, body, etag, built_at)
+        except OSError as exc:
+            log.warning("Could not write /areas-structured snapshot", extra={"error": str(exc)})
+
+    async def get(self) -> "AreasTreeCache":
+        """The current copy, rebuilt first if stale.
+
+        With an older copy at hand a request waits at most
+        AREAS_FALLBACK_AFTER for the rebuild and otherwise gets that copy
+        (``degraded`` is set); errors only propagate when there is none.
+        """
+        if self.body is None:
+            await self.refresh()
+            return self
+        if self._serve_loaded or (self._stale and time.monotonic() < self._retry_at):
+            STALE_SERVES.inc()
+            return self
+        if self._stale:
+            if self._request_refresh is None or self._request_refresh.done():
+                self._request_refresh = asyncio.create_task(self.refresh())
+                self._request_refresh.add_done_callback(self._refresh_done)
+            try:
+                await asyncio.wait_for(asyncio.shield(self._request_refresh), AREAS_FALLBACK_AFTER)
+            except Exception:
+                self.degraded = True
+                STALE_SERVES.inc()
+        return self
+
+    def _refresh_done(self, task: asyncio.Task):
+        if task.cancelled() or task.exception() is None:
+            return
+        self._retry_at = time.monotonic() + AREAS_RETRY_AFTER
+        log.warning("Serving the last /areas-structured copy; rebuild failed", extra={"error": str(task.exception())})
+
+    def schedule_refresh(self):
+        """Rebuild in the background, soaking up bursts of invalidations."""
+        if self._refresh_task and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        try:
+            while self._stale:
+                await asyncio.sleep(self._debounce)
+                await self.refresh()
+        except Exception as exc:
+            log.error("Failed to rebuild /areas-structured cache", extra={"error": str(exc)})
@@ -0,0 +1,91 @@
+"""Lookup index over the built Areas hierarchy.
+
+Built once per tree rebuild from ``_build_relation_hierarchy`` output so that
+single-node, subtree, ancestry and name-prefix lookups cost O(result size)
+instead of a Mongo scan or a walk of the whole tree.
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+
+class AreasIndex:
+    def __init__(self, roots: List[Dict]):
+        self.nodes: Dict[str, Dict] = {}
+        self.parents: Dict[str, Optional[str]] = {}
+        self.depths: Dict[str, int] = {}
+
+        stack = [(root, None, 0) for root in reversed(roots)]
+        while stack:
+            node, parent_id, depth = stack.pop()
+            nid = node["id"]
+            if nid in self.nodes:
+                # A node reachable twice keeps its first position.
+                continue
+            self.nodes[nid] = node
+            self.parents[nid] = parent_id
+            self.depths[nid] = depth
+            for child in reversed(node.get("children", [])):
+                stack.append((child, nid, depth + 1))
+
+        # (casefolded name, id), sorted for bisect-based prefix search
+        self._names: List[Tuple[str, str]] = sorted(
+            ((node.get("Name") or "").casefold(), nid) for nid, node in self.nodes.items()
+        )
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self.nodes
+
+    def summary(self, node_id: str) -> Dict:
+        """The node's own fields plus parent_id, depth and child ids."""
+        node = self.nodes[node_id]
+        out = {k: v for k, v in node.items() if k != "children"}
+        out["parent_id"] = self.parents[node_id]
+        out["depth"] = self.depths[node_id]
+        out["child_ids"] = [c["id"] for c in node.get("children", [])]
+        return out
+
+    def subtree(self, node_id: str, depth: Optional[int] = None) -> Dict:
+        """Nested subtree rooted at ``node_id``, cut off ``depth`` levels down."""
+        node = self.nodes[node_id]
+        if depth is None:
+            return node
+
+        def fields(n: Dict) -> Dict:
+            return {k: v for k, v in n.items() if k != "children"}
+
+        root = fields(node)
+        stack = [(node, root, 0)]
+        while stack:
+            src, dst, level = stack.pop()
+            if level >= depth or not src.get("children"):
+                continue
+            dst["children"] = []
+            for child in src["children"]:
+                copy = fields(child)
+                dst["children"].append(copy)
+                stack.append((child, copy, level + 1))
+        return root
+
+    def ancestors(self, node_id: str) -> List[Dict]:
+        """Path from the root down to (excluding) ``node_id``."""
+        path = []
+        parent_id = self.parents[node_id]
+        while parent_id is not None:
+            path.append(self.summary(parent_id))
+            parent_id = self.parents[parent_id]
+        path.reverse()
+        return path
+
+    def search(self, prefix: str, limit: int = 20) -> List[Dict]:
+        """Nodes whose Name starts with ``prefix`` (case-insensitive)."""
+        needle = prefix.casefold()
+        results = []
+        i = bisect_left(self._names, (needle, ""))
+        while i < len(self._names) and len(results) < limit:
+            name, nid = self._names[i]
+            if not name.startswith(needle):
+                break
+            results.append(self.summary(nid))
+            i += 1
+        return results
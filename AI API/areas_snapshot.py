@@ -0,0 +1,76 @@
+"""On-disk copy of the ``/areas-structured`` body for warm restarts.
+
+File layout (little-endian)::
+
+    magic    8 bytes   b"AREASNAP"
+    version  uint16    FORMAT_VERSION
+    built_at float64   epoch seconds the tree was built from Mongo
+    etag_len uint16
+    etag     etag_len bytes (UTF-8)
+    body     rest of the file: the exact JSON body served
+
+``read_snapshot`` memory-maps the file, so the body is served straight from
+the page cache without being read or parsed up front. ``write_snapshot``
+writes a temporary file and renames it over the old one; mappings of the old
+file stay valid.
+"""
+
+import os
+import mmap
+import struct
+import tempfile
+from typing import Optional, Tuple
+
+MAGIC = b"AREASNAP"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sHdH")
+
+
+class Snapshot:
+    def __init__(self, body: memoryview, etag: str, built_at: float, mapping: mmap.mmap):
+        self.body = body
+        self.etag = etag
+        self.built_at = built_at
+        self._mapping = mapping  # keeps ``body`` valid
+
+
+def read_snapshot(path: str) -> Optional[Snapshot]:
+    """The snapshot at ``path``; ``None`` if missing, truncated or another format."""
+    try:
+        with open(path, "rb") as fh:
+            mapping = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):  # ValueError: empty file
+        return None
+    header = _parse_header(mapping)
+    if header is None:
+        mapping.close()
+        return None
+    etag, built_at, offset = header
+    return Snapshot(memoryview(mapping)[offset:], etag, built_at, mapping)
+
+
+def _parse_header(data) -> Optional[Tuple[str, float, int]]:
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, built_at, etag_len = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION or len(data) < _HEADER.size + etag_len:
+        return None
+    etag = bytes(data[_HEADER.size:_HEADER.size + etag_len]).decode("utf-8")
+    return etag, built_at, _HEADER.size + etag_len
+
+
+def write_snapshot(path: str, body: bytes, etag: str, built_at: float):
+    """Atomically replace the snapshot at ``path``."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    etag_bytes = etag.encode("utf-8")
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".areas-snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(_HEADER.pack(MAGIC, FORMAT_VERSION, built_at, len(etag_bytes)))
+            fh.write(etag_bytes)
+            fh.write(body)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
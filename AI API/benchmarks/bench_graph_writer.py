@@ -0,0 +1,115 @@
+"""Compare the per-node MERGE path with the batched UNWIND graph writer.
+
+Writes a synthetic Conjunction → Group → Area tree into Neo4j under
+throw-away ``Bench*`` labels (removed again afterwards) and prints nodes/sec
+for both paths. With ``--import-dir`` (Neo4j's import directory, or a volume
+mounted there) the CSV + LOAD CSV bulk path is timed as well.
+
+    NEO4J_URI=... NEO4J_USER=... NEO4J_PASSWORD=... \\
+        python benchmarks/bench_graph_writer.py --groups 50 --areas 40
+"""
+
+import os
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from neo4j import AsyncGraphDatabase
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from graph_bulk import bulk_load  # noqa: E402
+from graph_writer import ensure_constraints, label_for_depth, rel_type_for, write_tree  # noqa: E402
+
+BENCH_LABELS = ["BenchConjunction", "BenchGroup", "BenchArea"]
+
+
+def synthetic_tree(conjunctions: int, groups: int, areas: int) -> List[Dict[str, Any]]:
+    def node(name, children=None):
+        n = {"Name": name, "id": str(uuid.uuid4())}
+        if children:
+            n["children"] = children
+        return n
+
+    return [
+        node(f"C{c}", [
+            node(f"C{c}.G{g}", [node(f"C{c}.G{g}.A{a}") for a in range(areas)])
+            for g in range(groups)
+        ])
+        for c in range(conjunctions)
+    ]
+
+
+async def legacy_create_subtree(session, node: Dict[str, Any], depth: int = 0, parent_id: Optional[str] = None):
+    """The previous create_subtree: two auto-commit round-trips per node."""
+    label = label_for_depth(depth, BENCH_LABELS)
+    await session.run(f"MERGE (n:{label} {{id:$id}}) SET n.name = $name", id=node["id"], name=node.get("Name"))
+    if parent_id is not None:
+        parent_label = label_for_depth(depth - 1, BENCH_LABELS)
+        rel = rel_type_for(label, BENCH_LABELS)
+        await session.run(
+            f"MATCH (p:{parent_label} {{id:$pid}}), (c:{label} {{id:$cid}}) MERGE (p)-[:{rel}]->(c)",
+            pid=parent_id, cid=node["id"],
+        )
+    for child in node.get("children", []):
+        await legacy_create_subtree(session, child, depth + 1, node["id"])
+
+
+async def clear(session):
+    for lbl in BENCH_LABELS:
+        await session.run(f"MATCH (n:{lbl}) DETACH DELETE n")
+
+
+async def main(args):
+    roots = synthetic_tree(args.conjunctions, args.groups, args.areas)
+    total = args.conjunctions * (1 + args.groups * (1 + args.areas))
+
+    driver = AsyncGraphDatabase.driver(
+        os.environ["NEO4J_URI"],
+        auth=(os.environ["NEO4J_USER"], os.environ["NEO4J_PASSWORD"]),
+    )
+    try:
+        async with driver.session() as session:
+            await ensure_constraints(session, BENCH_LABELS)
+            await clear(session)
+
+            t0 = time.perf_counter()
+            for root in roots:
+                await legacy_create_subtree(session, root)
+            legacy = time.perf_counter() - t0
+            await clear(session)
+
+            t0 = time.perf_counter()
+            await write_tree(session, roots, batch_size=args.batch_size, labels=BENCH_LABELS)
+            batched = time.perf_counter() - t0
+            await clear(session)
+
+            bulk = None
+            if args.import_dir:
+                t0 = time.perf_counter()
+                await bulk_load(session, roots, args.import_dir, BENCH_LABELS, batch_size=args.batch_size)
+                bulk = time.perf_counter() - t0
+                await clear(session)
+    finally:
+        await driver.close()
+
+    print(f"nodes: {total}")
+    print(f"per-node MERGE : {legacy:8.2f} s  {total / legacy:10.0f} nodes/s")
+    print(f"UNWIND batches : {batched:8.2f} s  {total / batched:10.0f} nodes/s  (batch_size={args.batch_size})")
+    print(f"speed-up       : {legacy / batched:8.1f}x")
+    if bulk is not None:
+        print(f"CSV + LOAD CSV : {bulk:8.2f} s  {total / bulk:10.0f} nodes/s  (incl. writing the files)")
+        print(f"speed-up       : {legacy / bulk:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conjunctions", type=int, default=5)
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--areas", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--import-dir", help="also time the CSV bulk path, writing files here")
+    asyncio.run(main(parser.parse_args()))
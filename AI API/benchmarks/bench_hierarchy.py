@@ -0,0 +1,89 @@
+"""Time build_relation_hierarchy on synthetic page sets.
+
+Compares the iterative builder with the previous three-pass recursive one
+(kept here as ``legacy_build``) at 10k to 1M pages:
+
+    python benchmarks/bench_hierarchy.py --sizes 10000 100000 1000000
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from hierarchy import PUBLIC_FIELDS, build_relation_hierarchy  # noqa: E402
+from benchmarks.synthetic import normalized_pages  # noqa: E402
+
+
+def legacy_build(pages: List[Dict]) -> List[Dict]:
+    """The previous implementation: build, recursive sort, recursive prune."""
+    pages = [p for p in pages if not p["is_sub_area"]]
+    id_to_page = {p["id"]: p for p in pages}
+    id_to_node: Dict[str, Dict] = {}
+
+    def node_for(pid):
+        if pid not in id_to_node:
+            page = id_to_page[pid]
+            n = {k: page[k] for k in PUBLIC_FIELDS if k in page}
+            n["children"] = []
+            n["_number"] = float("inf") if page["number"] is None else page["number"]
+            id_to_node[pid] = n
+        return id_to_node[pid]
+
+    child_ids = set()
+    for p in pages:
+        if p["sub_items"] is not None:
+            parent_node = node_for(p["id"])
+            for cid in p["sub_items"]:
+                if cid in id_to_page:
+                    child_ids.add(cid)
+                    parent_node["children"].append(node_for(cid))
+
+    roots = [node for pid, node in id_to_node.items() if pid not in child_ids]
+
+    def sort_children(node):
+        node["children"].sort(key=lambda c: (c.get("_number", float("inf")), c.get("Name", "")))
+        for c in node["children"]:
+            sort_children(c)
+
+    def prune(node):
+        node.pop("_number", None)
+        if not node["children"]:
+            node.pop("children", None)
+        else:
+            for c in node["children"]:
+                prune(c)
+
+    for r in roots:
+        sort_children(r)
+    for r in roots:
+        prune(r)
+    roots.sort(key=lambda c: (c.get("_number", float("inf")), c.get("Name", "")))
+    return roots
+
+
+def best_of(fn, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(pages)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(args):
+    print(f"{'pages':>9} {'legacy s':>10} {'iterative s':>12} {'pages/s':>12}")
+    for n in args.sizes:
+        pages = normalized_pages(n)
+        legacy = best_of(legacy_build, pages, args.repeat)
+        new = best_of(build_relation_hierarchy, pages, args.repeat)
+        print(f"{n:>9} {legacy:>10.3f} {new:>12.3f} {n / new:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
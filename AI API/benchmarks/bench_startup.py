@@ -0,0 +1,161 @@
+"""Cold-start figures for the API and the graph-sync worker.
+
+* ``import``  – seconds to ``import api`` / ``import graph_sync.main`` in a
+                fresh interpreter
+* ``api``     – from spawning ``uvicorn api:app`` to the first response on
+                ``/``, on ``/readyz`` and on ``/areas-structured``
+* ``worker``  – from spawning ``uvicorn graph_sync.main:app`` to ``/healthz``,
+                to ``/readyz`` (back-fill done, change stream open) and the
+                worker's own time-to-first-sync
+
+The import figures need nothing running. The api figures need MongoDB
+(``--mongo``, default ``MONGO_DETAILS``); the worker also needs a replica
+set and Neo4j (``NEO4J_*``). Whatever cannot be reached is reported as an
+error or timeout instead of a number. Output is JSON, like ``run_suite.py``.
+
+    python benchmarks/bench_startup.py --runs 5 --output startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from benchmarks.run_suite import _git_commit, summarize  # noqa: E402
+
+# Both apps read these at import time; no connection is made by importing.
+PLACEHOLDER_ENV = {"NEO4J_URI": "bolt://localhost:7687", "NEO4J_USER": "neo4j", "NEO4J_PASSWORD": "bench"}
+
+
+def _env(mongo: Optional[str]) -> Dict[str, str]:
+    env = {**PLACEHOLDER_ENV, **os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    if mongo:
+        env["MONGO_DETAILS"] = mongo
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def bench_import(module: str, runs: int) -> Dict[str, Any]:
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, env=_env(None), capture_output=True, text=True, check=True
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return summarize(samples)
+
+
+def _wait_for(client: httpx.Client, path: str, t0: float, timeout: float, ok=(200,)) -> Dict[str, Any]:
+    """Poll ``path`` until it answers with a status in ``ok``; seconds since ``t0``."""
+    last = None
+    while time.perf_counter() - t0 < timeout:
+        try:
+            r = client.get(path)
+            if r.status_code in ok:
+                small_json = r.headers.get("content-type", "").startswith("application/json") and len(r.content) < 4096
+                return {"seconds": time.perf_counter() - t0, "body": r.json() if small_json else None}
+            last = f"HTTP {r.status_code}"
+        except httpx.TransportError as exc:
+            last = type(exc).__name__
+        time.sleep(0.01)
+    return {"timeout_s": timeout, "last": last}
+
+
+def _serve(target: str, mongo: Optional[str], timeout: float, paths: List[str]) -> Dict[str, Any]:
+    port = _free_port()
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=_env(mongo), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=timeout) as client:
+            return {path: _wait_for(client, path, t0, timeout) for path in paths}
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def bench_api(mongo: Optional[str], runs: int, timeout: float) -> Dict[str, Any]:
+    samples = [_serve("api:app", mongo, timeout, ["/", "/readyz", "/areas-structured"]) for _ in range(runs)]
+    return _collect(samples)
+
+
+def bench_worker(mongo: Optional[str], runs: int, timeout: float) -> Dict[str, Any]:
+    samples = [_serve("graph_sync.main:app", mongo, timeout, ["/healthz", "/readyz"]) for _ in range(runs)]
+    out = _collect(samples)
+    first = [s["/readyz"]["body"]["first_sync_s"] for s in samples
+             if (s["/readyz"].get("body") or {}).get("first_sync_s") is not None]
+    # With a saved resume token no sync happens until the next change event.
+    out["first_sync"] = summarize(first) if first else {"runs": 0}
+    return out
+
+
+def _collect(samples: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    out = {}
+    for path in samples[0]:
+        ok = [s[path]["seconds"] for s in samples if "seconds" in s[path]]
+        failed = [s[path] for s in samples if "seconds" not in s[path]]
+        out[path] = {**(summarize(ok) if ok else {"runs": 0}), "failures": len(failed)}
+        if failed:
+            out[path]["last_failure"] = failed[-1]
+    return out
+
+
+def main(args) -> Dict[str, Any]:
+    results = []
+    if "import" in args.only:
+        for module in ("api", "graph_sync.main"):
+            results.append({"bench": "import", "module": module, **bench_import(module, args.runs)})
+            print(f"[INFO] import {module}: done", file=sys.stderr)
+    if "api" in args.only:
+        results.append({"bench": "api", **bench_api(args.mongo, args.runs, args.timeout)})
+        print("[INFO] api: done", file=sys.stderr)
+    if "worker" in args.only:
+        results.append({"bench": "worker", **bench_worker(args.mongo, args.runs, args.timeout)})
+        print("[INFO] worker: done", file=sys.stderr)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--only", nargs="+", choices=["import", "api", "worker"], default=["import", "api", "worker"])
+    parser.add_argument("--mongo", default=os.environ.get("MONGO_DETAILS"), help="Mongo URI for the services")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for each endpoint")
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    text = json.dumps(main(args), indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,302 @@
+"""Benchmark suite with machine-readable output.
+
+Runs each benchmark over synthetic Notion page sets (``synthetic.py``) and
+writes one JSON document with latency / throughput figures, so runs can be
+compared over time:
+
+* ``hierarchy``        – ``build_relation_hierarchy`` on normalized pages
+* ``graph_diff``       – snapshot + structural diff after a rename (the
+                         in-process part of every graph sync)
+* ``mirror``           – ``_mirror_notion_to_mongo`` full and incremental
+                         runs against ``tests/fake_notion.py``
+* ``areas_structured`` – ``/areas-structured`` cold, warm, 304 and NDJSON
+* ``sync_lag``         – end-to-end Mongo → Neo4j lag through a running
+                         graph-sync worker (``--e2e`` only)
+
+Mongo is ``mongomock_motor`` (requirements-dev.txt) unless ``--mongo`` is
+given, e.g. a local container. mongomock upserts scan the whole collection,
+so its mirror figures are only comparable with each other, and the Mongo
+benchmarks are skipped above MONGOMOCK_MAX_PAGES. ``--e2e`` needs a
+replica-set Mongo, Neo4j (``NEO4J_*``) and the worker running against both.
+
+    python benchmarks/run_suite.py --sizes 1000 10000 100000 --output bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import contextlib
+import platform
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+# api.py reads these at import time; no Neo4j connection is made here.
+for _var, _value in {
+    "NEO4J_URI": "bolt://localhost:7687", "NEO4J_USER": "neo4j", "NEO4J_PASSWORD": "bench",
+    "NOTION_TOKEN": "bench", "NOTION_DATABASE_ID": "bench-db",
+}.items():
+    os.environ.setdefault(_var, _value)
+
+from benchmarks.synthetic import normalized_pages, raw_pages  # noqa: E402
+from graph_writer import diff_snapshots, snapshot_tree  # noqa: E402
+from hierarchy import build_relation_hierarchy  # noqa: E402
+
+MONGOMOCK_MAX_PAGES = 10000
+
+
+def summarize(samples: List[float], items: Optional[int] = None) -> Dict[str, Any]:
+    """Latency figures in milliseconds (plus items/s when ``items`` is given)."""
+    ordered = sorted(samples)
+    out = {
+        "runs": len(ordered),
+        "min_ms": 1000 * ordered[0],
+        "median_ms": 1000 * statistics.median(ordered),
+        "p95_ms": 1000 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "max_ms": 1000 * ordered[-1],
+    }
+    if items is not None:
+        out["items_per_s"] = items / statistics.median(ordered)
+    return out
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+async def atimed(fn: Callable[[], Any], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+# -------------------- in-process benchmarks -----------------------------
+
+def bench_hierarchy(n: int, repeat: int) -> Dict[str, Any]:
+    pages = normalized_pages(n)
+    return summarize(timed(lambda: build_relation_hierarchy(pages), repeat), items=n)
+
+
+def bench_graph_diff(n: int, repeat: int) -> Dict[str, Any]:
+    pages = normalized_pages(n)
+    old = snapshot_tree(build_relation_hierarchy(pages))
+    renamed = [dict(p) for p in pages]
+    renamed[len(renamed) // 2]["Name"] += " (renamed)"
+    new_roots = build_relation_hierarchy(renamed)
+    return summarize(timed(lambda: diff_snapshots(old, snapshot_tree(new_roots)), repeat), items=n)
+
+
+# -------------------- Mongo-backed benchmarks ---------------------------
+
+def mongo_database(uri: Optional[str]):
+    if uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        return AsyncIOMotorClient(uri)[f"bench_{uuid.uuid4().hex[:8]}"], "motor"
+    from mongomock_motor import AsyncMongoMockClient
+    _mongomock_compat()
+    return AsyncMongoMockClient()["bench"], "mongomock_motor"
+
+
+def _mongomock_compat():
+    """mongomock 4.3 predates pymongo 4.11's ``sort`` on ReplaceOne/UpdateOne
+    in bulk writes; accept and ignore it (the mirror never sets it)."""
+    from mongomock.collection import BulkOperationBuilder
+
+    if getattr(BulkOperationBuilder, "_bench_compat", False):
+        return
+    add_replace, add_update = BulkOperationBuilder.add_replace, BulkOperationBuilder.add_update
+    BulkOperationBuilder.add_replace = lambda self, *a, sort=None, **kw: add_replace(self, *a, **kw)
+    BulkOperationBuilder.add_update = lambda self, *a, sort=None, **kw: add_update(self, *a, **kw)
+    BulkOperationBuilder._bench_compat = True
+
+
+async def bench_mirror(api, n: int) -> Dict[str, Any]:
+    import httpx
+    from notion_source import NotionSource, TokenBucket
+    from tests.fake_notion import create_app
+
+    fake = create_app(raw_pages(n))
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake))
+    api.app.notion_source = NotionSource(
+        "bench", limiter=TokenBucket(rate=1e6), base_url="http://fake-notion", http_client=http
+    )
+    try:
+        await api.app.mongodb[api.SYNC_STATE_COLLECTION].delete_many({})
+        full = await atimed(lambda: api._mirror_notion_to_mongo(full=True), 1)
+        requests_full = fake.state.requests
+        incremental = await atimed(lambda: api._mirror_notion_to_mongo(), 3)
+        stored = await api.app.mongodb[api.COLLECTION_NAME].count_documents({})
+    finally:
+        await api.app.notion_source.aclose()
+        api.app.notion_source = None
+    return {
+        "full": {**summarize(full, items=n), "notion_requests": requests_full},
+        "incremental_unchanged": summarize(incremental),
+        "documents": stored,
+    }
+
+
+async def bench_areas_structured(api, requests: int) -> Dict[str, Any]:
+    import httpx
+    from areas_cache import AreasTreeCache
+
+    api.app.areas_cache = AreasTreeCache(api._load_areas_tree)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://api") as client:
+        async def cold():
+            api.app.areas_cache.invalidate()
+            (await client.get("/areas-structured")).raise_for_status()
+
+        async def warm():
+            (await client.get("/areas-structured")).raise_for_status()
+
+        cold_samples = await atimed(cold, 3)
+        etag = (await client.get("/areas-structured")).headers["etag"]
+
+        async def not_modified():
+            r = await client.get("/areas-structured", headers={"If-None-Match": etag})
+            assert r.status_code == 304
+
+        async def ndjson():
+            (await client.get("/areas-structured", params={"format": "ndjson"})).raise_for_status()
+
+        return {
+            "cold": summarize(cold_samples),
+            "warm": summarize(await atimed(warm, requests)),
+            "not_modified": summarize(await atimed(not_modified, requests)),
+            "ndjson": summarize(await atimed(ndjson, max(3, requests // 10))),
+            "body_bytes": len(api.app.areas_cache.body),
+        }
+
+
+# -------------------- end-to-end (live services) ------------------------
+
+async def bench_sync_lag(api, samples: int, timeout: float = 30.0) -> Dict[str, Any]:
+    """Rename an Area in Mongo and wait until the worker has written it to Neo4j."""
+    from neo4j import AsyncGraphDatabase
+
+    collection = api.app.mongodb[api.COLLECTION_NAME]
+    doc = await collection.find_one({"normalized.is_sub_area": False, "normalized.level": "Area"})
+    if not doc:
+        return {"skipped": "no Area documents in the areas collection"}
+    original = doc["normalized"]["Name"]
+
+    driver = AsyncGraphDatabase.driver(
+        os.environ["NEO4J_URI"], auth=(os.environ["NEO4J_USER"], os.environ["NEO4J_PASSWORD"])
+    )
+    lags, timeouts = [], 0
+    try:
+        for i in range(samples):
+            marker = f"{original} [bench {uuid.uuid4().hex[:6]}]"
+            t0 = time.perf_counter()
+            await collection.update_one({"_id": doc["_id"]}, {"$set": {"normalized.Name": marker}})
+            while time.perf_counter() - t0 < timeout:
+                records, _, _ = await driver.execute_query(
+                    "MATCH (n {id: $id}) WHERE n.name = $name RETURN n.id", id=doc["id"], name=marker
+                )
+                if records:
+                    lags.append(time.perf_counter() - t0)
+                    break
+                await asyncio.sleep(0.02)
+            else:
+                timeouts += 1
+    finally:
+        await collection.update_one({"_id": doc["_id"]}, {"$set": {"normalized.Name": original}})
+        await driver.close()
+    return {**(summarize(lags) if lags else {"runs": 0}), "timeouts": timeouts}
+
+
+# -------------------- driver ---------------------------------------------
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+async def main(args) -> Dict[str, Any]:
+    import api
+
+    results: List[Dict[str, Any]] = []
+
+    def record(bench: str, size: Optional[int], metrics: Dict[str, Any]):
+        results.append({"bench": bench, "size": size, **metrics})
+        print(f"[INFO] {bench:<17} size={size}: done", file=sys.stderr)
+
+    selected = set(args.only or ["hierarchy", "graph_diff", "mirror", "areas_structured"])
+    if args.e2e:
+        selected.add("sync_lag")
+
+    for n in args.sizes:
+        if "hierarchy" in selected:
+            record("hierarchy", n, bench_hierarchy(n, args.repeat))
+        if "graph_diff" in selected:
+            record("graph_diff", n, bench_graph_diff(n, args.repeat))
+
+        if selected & {"mirror", "areas_structured"} and not args.mongo and n > MONGOMOCK_MAX_PAGES:
+            for bench in sorted(selected & {"mirror", "areas_structured"}):
+                record(bench, n, {"skipped": f"mongomock above {MONGOMOCK_MAX_PAGES} pages; pass --mongo"})
+        elif selected & {"mirror", "areas_structured"}:
+            api.app.mongodb, backend = mongo_database(args.mongo)
+            api.app.areas_cache = api.AreasTreeCache(api._load_areas_tree)
+            # The mirror run is also what fills Mongo for /areas-structured.
+            record("mirror", n, {"mongo": backend, **await bench_mirror(api, n)})
+            if "areas_structured" in selected:
+                record("areas_structured", n, {"mongo": backend, **await bench_areas_structured(api, args.requests)})
+            if args.mongo:
+                await api.app.mongodb.client.drop_database(api.app.mongodb.name)
+
+    if "sync_lag" in selected:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        api.app.mongodb = AsyncIOMotorClient(args.mongo or api.MONGO_DETAILS)[api.DATABASE_NAME]
+        record("sync_lag", None, await bench_sync_lag(api, args.lag_samples))
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per in-process benchmark")
+    parser.add_argument("--requests", type=int, default=50, help="requests per /areas-structured variant")
+    parser.add_argument("--only", nargs="+", choices=["hierarchy", "graph_diff", "mirror", "areas_structured"])
+    parser.add_argument("--mongo", help="Mongo URI to use instead of mongomock_motor")
+    parser.add_argument("--e2e", action="store_true", help="also measure Mongo → Neo4j sync lag")
+    parser.add_argument("--lag-samples", type=int, default=10)
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    # The services log to stdout; keep it for the report.
+    with contextlib.redirect_stdout(sys.stderr):
+        report = asyncio.run(main(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,93 @@
+"""Synthetic Notion page sets shaped like the real Areas database.
+
+Roughly 0.1 % Conjunctions, 2 % Groups, 10 % Sub-Areas and the rest Areas,
+wired together through 'Sub-item' relations, with about half the pages
+carrying a '#' order number. ``raw_pages`` yields Notion API page objects
+(as the mirror stores them), ``normalized_pages`` the compact form the
+hierarchy builder consumes.
+"""
+
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+
+def _layout(n: int, seed: int) -> List[Dict]:
+    rng = random.Random(seed)
+    n_conj = max(1, n // 1000)
+    n_group = max(1, n // 50)
+    n_sub = n // 10
+    n_area = max(1, n - n_conj - n_group - n_sub)
+
+    def new(level: str, i: int) -> Dict:
+        return {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "Name": f"{i:05d}. {level} {i}",
+            "level": level,
+            "number": float(i) if rng.random() < 0.5 else None,
+            "sub_items": [],
+        }
+
+    conj = [new("Conjunction", i) for i in range(n_conj)]
+    groups = [new("Group", i) for i in range(n_group)]
+    areas = [new("Area", i) for i in range(n_area)]
+    subs = [new("Sub-Area", i) for i in range(n_sub)]
+
+    for i, g in enumerate(groups):
+        conj[i % n_conj]["sub_items"].append(g["id"])
+    for a in areas:
+        rng.choice(groups)["sub_items"].append(a["id"])
+    for s in subs:
+        rng.choice(areas)["sub_items"].append(s["id"])
+    return conj + groups + areas + subs
+
+
+def normalized_pages(n: int, seed: int = 0) -> List[Dict]:
+    return [
+        {
+            "id": p["id"],
+            "Name": p["Name"],
+            "level": p["level"],
+            "is_sub_area": p["level"] == "Sub-Area",
+            "number": p["number"],
+            "sub_items": p["sub_items"],
+        }
+        for p in _layout(n, seed)
+    ]
+
+
+def raw_page(p: Dict, last_edited_time: Optional[str] = None) -> Dict:
+    return {
+        "object": "page",
+        "id": p["id"],
+        "last_edited_time": last_edited_time or "2024-01-01T00:00:00.000Z",
+        "archived": False,
+        "in_trash": False,
+        "url": f"https://www.notion.so/{p['id'].replace('-', '')}",
+        "icon": None,
+        "cover": None,
+        "properties": {
+            "Name": {"id": "title", "type": "title", "title": [{
+                "type": "text",
+                "text": {"content": p["Name"], "link": None},
+                "annotations": {"bold": False, "italic": False, "strikethrough": False,
+                                "underline": False, "code": False, "color": "default"},
+                "plain_text": p["Name"],
+                "href": None,
+            }]},
+            "Level": {"id": "lvl", "type": "select", "select": {"id": "x", "name": p["level"], "color": "blue"}},
+            "#": {"id": "num", "type": "number", "number": p["number"]},
+            "Sub-item": {"id": "sub", "type": "relation", "has_more": False,
+                         "relation": [{"id": c} for c in p["sub_items"]]},
+        },
+    }
+
+
+def raw_pages(n: int, seed: int = 0) -> List[Dict]:
+    """Notion page objects, edited one minute apart in page order."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        raw_page(p, (start + timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:00.000Z"))
+        for i, p in enumerate(_layout(n, seed))
+    ]
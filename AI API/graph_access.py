@@ -0,0 +1,377 @@
+"""Neo4j access layer for the API's ``/graph/*`` endpoints.
+
+* one driver with pool settings taken from the environment,
+* every query runs as a managed ``execute_read`` / ``execute_write``
+  transaction function, so transient failures are retried by the driver and
+  reads can be routed to read replicas (``neo4j://`` URIs),
+* a per-query server-side timeout,
+* a semaphore bounding how many queries run at once; callers queue for a
+  slot (up to ``queue_timeout``) instead of piling onto the connection pool,
+* a server-side row cap: ``query_page`` returns at most ``max_rows`` records
+  plus an opaque cursor for the next page (read-only queries ending in a
+  plain RETURN), and ``stream`` yields records as the driver receives them,
+  so no result is ever held in full,
+* queue-wait and query-latency statistics for ``/graph/metrics`` (and as
+  histograms in ``/metrics``).
+
+The ``neo4j`` package (slow to import) is only imported once a driver is
+created or a query runs, so it stays off the API's cold-start path.
+"""
+
+import os
+import re
+import json
+import time
+import base64
+import asyncio
+import hashlib
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from instrumentation import counter, gauge, histogram
+
+NEO4J_MAX_POOL_SIZE = int(os.environ.get("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_ACQUIRE_TIMEOUT = float(os.environ.get("NEO4J_ACQUIRE_TIMEOUT", "30"))
+NEO4J_MAX_RETRY_TIME = float(os.environ.get("NEO4J_MAX_RETRY_TIME", "15"))
+NEO4J_DATABASE = os.environ.get("NEO4J_DATABASE") or None
+
+# Per-query transaction timeout (seconds) and concurrency bound.
+NEO4J_QUERY_TIMEOUT = float(os.environ.get("NEO4J_QUERY_TIMEOUT", "30"))
+NEO4J_MAX_CONCURRENT_QUERIES = int(os.environ.get("NEO4J_MAX_CONCURRENT_QUERIES", "8"))
+NEO4J_QUEUE_TIMEOUT = float(os.environ.get("NEO4J_QUEUE_TIMEOUT", "10"))
+
+# Most records one JSON page may hold, and one NDJSON stream may carry.
+NEO4J_MAX_ROWS = int(os.environ.get("NEO4J_MAX_ROWS", "5000"))
+NEO4J_MAX_STREAM_ROWS = int(os.environ.get("NEO4J_MAX_STREAM_ROWS", "1000000"))
+
+# Anything that can modify the graph; string literals are stripped first.
+# Subqueries and procedure calls other than db.* count as writes, so an
+# unrecognised query errs on the side of the leader.
+_WRITE_CLAUSE = re.compile(
+    r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV)\b|\bCALL\b(?!\s+db\.)",
+    re.IGNORECASE,
+)
+_STRING_LITERAL = re.compile(r"'(?:\\.|[^'\\])*'|\"(?:\\.|[^\"\\])*\"|`[^`]*`")
+
+
+def is_read_only(query: str) -> bool:
+    """Best-effort check that ``query`` cannot write (routes it to a reader)."""
+    return not _WRITE_CLAUSE.search(_STRING_LITERAL.sub("''", query))
+
+
+def create_driver(uri: str, user: str, password: str):
+    from neo4j import AsyncGraphDatabase
+
+    return AsyncGraphDatabase.driver(
+        uri,
+        auth=(user, password),
+        max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+        connection_acquisition_timeout=NEO4J_ACQUIRE_TIMEOUT,
+        max_transaction_retry_time=NEO4J_MAX_RETRY_TIME,
+    )
+
+
+QUEUE_WAIT_SECONDS = histogram("neo4j_queue_wait_seconds", "Time spent waiting for a Neo4j query slot")
+QUERY_SECONDS = histogram("neo4j_query_seconds", "Neo4j query latency, by access mode", ["mode"])
+QUERIES_FAILED = counter("neo4j_queries_failed_total", "Neo4j queries that raised, by access mode", ["mode"])
+QUERIES_REJECTED = counter("neo4j_queries_rejected_total", "Queries refused because no slot came free")
+QUERIES_RUNNING = gauge("neo4j_queries_running", "Neo4j queries currently holding a slot")
+
+
+class GraphBusy(Exception):
+    """No query slot became free within the queue timeout."""
+
+
+# -------------------- pagination cursors --------------------------------
+
+def _query_fingerprint(cypher: str, params: Optional[Dict]) -> str:
+    raw = json.dumps([cypher, params or {}], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_cursor(cypher: str, params: Optional[Dict], skip: int) -> str:
+    raw = json.dumps({"q": _query_fingerprint(cypher, params), "skip": skip})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, cypher: str, params: Optional[Dict]) -> int:
+    """Offset stored in ``cursor``; ``ValueError`` if it belongs to another query."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        skip = int(data["skip"])
+    except Exception:
+        raise ValueError("malformed cursor") from None
+    if data.get("q") != _query_fingerprint(cypher, params) or skip < 0:
+        raise ValueError("cursor does not belong to this query")
+    return skip
+
+
+_RETURN = re.compile(r"\bRETURN\b", re.IGNORECASE)
+_NOT_PAGEABLE = re.compile(r"^\s*(EXPLAIN|PROFILE)\b|\bUNION\b", re.IGNORECASE)
+_PAGING_CLAUSE = re.compile(r"\b(SKIP|OFFSET|LIMIT)\b", re.IGNORECASE)
+
+
+def is_pageable(cypher: str) -> bool:
+    """True if ``skip_query`` can page ``cypher``: it ends in a plain RETURN
+    (outside any subquery) that has no SKIP/LIMIT of its own, and it is not
+    a UNION or an EXPLAIN/PROFILE."""
+    text = _STRING_LITERAL.sub("''", cypher).strip().rstrip(";")
+    if _NOT_PAGEABLE.search(text):
+        return False
+    returns = list(_RETURN.finditer(text))
+    if not returns:
+        return False
+    tail = text[returns[-1].end():]
+    return "}" not in tail and not _PAGING_CLAUSE.search(tail)
+
+
+def skip_query(cypher: str) -> str:
+    """``cypher`` with SKIP/LIMIT appended to its final RETURN; every page,
+    the first included, runs this same statement (see ``is_pageable``)."""
+    return f"{cypher.strip().rstrip(';')} SKIP $__skip LIMIT $__limit"
+
+
+class LatencyStats:
+    """Count / mean / max plus percentiles over the most recent samples."""
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._recent.append(seconds)
+
+    def snapshot(self) -> Dict[str, float]:
+        recent = sorted(self._recent)
+
+        def pct(p: float) -> float:
+            return recent[min(len(recent) - 1, int(p * len(recent)))] if recent else 0.0
+
+        return {
+            "count": self.count,
+            "mean_ms": 1000 * self.total / self.count if self.count else 0.0,
+            "p50_ms": 1000 * pct(0.50),
+            "p95_ms": 1000 * pct(0.95),
+            "max_ms": 1000 * self.max,
+        }
+
+
+class GraphAccess:
+    def __init__(
+        self,
+        driver,
+        max_concurrent: int = NEO4J_MAX_CONCURRENT_QUERIES,
+        timeout: float = NEO4J_QUERY_TIMEOUT,
+        queue_timeout: float = NEO4J_QUEUE_TIMEOUT,
+        database: Optional[str] = NEO4J_DATABASE,
+        max_rows: int = NEO4J_MAX_ROWS,
+        max_stream_rows: int = NEO4J_MAX_STREAM_ROWS,
+    ):
+        self.driver = driver
+        self.timeout = timeout
+        self.max_rows = max_rows
+        self.max_stream_rows = max_stream_rows
+        self.queue_timeout = queue_timeout
+        self.database = database
+        self.max_concurrent = max_concurrent
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+        self._running = 0
+
+        self.queue_wait = LatencyStats()
+        self.query_latency = LatencyStats()
+        self.rejected = 0
+        self.failed = 0
+
+    async def close(self):
+        await self.driver.close()
+
+    async def _acquire_slot(self):
+        t0 = time.perf_counter()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            QUERIES_REJECTED.inc()
+            raise GraphBusy(f"no Neo4j query slot free after {self.queue_timeout:g} s") from None
+        finally:
+            self._waiting -= 1
+        waited = time.perf_counter() - t0
+        self.queue_wait.observe(waited)
+        QUEUE_WAIT_SECONDS.observe(waited)
+        QUERIES_RUNNING.inc()
+
+    async def _execute(self, write: bool, work: Callable[..., Awaitable[Any]], *args, timeout=None, **kwargs):
+        from neo4j import unit_of_work
+
+        work = unit_of_work(timeout=timeout or self.timeout)(work)
+        await self._acquire_slot()
+        self._running += 1
+        t0 = time.perf_counter()
+        try:
+            async with self.driver.session(database=self.database) as session:
+                execute = session.execute_write if write else session.execute_read
+                return await execute(work, *args, **kwargs)
+        except Exception:
+            self.failed += 1
+            QUERIES_FAILED.inc(mode="write" if write else "read")
+            raise
+        finally:
+            self._release(t0, "write" if write else "read")
+
+    def _release(self, started: float, mode: str):
+        elapsed = time.perf_counter() - started
+        self.query_latency.observe(elapsed)
+        QUERY_SECONDS.observe(elapsed, mode=mode)
+        QUERIES_RUNNING.dec()
+        self._running -= 1
+        self._slots.release()
+
+    async def read(self, work, *args, timeout: Optional[float] = None, **kwargs):
+        """Run ``work(tx, *args, **kwargs)`` as a retried read transaction."""
+        return await self._execute(False, work, *args, timeout=timeout, **kwargs)
+
+    async def write(self, work, *args, timeout: Optional[float] = None, **kwargs):
+        """Run ``work(tx, *args, **kwargs)`` as a retried write transaction."""
+        return await self._execute(True, work, *args, timeout=timeout, **kwargs)
+
+    async def query(self, cypher: str, params: Optional[Dict] = None, timeout: Optional[float] = None) -> List[Dict]:
+        """Run ad-hoc Cypher; read-only statements go through ``execute_read``.
+
+        At most ``max_rows`` records are returned; see ``query_page``.
+        """
+        rows, _ = await self.query_page(cypher, params, timeout=timeout)
+        return rows
+
+    async def query_page(
+        self,
+        cypher: str,
+        params: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """One page of at most ``min(page_size, max_rows)`` records plus the
+        cursor for the next page (``None`` on the last one).
+
+        Every page runs the same statement with SKIP/LIMIT pushed into the
+        database (``skip_query``), so a cursor is only handed out for a page
+        that can be fetched the same way. Pages are only stable if the query
+        has an ORDER BY.
+
+        Only read-only queries that ``is_pageable`` accepts are paged; a later
+        page re-runs the statement, which would repeat a write's side effects.
+        Other queries run once as is and return at most one page and no
+        cursor; a ``cursor`` for one is a ``ValueError``. Stream large results
+        of those instead (``stream``). Cypher errors the server reports
+        (``ClientError``) are raised as ``ValueError`` too.
+        """
+        from neo4j.exceptions import ClientError
+
+        read_only = is_read_only(cypher)
+        paged = read_only and is_pageable(cypher)
+        if cursor and not paged:
+            raise ValueError(
+                "cursors are only supported for read-only queries ending in a plain RETURN; use format=ndjson instead"
+            )
+        limit = min(page_size or self.max_rows, self.max_rows)
+        skip = decode_cursor(cursor, cypher, params) if cursor else 0
+        text, args = cypher, dict(params or {})
+        if paged:
+            text = skip_query(cypher)
+            args.update(__skip=skip, __limit=limit + 1)
+
+        async def work(tx):
+            result = await tx.run(text, args)
+            rows = []
+            # One record past the page tells whether another page exists.
+            async for record in result:
+                rows.append(record.data())
+                if len(rows) > limit:
+                    break
+            if not read_only:
+                # The write runs to completion even past the rows returned.
+                await result.consume()
+            return rows
+
+        try:
+            rows = await (self.read if read_only else self.write)(work, timeout=timeout)
+        except ClientError as exc:
+            raise ValueError(exc.message or str(exc)) from exc
+        if len(rows) > limit:
+            return rows[:limit], encode_cursor(cypher, params, skip + limit) if paged else None
+        return rows, None
+
+    async def stream(
+        self,
+        cypher: str,
+        params: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        max_rows: Optional[int] = None,
+    ) -> AsyncIterator[Dict]:
+        """Start ``cypher`` and return an iterator over its records.
+
+        The query slot is taken (and the query sent) before this returns, so
+        ``GraphBusy`` and Cypher errors surface here rather than mid-stream.
+        Records are yielded as the driver fetches them, up to ``max_rows``;
+        the slot is held until the iterator is exhausted or closed. Streams
+        run as auto-commit transactions and are not retried.
+        """
+        from neo4j import READ_ACCESS, WRITE_ACCESS, Query
+
+        max_rows = min(max_rows or self.max_stream_rows, self.max_stream_rows)
+        await self._acquire_slot()
+        self._running += 1
+        t0 = time.perf_counter()
+        session = self.driver.session(
+            database=self.database,
+            default_access_mode=READ_ACCESS if is_read_only(cypher) else WRITE_ACCESS,
+        )
+
+        async def finish(failed: bool):
+            if failed:
+                self.failed += 1
+                QUERIES_FAILED.inc(mode="stream")
+            await session.close()
+            self._release(t0, "stream")
+
+        try:
+            result = await session.run(Query(cypher, timeout=timeout or self.timeout), params or {})
+        except BaseException:
+            await finish(True)
+            raise
+
+        async def records():
+            failed = False
+            sent = 0
+            try:
+                async for record in result:
+                    if sent >= max_rows:
+                        break
+                    yield record.data()
+                    sent += 1
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                await finish(failed)
+
+        return records()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self._running,
+            "waiting": self._waiting,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "queue_wait": self.queue_wait.snapshot(),
+            "query_latency": self.query_latency.snapshot(),
+        }
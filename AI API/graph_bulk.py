@@ -0,0 +1,150 @@
+"""Bulk load of the Conjunction → Group → Area tree through CSV files.
+
+For bootstrapping or rebuilding a graph the per-batch MERGE transactions of
+``graph_writer.write_tree`` are still dominated by Bolt round-trips. Here the
+flattened tree is written to one CSV file per label and per relationship
+type instead, and then either
+
+* ingested by the server with ``LOAD CSV`` in ``CALL { … } IN TRANSACTIONS``
+  batches (``load_csv``), which works on a live database as long as the files
+  land in (or are reachable from) Neo4j's import directory, or
+* handed to ``neo4j-admin database import full`` (``admin_import_command``),
+  the fastest path, but only for an empty, stopped database.
+"""
+
+import csv
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from graph_writer import DEFAULT_BATCH_SIZE, LABELS, EdgeKey, flatten_tree
+
+# Directory the CSV files are written to and how Neo4j addresses it in
+# LOAD CSV. With the default server settings that is the ``import`` directory
+# and ``file:///<name>``.
+NEO4J_IMPORT_DIR = os.environ.get("NEO4J_IMPORT_DIR")
+NEO4J_IMPORT_URL = os.environ.get("NEO4J_IMPORT_URL", "file:///")
+
+
+def node_file(label: str) -> str:
+    return f"nodes_{label}.csv"
+
+
+def edge_file(key: EdgeKey) -> str:
+    parent_label, child_label, rel = key
+    return f"rels_{parent_label}_{rel}_{child_label}.csv"
+
+
+def write_csv(
+    roots: Iterable[Dict[str, Any]],
+    out_dir: os.PathLike,
+    labels: Sequence[str] = LABELS,
+    admin: bool = False,
+) -> Dict[str, Any]:
+    """Write node / relationship CSVs for ``roots`` into ``out_dir``.
+
+    ``admin=True`` uses the ``neo4j-admin`` header syntax (one ID space per
+    label). Returns a manifest ``{"nodes": {label: (file, rows)},
+    "edges": {edge key: (file, rows)}}``; labels / keys without rows are
+    left out.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    nodes, edges = flatten_tree(roots, labels)
+    manifest: Dict[str, Any] = {"nodes": {}, "edges": {}}
+
+    for label, rows in nodes.items():
+        if not rows:
+            continue
+        name = node_file(label)
+        with open(out_dir / name, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([f"id:ID({label})", "name"] if admin else ["id", "name"])
+            writer.writerows((row["id"], row["name"] or "") for row in rows)
+        manifest["nodes"][label] = (name, len(rows))
+
+    for key, rows in edges.items():
+        parent_label, child_label, _ = key
+        name = edge_file(key)
+        with open(out_dir / name, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                [f":START_ID({parent_label})", f":END_ID({child_label})"] if admin else ["pid", "cid"]
+            )
+            writer.writerows((row["pid"], row["cid"]) for row in rows)
+        manifest["edges"][key] = (name, len(rows))
+
+    return manifest
+
+
+async def load_csv(
+    session,
+    manifest: Dict[str, Any],
+    url_prefix: str = NEO4J_IMPORT_URL,
+    batch_size: Optional[int] = None,
+) -> int:
+    """Ingest a ``write_csv`` manifest with LOAD CSV; returns nodes loaded.
+
+    ``CALL { … } IN TRANSACTIONS`` needs an auto-commit transaction, so these
+    go through ``session.run`` rather than ``execute_write``. Nodes are loaded
+    before relationships and MERGEd, so re-running is harmless.
+    """
+    batch_size = int(batch_size or DEFAULT_BATCH_SIZE)
+
+    for label, (name, _) in manifest["nodes"].items():
+        result = await session.run(
+            f"LOAD CSV WITH HEADERS FROM $url AS row "
+            f"CALL {{ WITH row MERGE (n:{label} {{id: row.id}}) SET n.name = row.name }} "
+            f"IN TRANSACTIONS OF {batch_size} ROWS",
+            url=url_prefix + name,
+        )
+        await result.consume()
+
+    for (parent_label, child_label, rel), (name, _) in manifest["edges"].items():
+        result = await session.run(
+            f"LOAD CSV WITH HEADERS FROM $url AS row "
+            f"CALL {{ WITH row "
+            f"MATCH (p:{parent_label} {{id: row.pid}}) "
+            f"MATCH (c:{child_label} {{id: row.cid}}) "
+            f"MERGE (p)-[:{rel}]->(c) }} "
+            f"IN TRANSACTIONS OF {batch_size} ROWS",
+            url=url_prefix + name,
+        )
+        await result.consume()
+
+    return sum(rows for _, rows in manifest["nodes"].values())
+
+
+async def bulk_load(
+    session,
+    roots: Iterable[Dict[str, Any]],
+    import_dir: os.PathLike,
+    labels: Sequence[str] = LABELS,
+    url_prefix: str = NEO4J_IMPORT_URL,
+    batch_size: Optional[int] = None,
+) -> int:
+    """``write_csv`` into ``import_dir`` followed by ``load_csv``."""
+    manifest = write_csv(roots, import_dir, labels)
+    return await load_csv(session, manifest, url_prefix, batch_size)
+
+
+def admin_import_command(
+    manifest: Dict[str, Any],
+    out_dir: os.PathLike,
+    database: str = "neo4j",
+    overwrite: bool = False,
+) -> List[str]:
+    """argv for ``neo4j-admin database import full`` over an ``admin=True`` manifest.
+
+    Without ``overwrite`` neo4j-admin refuses a database that already exists;
+    with it the existing data is replaced.
+    """
+    out_dir = Path(out_dir)
+    argv = ["neo4j-admin", "database", "import", "full", database]
+    if overwrite:
+        argv.append("--overwrite-destination")
+    for label, (name, _) in manifest["nodes"].items():
+        argv.append(f"--nodes={label}={out_dir / name}")
+    for (_, _, rel), (name, _) in manifest["edges"].items():
+        argv.append(f"--relationships={rel}={out_dir / name}")
+    return argv
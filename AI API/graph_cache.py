@@ -0,0 +1,145 @@
+"""Read-through cache for Neo4j read results, invalidated by a graph version.
+
+The graph version is a counter in ``sync_state``::
+
+    {"_id": "graph_version", "version": <int>, "updated_at": <epoch s>}
+
+Everything that writes to Neo4j (the graph-sync worker after each committed
+sync, the API's write endpoints) bumps it with ``bump_graph_version``. Cache
+keys include the version read at lookup time, so a bump makes every older
+entry unreachable at once; those entries then age out of the LRU.
+
+``QueryCache`` is a size- and TTL-bounded LRU. Concurrent misses on the same
+key share a single load.
+"""
+
+import os
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from instrumentation import counter, gauge
+
+GRAPH_VERSION_ID = "graph_version"
+
+GRAPH_CACHE_MAX_ENTRIES = int(os.environ.get("GRAPH_CACHE_MAX_ENTRIES", "1024"))
+GRAPH_CACHE_TTL_SECONDS = float(os.environ.get("GRAPH_CACHE_TTL_SECONDS", "300"))
+
+CACHE_LOOKUPS = counter("graph_query_cache_lookups_total", "Graph query cache lookups, by result", ["result"])
+CACHE_EVICTIONS = counter("graph_query_cache_evictions_total", "Graph query cache evictions, by reason", ["reason"])
+CACHE_ENTRIES = gauge("graph_query_cache_entries", "Entries currently held by the graph query cache")
+
+
+# -------------------- graph version -------------------------------------
+
+async def read_graph_version(state_collection) -> int:
+    doc = await state_collection.find_one({"_id": GRAPH_VERSION_ID}, {"version": 1})
+    return int(doc["version"]) if doc else 0
+
+
+async def bump_graph_version(state_collection) -> int:
+    """Record that Neo4j changed; returns the new version."""
+    doc = await state_collection.find_one_and_update(
+        {"_id": GRAPH_VERSION_ID},
+        {"$inc": {"version": 1}, "$set": {"updated_at": time.time()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return int(doc["version"])
+
+
+def params_key(params: Optional[Dict[str, Any]]) -> str:
+    """Canonical, hashable form of query parameters."""
+    return json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+# -------------------- LRU + TTL cache -----------------------------------
+
+class QueryCache:
+    def __init__(self, max_entries: int = GRAPH_CACHE_MAX_ENTRIES, ttl: float = GRAPH_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (expires_at, value); most recently used last.
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """``(True, value)`` for a live entry, else ``(False, None)``."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            CACHE_EVICTIONS.inc(reason="ttl")
+            CACHE_ENTRIES.set(len(self._entries))
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            CACHE_EVICTIONS.inc(reason="size")
+        CACHE_ENTRIES.set(len(self._entries))
+
+    def clear(self):
+        self._entries.clear()
+        CACHE_ENTRIES.set(0)
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """``(value, hit)``; on a miss ``load()`` runs once per key at a time."""
+        hit, value = self.get(key)
+        if hit:
+            self.hits += 1
+            CACHE_LOOKUPS.inc(result="hit")
+            return value, True
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            self.hits += 1
+            CACHE_LOOKUPS.inc(result="shared")
+            return await asyncio.shield(pending), True
+
+        self.misses += 1
+        CACHE_LOOKUPS.inc(result="miss")
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await load()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Waiters re-raise it; nobody else has to retrieve it.
+            future.exception()
+            raise
+        finally:
+            del self._loading[key]
+        future.set_result(value)
+        self.put(key, value)
+        return value, False
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,138 @@
+"""Batched relationship upserts for ``POST /graph/edges:batch``.
+
+Items are validated, their endpoints resolved to a label with one indexed
+lookup per tree label of every mirrored database
+(``notion_databases.graph_labels``, which carry the ``id`` uniqueness
+constraints), then grouped by ``(source label, target label,
+rel_type)`` and written with labelled ``UNWIND … MERGE`` statements,
+``chunk_size`` rows per write transaction. Every item gets a status:
+``created``, ``updated``, ``invalid``, ``not_found`` or ``error``.
+"""
+
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from notion_databases import graph_labels
+
+EDGE_BATCH_MAX_ITEMS = int(os.environ.get("EDGE_BATCH_MAX_ITEMS", "10000"))
+EDGE_BATCH_CHUNK_SIZE = int(os.environ.get("EDGE_BATCH_CHUNK_SIZE", "1000"))
+
+GRAPH_LABELS = graph_labels()
+
+# Relationship types are interpolated into Cypher, so only plain identifiers.
+REL_TYPE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# (source label, target label, rel_type)
+GroupKey = Tuple[str, str, str]
+
+
+def validate_item(item: Any) -> Optional[str]:
+    """Why ``item`` cannot be written, or ``None`` if it is well-formed."""
+    if not isinstance(item, dict):
+        return "item must be an object"
+    for field in ("source_id", "target_id"):
+        if not isinstance(item.get(field), str) or not item[field]:
+            return f"{field} must be a non-empty string"
+    if not isinstance(item.get("rel_type"), str) or not REL_TYPE.match(item["rel_type"]):
+        return "rel_type must be an identifier ([A-Za-z_][A-Za-z0-9_]*)"
+    if not isinstance(item.get("properties", {}), dict):
+        return "properties must be an object"
+    return None
+
+
+# -------------------- Cypher (transaction functions) ---------------------
+
+async def resolve_labels(tx, ids: List[str], labels: Sequence[str] = GRAPH_LABELS) -> Dict[str, str]:
+    """Map node ids to their label.
+
+    Each tree label is an index lookup; ids not found under any of them fall
+    back to one unlabelled scan, so nodes created ad hoc stay addressable.
+    """
+    found: Dict[str, str] = {}
+    for label in labels:
+        result = await tx.run(f"UNWIND $ids AS id MATCH (n:{label} {{id: id}}) RETURN n.id AS id", ids=ids)
+        async for record in result:
+            found.setdefault(record["id"], label)
+
+    missing = [i for i in ids if i not in found]
+    if missing:
+        result = await tx.run(
+            "MATCH (n) WHERE n.id IN $ids AND size(labels(n)) > 0 RETURN n.id AS id, labels(n)[0] AS label",
+            ids=missing,
+        )
+        async for record in result:
+            found.setdefault(record["id"], record["label"])
+    return found
+
+
+async def merge_edge_rows(tx, key: GroupKey, rows: List[Dict]) -> Dict[int, bool]:
+    """MERGE ``{"i", "s", "t", "p"}`` rows; returns ``{i: created}`` for rows written."""
+    source_label, target_label, rel = key
+    result = await tx.run(
+        f"UNWIND $rows AS row "
+        f"MATCH (a:`{source_label}` {{id: row.s}}) "
+        f"MATCH (b:`{target_label}` {{id: row.t}}) "
+        f"OPTIONAL MATCH (a)-[existing:{rel}]->(b) "
+        f"WITH row, a, b, existing IS NULL AS created "
+        f"MERGE (a)-[r:{rel}]->(b) "
+        f"SET r += row.p "
+        f"RETURN row.i AS i, created",
+        rows=rows,
+    )
+    return {record["i"]: record["created"] async for record in result}
+
+
+# -------------------- batch driver --------------------------------------
+
+def _chunks(rows: List[Dict], size: int) -> Iterable[List[Dict]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+async def upsert_edges(graph, items: List[Any], chunk_size: Optional[int] = None) -> List[Dict]:
+    """Write ``items`` through ``graph`` (a ``GraphAccess``); one status per item."""
+    chunk_size = chunk_size or EDGE_BATCH_CHUNK_SIZE
+    statuses: List[Dict] = [{"index": i, "status": "pending"} for i in range(len(items))]
+
+    valid: List[int] = []
+    for i, item in enumerate(items):
+        error = validate_item(item)
+        if error:
+            statuses[i].update(status="invalid", error=error)
+        else:
+            valid.append(i)
+    if not valid:
+        return statuses
+
+    ids = list(dict.fromkeys(x for i in valid for x in (items[i]["source_id"], items[i]["target_id"])))
+    labels = await graph.read(resolve_labels, ids)
+
+    groups: Dict[GroupKey, List[Dict]] = {}
+    for i in valid:
+        item = items[i]
+        source, target = labels.get(item["source_id"]), labels.get(item["target_id"])
+        if source is None or target is None:
+            missing = item["source_id"] if source is None else item["target_id"]
+            statuses[i].update(status="not_found", error=f"no node with id {missing}")
+            continue
+        groups.setdefault((source, target, item["rel_type"]), []).append(
+            {"i": i, "s": item["source_id"], "t": item["target_id"], "p": item.get("properties") or {}}
+        )
+
+    for key, rows in groups.items():
+        for chunk in _chunks(rows, chunk_size):
+            try:
+                written = await graph.write(merge_edge_rows, key, chunk)
+            except Exception as exc:
+                for row in chunk:
+                    statuses[row["i"]].update(status="error", error=str(exc))
+                continue
+            for row in chunk:
+                if row["i"] in written:
+                    statuses[row["i"]]["status"] = "created" if written[row["i"]] else "updated"
+                else:
+                    # An endpoint disappeared between resolution and write.
+                    statuses[row["i"]].update(status="not_found", error="endpoint no longer exists")
+
+    return statuses
@@ -0,0 +1,118 @@
+"""Named, parameterised read queries for ``POST /graph/queries/{name}``.
+
+Clients invoke a registered query by name with parameters instead of
+sending Cypher, so the statement text is fixed (plan-cache friendly) and
+results can be cached per ``(name, params, graph version)``.
+
+The built-in queries cover the Conjunction → Group → Area tree;
+``GRAPH_QUERIES_PATH`` may point at a JSON file adding more::
+
+    {"name": {"cypher": "...", "params": {"id": null, "limit": 20}, "description": "..."}}
+
+A ``null`` parameter default marks the parameter as required. Registered
+queries always run as read transactions, so Neo4j rejects any that write.
+"""
+
+import os
+import json
+from typing import Any, Dict, List, Optional
+
+from notion_databases import graph_labels
+
+GRAPH_QUERIES_PATH = os.environ.get("GRAPH_QUERIES_PATH")
+
+# Tree labels of every mirrored database; each one carries an id constraint.
+GRAPH_LABELS = graph_labels()
+
+# Indexed lookup of a tree node by id, whatever its label.
+_NODE_BY_ID = "CALL { " + " UNION ".join(f"MATCH (n:{label} {{id: $id}}) RETURN n" for label in GRAPH_LABELS) + " } "
+
+
+class NamedQuery:
+    def __init__(self, name: str, cypher: str, params: Optional[Dict[str, Any]] = None, description: str = ""):
+        self.name = name
+        self.cypher = cypher
+        # parameter -> default; None means the caller must supply it
+        self.params = params or {}
+        self.description = description
+
+    def bind(self, given: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Defaults merged with ``given``; ``ValueError`` on unknown or missing ones."""
+        given = given or {}
+        unknown = sorted(set(given) - set(self.params))
+        if unknown:
+            raise ValueError(f"unknown parameter(s) for {self.name}: {', '.join(unknown)}")
+        bound = {**self.params, **given}
+        missing = sorted(k for k, v in bound.items() if v is None)
+        if missing:
+            raise ValueError(f"missing parameter(s) for {self.name}: {', '.join(missing)}")
+        return bound
+
+    def describe(self) -> Dict[str, Any]:
+        return {"name": self.name, "params": self.params, "description": self.description}
+
+
+BUILTIN_QUERIES = [
+    NamedQuery(
+        "node",
+        _NODE_BY_ID + "RETURN n.id AS id, labels(n)[0] AS label, n.name AS name",
+        {"id": None},
+        "One tree node by id.",
+    ),
+    NamedQuery(
+        "children",
+        _NODE_BY_ID + "MATCH (n)-[r]->(c) "
+        "RETURN c.id AS id, labels(c)[0] AS label, c.name AS name, type(r) AS rel ORDER BY name",
+        {"id": None},
+        "Direct children of a node, by name.",
+    ),
+    NamedQuery(
+        "ancestors",
+        _NODE_BY_ID + "MATCH path = (root)-[*0..]->(n) WHERE NOT ()-->(root) "
+        "UNWIND nodes(path)[..-1] AS a RETURN a.id AS id, labels(a)[0] AS label, a.name AS name",
+        {"id": None},
+        "Path from the root down to (excluding) a node.",
+    ),
+    NamedQuery(
+        "search",
+        "MATCH (n) WHERE any(l IN labels(n) WHERE l IN $labels) "
+        "AND toLower(n.name) STARTS WITH toLower($prefix) "
+        "RETURN n.id AS id, labels(n)[0] AS label, n.name AS name ORDER BY name LIMIT $limit",
+        {"prefix": None, "labels": list(GRAPH_LABELS), "limit": 20},
+        "Nodes whose name starts with a prefix (case-insensitive).",
+    ),
+    NamedQuery(
+        "label_counts",
+        "MATCH (n) RETURN labels(n)[0] AS label, count(*) AS nodes ORDER BY label",
+        {},
+        "Node count per label.",
+    ),
+]
+
+
+class QueryRegistry:
+    def __init__(self, queries: Optional[List[NamedQuery]] = None):
+        self._queries: Dict[str, NamedQuery] = {}
+        for query in queries or []:
+            self.register(query)
+
+    def register(self, query: NamedQuery):
+        self._queries[query.name] = query
+
+    def get(self, name: str) -> Optional[NamedQuery]:
+        return self._queries.get(name)
+
+    def describe(self) -> List[Dict[str, Any]]:
+        return [q.describe() for q in sorted(self._queries.values(), key=lambda q: q.name)]
+
+
+def load_registry(path: Optional[str] = GRAPH_QUERIES_PATH) -> QueryRegistry:
+    """Built-in queries plus (overridden by) those in ``path``."""
+    registry = QueryRegistry(BUILTIN_QUERIES)
+    if path:
+        with open(path, "r", encoding="utf-8") as fh:
+            for name, spec in json.load(fh).items():
+                registry.register(
+                    NamedQuery(name, spec["cypher"], spec.get("params") or {}, spec.get("description", ""))
+                )
+    return registry
@@ -0,0 +1,147 @@
+"""Collapse bursts of change-stream events into single sync runs.
+
+A single Notion edit can fan out into hundreds of Mongo change events, and
+every one of them would otherwise trigger a full fetch + graph sync. The
+scheduler waits until the stream has been quiet for ``quiet_window`` seconds
+(but never longer than ``max_delay`` after the first pending event) and then
+runs the handler once with the most recent event; everything older is
+superseded. Events that arrive while a sync is running are batched into the
+next run.
+
+A failed run is retried with exponential backoff (``retry_initial`` doubling
+up to ``retry_max`` seconds) unless a newer event has arrived meanwhile, so
+a brief Neo4j outage delays the sync instead of dropping it.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from instrumentation import counter, gauge, get_logger
+
+log = get_logger("coalescer")
+
+EVENTS = counter("graph_sync_change_events_total", "Change events received, by outcome", ["outcome"])
+SYNCS = counter("graph_sync_runs_total", "Coalesced sync runs, by outcome", ["outcome"])
+PENDING = gauge("graph_sync_events_pending", "Change events waiting for the next sync")
+
+
+class CoalescingScheduler:
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[None]],
+        quiet_window: float = 0.5,
+        max_delay: float = 5.0,
+        retry_initial: float = 1.0,
+        retry_max: float = 60.0,
+    ):
+        self._handler = handler
+        self.quiet_window = quiet_window
+        self.max_delay = max_delay
+        self.retry_initial = retry_initial
+        self.retry_max = retry_max
+        self._retry_delay = retry_initial
+
+        self._latest: Any = None
+        self._pending = 0
+        self._first_at: Optional[float] = None
+        self._last_at: Optional[float] = None
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+        self.events_received = 0
+        self.events_superseded = 0
+        self.syncs_executed = 0
+        self.syncs_failed = 0
+        self.syncs_retried = 0
+
+    def submit(self, event: Any):
+        """Record an event; never blocks the change-stream reader."""
+        now = asyncio.get_running_loop().time()
+        self.events_received += 1
+        EVENTS.inc(outcome="received")
+        if self._pending == 0:
+            self._first_at = now
+        else:
+            self.events_superseded += 1
+            EVENTS.inc(outcome="superseded")
+        self._pending += 1
+        PENDING.set(self._pending)
+        self._last_at = now
+        self._latest = event
+        self._idle.clear()
+        self._wakeup.set()
+
+    async def _wait_for_quiet(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            deadline = min(self._last_at + self.quiet_window, self._first_at + self.max_delay)
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self):
+        """Scheduling loop; run it as a background task next to the stream."""
+        while True:
+            await self._wakeup.wait()
+            if not self._pending:
+                self._wakeup.clear()
+                continue
+
+            await self._wait_for_quiet()
+
+            event, batched = self._latest, self._pending
+            self._latest, self._pending = None, 0
+            PENDING.set(0)
+            self._wakeup.clear()
+
+            try:
+                await self._handler(event)
+                self.syncs_executed += 1
+                SYNCS.inc(outcome="ok")
+                log.info("Synced coalesced change events", extra={"events": batched})
+                self._retry_delay = self.retry_initial
+            except Exception as exc:
+                self.syncs_failed += 1
+                SYNCS.inc(outcome="failed")
+                log.error(
+                    "Coalesced sync failed; retrying",
+                    extra={"events": batched, "retry_in_s": self._retry_delay, "error": str(exc)},
+                )
+                await asyncio.sleep(self._retry_delay)
+                self._retry_delay = min(self._retry_delay * 2, self.retry_max)
+                if not self._pending:
+                    # Nothing newer supersedes it: run the same event again.
+                    self._requeue(event)
+
+            if not self._pending:
+                self._idle.set()
+
+    def _requeue(self, event: Any):
+        now = asyncio.get_running_loop().time()
+        self.syncs_retried += 1
+        self._latest, self._pending = event, 1
+        PENDING.set(1)
+        self._first_at = self._last_at = now
+        self._wakeup.set()
+
+    async def wait_idle(self):
+        """Wait until no events are pending and no sync is running."""
+        await self._idle.wait()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "events_received": self.events_received,
+            "events_superseded": self.events_superseded,
+            "events_pending": self._pending,
+            "syncs_executed": self.syncs_executed,
+            "syncs_failed": self.syncs_failed,
+            "syncs_retried": self.syncs_retried,
+            "quiet_window_s": self.quiet_window,
+            "max_delay_s": self.max_delay,
+        }
@@ -1,26 +1,80 @@
 import os
+import json
 import asyncio
+import time
 from typing import List, Dict, Any, Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
 from motor.motor_asyncio import AsyncIOMotorClient
-from neo4j import AsyncGraphDatabase
-import httpx
+
+from graph_bulk import NEO4J_IMPORT_DIR, bulk_load
+from graph_cache import bump_graph_version
+from graph_writer import (
+    apply_diff,
+    diff_is_empty,
+    diff_snapshots,
+    ensure_constraints,
+    snapshot_from_doc,
+    snapshot_to_doc,
+    read_graph_snapshot,
+    snapshot_tree,
+    write_tree,
+)
+from graph_sync.coalescer import CoalescingScheduler
+from hierarchy import build_relation_hierarchy, read_normalized_pages
+from instrumentation import CONTENT_TYPE, counter, get_logger, histogram, render, timed
+from notion_databases import PRIMARY_KEY, NotionDatabase, load_databases
+from tree_encoding import tree_from_rows
 
 # ----- CONFIG ------------------------------------------------------------
 MONGO_URI = os.environ.get("MONGO_DETAILS", "mongodb://localhost:27017")
 MONGO_DB = os.environ.get("DATABASE_NAME", "areas_db")
-AREAS_COLLECTION = "areas"  # still used just to get a change-stream trigger
+
+# Mirrored Notion databases (NOTION_DATABASES, see notion_databases.py). Each
+# collection gets its own watcher and its own label namespace in Neo4j; the
+# Notion ids are not needed here, so without any config the worker watches
+# the "areas" collection as before.
+DATABASES = load_databases() or [NotionDatabase(PRIMARY_KEY, "", primary=True)]
 
 NEO4J_URI = os.environ["NEO4J_URI"]
 NEO4J_USER = os.environ["NEO4J_USER"]
 NEO4J_PASSWORD = os.environ["NEO4J_PASSWORD"]
 
-LABELS = ["Conjunction", "Group", "Area"]  # depth 0,1,2(+)
-
 # If you want a fresh graph on every full-document update set this to true/1
 FULL_REFRESH = os.environ.get("NEO4J_FULL_REFRESH", "0") in {"1", "true", "True"}
 
+# Full writes (first back-fill, NEO4J_FULL_REFRESH) go through CSV + LOAD CSV
+# when NEO4J_IMPORT_DIR is set; it must be Neo4j's import directory (e.g. a
+# shared volume), since the server reads the files itself.
+BULK_LOAD = bool(NEO4J_IMPORT_DIR)
+
+# Last tree synced into Neo4j, kept so each event only writes the delta.
+# Persisted to Mongo (or to GRAPH_SNAPSHOT_PATH if set, for trees beyond the
+# 16 MB document limit) so a restart diffs against it instead of rebuilding.
+# Ids and paths get a ``:<key>`` / ``.<key>`` suffix for non-primary databases.
+SYNC_STATE_COLLECTION = "sync_state"
+GRAPH_SNAPSHOT_ID = "graph_snapshot"
+GRAPH_SNAPSHOT_PATH = os.environ.get("GRAPH_SNAPSHOT_PATH")
+
+# Resume token of the last change event whose effect is committed to Neo4j.
+# A restart or reconnect resumes the change stream from it, so only missed
+# events are replayed; the full back-fill runs only when there is no token
+# or Mongo no longer has the history (ChangeStreamHistoryLost).
+RESUME_TOKEN_ID = "change_stream"
+RESUME_TOKEN_PATH = os.environ.get("RESUME_TOKEN_PATH")
+CHANGE_STREAM_HISTORY_LOST = 286
+
+# Change events arriving within SYNC_QUIET_WINDOW_MS of each other are
+# coalesced into one sync, which is delayed at most SYNC_MAX_DELAY_MS.
+SYNC_QUIET_WINDOW = float(os.environ.get("SYNC_QUIET_WINDOW_MS", "500")) / 1000
+SYNC_MAX_DELAY = float(os.environ.get("SYNC_MAX_DELAY_MS", "5000")) / 1000
+
+# Where the tree comes from: "mongo" (default) builds it in-process from the
+# database's collection; "http" fetches the primary database's tree from
+# AREAS_API instead (other databases are always read from Mongo).
+TREE_SOURCE = os.environ.get("TREE_SOURCE", "mongo")
+
 # FastAPI endpoint that returns the fully structured tree (same shape as sample_areas.json)
 AREAS_API = os.environ.get("AREAS_API", "https://fastapi-areas-app-782958835263.us-central1.run.app/areas-structured")
 
@@ -30,153 +84,394 @@ from pymongo.errors import PyMongoError, OperationFailure
 # ------------------------------------------------------------------------
 app = FastAPI()
 
+log = get_logger("graph_sync")
+
+HANDLE_CHANGE_SECONDS = histogram("graph_sync_handle_change_seconds", "Fetch + sync time per coalesced change")
+SYNC_LAG_SECONDS = histogram(
+    "graph_sync_lag_seconds", "Time from the Mongo change (clusterTime) to its Neo4j commit",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+FETCH_TREE_EMPTY = counter("graph_sync_fetch_tree_empty_total", "fetch_tree results with no roots, by cause", ["cause"])
+GRAPH_CHANGES = counter("graph_sync_graph_changes_total", "Nodes changed in Neo4j, by database and kind", ["database", "kind"])
+STREAM_ERRORS = counter("graph_sync_stream_errors_total", "Change-stream interruptions, by kind", ["kind"])
+SNAPSHOT_SWAPS = counter(
+    "graph_sync_snapshot_swaps_total", "Full-mirror snapshot swaps seen on the change stream, by database", ["database"]
+)
+
+
+PHASES = ("starting", "backfilling", "streaming")
+
+
+class DatabaseSync:
+    """Sync state of one mirrored database's collection.
+
+    ``snapshot`` is the last tree synced into Neo4j; ``phase`` goes
+    "starting" → "backfilling" (only without a usable resume token) →
+    "streaming".
+    """
+
+    def __init__(self, db: NotionDatabase):
+        self.db = db
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.scheduler: Optional[CoalescingScheduler] = None
+        self.phase = PHASES[0]
+
+
+_syncs: Dict[str, DatabaseSync] = {db.key: DatabaseSync(db) for db in DATABASES}
+
+# first_sync_s is seconds from process start to the first committed sync.
+_started = time.monotonic()
+_first_sync_s: Optional[float] = None
+
 
 @app.get("/")
 async def root():
     return {"status": "ok"}
 
 
-# -------------------- Neo4j helpers --------------------------------------
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the process is up; says nothing about Mongo or Neo4j."""
+    return {"status": "ok"}
 
-async def merge_node(session, label: str, node_id: str, name: Optional[str]):
-    """MERGE a node by id and set its human-readable name property."""
-    cypher = f"MERGE (n:{label} {{id:$id}}) SET n.name = $name"
-    await session.run(cypher, id=node_id, name=name)
-
-
-async def merge_relationship(
-    session,
-    parent_label: str,
-    child_label: str,
-    parent_id: str,
-    child_id: str,
-):
-    if child_label == "Group":
-        rel = "HAS_GROUP"
-    elif child_label == "Area":
-        rel = "HAS_AREA"
-    else:
-        rel = "HAS_CHILD"
-    cypher = (
-        f"MATCH (p:{parent_label} {{id:$pid}}), (c:{child_label} {{id:$cid}})"
-        f" MERGE (p)-[:{rel}]->(c)"
-    )
-    await session.run(cypher, pid=parent_id, cid=child_id)
 
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: every database's back-fill is done and its change stream is open."""
+    phases = {key: sync.phase for key, sync in _syncs.items()}
+    phase = min(phases.values(), key=PHASES.index)
+    body = {"phase": phase, "first_sync_s": _first_sync_s}
+    if len(phases) > 1:
+        body["databases"] = phases
+    if phase != "streaming":
+        return JSONResponse(body, status_code=503)
+    return body
 
-async def create_subtree(
-    session,
-    node: Dict[str, Any],
-    depth: int = 0,
-    parent_id: Optional[str] = None,
-):
-    label = LABELS[depth] if depth < len(LABELS) else LABELS[-1]
-    node_id = node["id"]
-    name = node.get("Name") or node.get("name")
 
-    await merge_node(session, label, node_id, name)
 
-    if parent_id is not None:
-        parent_label = LABELS[depth - 1] if depth - 1 < len(LABELS) else LABELS[-1]
-        await merge_relationship(session, parent_label, label, parent_id, node_id)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text-format metrics."""
+    return Response(content=render(), media_type=CONTENT_TYPE)
 
-    for child in node.get("children", []):
-        await create_subtree(session, child, depth + 1, node_id)
 
+@app.get("/stats")
+async def stats():
+    """Change events received vs. syncs actually executed (per database when
+    there are several)."""
+    stats = {key: sync.scheduler.stats() if sync.scheduler else {} for key, sync in _syncs.items()}
+    return stats if len(stats) > 1 else next(iter(stats.values()))
 
-async def clear_graph(session):
-    await session.run("MATCH (n) DETACH DELETE n")
+
+# -------------------- Neo4j helpers --------------------------------------
+
+async def clear_graph(session, labels: List[str]):
+    """Delete this database's nodes; other databases' labels are left alone."""
+    await session.run(
+        "MATCH (n) WHERE any(label IN labels(n) WHERE label IN $labels) DETACH DELETE n", labels=labels
+    )
 
 
 # -------------------- fetch helper --------------------------------------
 
-async def fetch_tree() -> List[Dict[str, Any]]:
-    """Retrieve the nested Conjunction → Group → Area tree from FastAPI."""
+async def fetch_tree(collection, db: NotionDatabase) -> List[Dict[str, Any]]:
+    """Return the nested Conjunction → Group → Area tree from TREE_SOURCE."""
+    if TREE_SOURCE == "http" and db.primary:
+        return await fetch_tree_http()
+    pages = await read_normalized_pages(collection)
+    return build_relation_hierarchy(pages)
+
+
+async def fetch_tree_http() -> List[Dict[str, Any]]:
+    """Retrieve the Conjunction → Group → Area tree from FastAPI.
+
+    Uses the NDJSON row format, parsed line by line as it streams in.
+    """
+    import httpx
+    import orjson
+
     try:
         async with httpx.AsyncClient(timeout=15.0) as client:
-            r = await client.get(AREAS_API)
-            r.raise_for_status()
-            data = r.json()
-            if isinstance(data, dict):
-                # endpoint may wrap list in {"data": [...]}
-                data = data.get("data") or data.get("results") or []
-            return data if isinstance(data, list) else []
+            async with client.stream("GET", AREAS_API, params={"format": "ndjson"}) as r:
+                r.raise_for_status()
+                rows = [orjson.loads(line) async for line in r.aiter_lines() if line]
+            return tree_from_rows(rows)
     except Exception as exc:
-        print(f"[ERROR] fetch_tree failed: {exc}")
+        FETCH_TREE_EMPTY.inc(cause="error")
+        log.error("fetch_tree failed", extra={"error": str(exc)})
         return []
 
 
+# -------------------- snapshot persistence ------------------------------
+
+def _state_path(path: Optional[str], db: NotionDatabase) -> Optional[str]:
+    return path if path is None or db.primary else f"{path}.{db.key}"
+
+
+async def load_snapshot(state_collection, db: NotionDatabase) -> Optional[Dict[str, Any]]:
+    path = _state_path(GRAPH_SNAPSHOT_PATH, db)
+    try:
+        if path:
+            if not os.path.exists(path):
+                return None
+            with open(path) as f:
+                doc = json.load(f)
+        else:
+            doc = await state_collection.find_one({"_id": db.state_id(GRAPH_SNAPSHOT_ID)})
+            if not doc:
+                return None
+        return snapshot_from_doc(doc)
+    except Exception as exc:
+        log.warning("Could not load graph snapshot, doing a full write", extra={"database": db.key, "error": str(exc)})
+        return None
+
+
+async def save_snapshot(state_collection, db: NotionDatabase, snapshot: Dict[str, Any]):
+    doc = snapshot_to_doc(snapshot)
+    path = _state_path(GRAPH_SNAPSHOT_PATH, db)
+    if path:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(doc, f)
+        os.replace(tmp_path, path)
+    else:
+        snapshot_id = db.state_id(GRAPH_SNAPSHOT_ID)
+        await state_collection.replace_one({"_id": snapshot_id}, {"_id": snapshot_id, **doc}, upsert=True)
+
+
+async def load_resume_token(state_collection, db: NotionDatabase) -> Optional[Dict[str, Any]]:
+    path = _state_path(RESUME_TOKEN_PATH, db)
+    try:
+        if path:
+            if not os.path.exists(path):
+                return None
+            with open(path) as f:
+                return json.load(f).get("token")
+        doc = await state_collection.find_one({"_id": db.state_id(RESUME_TOKEN_ID)})
+        return doc.get("token") if doc else None
+    except Exception as exc:
+        log.warning("Could not load change-stream resume token", extra={"database": db.key, "error": str(exc)})
+        return None
+
+
+async def save_resume_token(state_collection, db: NotionDatabase, token: Optional[Dict[str, Any]]):
+    """Persist ``token`` (``None`` forgets it). Only call after Neo4j committed."""
+    path = _state_path(RESUME_TOKEN_PATH, db)
+    if path:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"token": token}, f)
+        os.replace(tmp_path, path)
+    else:
+        token_id = db.state_id(RESUME_TOKEN_ID)
+        await state_collection.replace_one(
+            {"_id": token_id},
+            {"_id": token_id, "token": token, "updated_at": time.time()},
+            upsert=True,
+        )
+
+
 # -------------------- Mongo change-stream handler ------------------------
 
-async def handle_change(change, neo_session):
-    # On ANY change event simply pull the latest structured tree from the API
-    roots = await fetch_tree()
+async def sync_tree(sync: DatabaseSync, roots: List[Dict[str, Any]], neo_session, state_collection):
+    """Bring Neo4j in line with ``roots`` by applying only the structural delta
+    against the last synced snapshot, in a single write transaction.
+
+    Nodes carry the database's labels (``NotionDatabase.labels``), so each
+    database's tree is diffed and written independently of the others.
+
+    Without a saved snapshot the delta is taken against what the graph holds
+    under those labels, so nodes and edges left over from earlier syncs (or
+    from the old per-root rebuild) are removed; only an empty graph gets the
+    full batched / bulk write.
+    """
+    db = sync.db
+    labels = db.labels
+    new_snapshot = snapshot_tree(roots, labels)
+
+    old_snapshot = sync.snapshot
+    if old_snapshot is None and not FULL_REFRESH:
+        old_snapshot = await neo_session.execute_read(read_graph_snapshot, labels)
+        if not old_snapshot["nodes"]:
+            old_snapshot = None
+
+    if FULL_REFRESH or old_snapshot is None:
+        # Nothing to diff against: write the whole tree in batches.
+        if FULL_REFRESH:
+            await clear_graph(neo_session, labels)
+        if BULK_LOAD:
+            count = await bulk_load(neo_session, roots, NEO4J_IMPORT_DIR, labels=labels)
+        else:
+            count = await write_tree(neo_session, roots, labels=labels)
+        GRAPH_CHANGES.inc(count, database=db.key, kind="full_write")
+        log.info("Wrote full tree to Neo4j", extra={"database": db.key, "nodes": count, "bulk_csv": BULK_LOAD})
+    else:
+        diff = diff_snapshots(old_snapshot, new_snapshot)
+        if diff_is_empty(diff):
+            log.info("Graph already up to date; nothing to write", extra={"database": db.key})
+            _mark_synced()
+            return
+        await neo_session.execute_write(apply_diff, diff)
+        for kind, n in diff["stats"].items():
+            GRAPH_CHANGES.inc(n, database=db.key, kind=kind)
+        log.info("Applied graph delta", extra={"database": db.key, **diff["stats"]})
+
+    sync.snapshot = new_snapshot
+    await save_snapshot(state_collection, db, new_snapshot)
+    # Neo4j changed: cached API reads keyed on the old version go stale.
+    await bump_graph_version(state_collection)
+    _mark_synced()
+
+
+def _mark_synced():
+    global _first_sync_s
+    if _first_sync_s is None:
+        _first_sync_s = time.monotonic() - _started
+        log.info("First sync committed", extra={"seconds_since_start": round(_first_sync_s, 3)})
+
+
+@timed(HANDLE_CHANGE_SECONDS)
+async def handle_change(sync: DatabaseSync, change, neo_session, collection, state_collection):
+    # On ANY change event rebuild the latest structured tree and sync the delta
+    roots = await fetch_tree(collection, sync.db)
     if not roots:
-        print("[WARN] fetch_tree returned no roots; skipping change event")
+        FETCH_TREE_EMPTY.inc(cause="empty")
+        log.warning("fetch_tree returned no roots; skipping change event", extra={"database": sync.db.key})
         return
 
-    if FULL_REFRESH:
-        await clear_graph(neo_session)
-
-    for root in roots:
-        await neo_session.run("MATCH (n:Conjunction {id:$id}) DETACH DELETE n", id=root["id"])
-        await create_subtree(neo_session, root)
+    await sync_tree(sync, roots, neo_session, state_collection)
+    if change.get("clusterTime") is not None:
+        SYNC_LAG_SECONDS.observe(max(0.0, time.time() - change["clusterTime"].time))
+    # Every event up to this one is reflected in Neo4j now.
+    await save_resume_token(state_collection, sync.db, change["_id"])
 
 
 # -------------------- Worker task ---------------------------------------
 
-async def watch_areas_collection():
-    """Continuously watch the MongoDB collection and sync changes to Neo4j.
+async def watch_areas_collection(sync: DatabaseSync, mongo_db, neo4j_driver):
+    """Continuously watch one database's MongoDB collection and sync changes
+    to Neo4j.
 
-    The function retries forever; if the change-stream cursor becomes
-    non-resumable (e.g. oplog history lost, CursorNotFound, network split) we
-    sleep a bit and start a fresh stream so the task never crashes.
+    The function retries forever. Reconnects resume from the last event seen
+    and restarts from the last persisted resume token; only when Mongo has
+    lost that history (code 286) does it fall back to a full back-fill.
     """
 
-    mongo_client = AsyncIOMotorClient(MONGO_URI)
-    db = mongo_client[MONGO_DB]
-    collection = db[AREAS_COLLECTION]
-
-    neo4j_driver = AsyncGraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    db = sync.db
+    collection = mongo_db[db.collection]
+    state_collection = mongo_db[SYNC_STATE_COLLECTION]
 
-    # ---------- one-time graph init & back-fill --------------------------
+    # ---------- graph init & saved position -----------------------------
+    sync.snapshot = await load_snapshot(state_collection, db)
     async with neo4j_driver.session() as neo_session:
-        # Ensure constraints
-        for lbl in LABELS:
-            await neo_session.run(
-                f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{lbl}) REQUIRE n.id IS UNIQUE"
-            )
-        print("[INFO] Performing initial back-fill via /areas-structured …")
-        roots = await fetch_tree()
-        for root in roots:
-            await create_subtree(neo_session, root)
+        await ensure_constraints(neo_session, db.labels)
+
+    resume_token = await load_resume_token(state_collection, db)
+    # A token is only trustworthy together with the snapshot it was saved with.
+    needs_backfill = resume_token is None or sync.snapshot is None
+    if needs_backfill:
+        resume_token = None
+    else:
+        log.info("Resuming change stream from saved token", extra={"database": db.key})
+
+    async def backfill(token):
+        """Full reconciliation; ``token`` marks where the stream picks up."""
+        log.info("Performing full back-fill", extra={"database": db.key, "source": TREE_SOURCE})
+        roots = await fetch_tree(collection, db)
+        if roots:
+            async with neo4j_driver.session() as neo_session:
+                await sync_tree(sync, roots, neo_session, state_collection)
+        await save_resume_token(state_collection, db, token)
+
+    # ---------- coalescing scheduler -----------------------------------
+    async def sync_latest(change):
+        async with neo4j_driver.session() as neo_session:
+            await handle_change(sync, change, neo_session, collection, state_collection)
+
+    sync.scheduler = CoalescingScheduler(sync_latest, SYNC_QUIET_WINDOW, SYNC_MAX_DELAY)
+    asyncio.create_task(sync.scheduler.run())
 
     # ---------- continuous change-stream loop ---------------------------
     while True:
         try:
-            async with collection.watch(full_document="updateLookup") as stream:
-                async with neo4j_driver.session() as neo_session:
-                    async for change in stream:
-                        try:
-                            await handle_change(change, neo_session)
-                        except Exception as exc:
-                            print(f"[ERROR] failed to process change: {exc}\n{change}")
+            async with collection.watch(full_document="updateLookup", start_after=resume_token) as stream:
+                if needs_backfill:
+                    # The stream is opened first so nothing written during the
+                    # back-fill is lost; it is replayed (harmlessly) afterwards.
+                    sync.phase = "backfilling"
+                    await backfill(stream.resume_token)
+                    needs_backfill = False
+                sync.phase = "streaming"
+                async for change in stream:
+                    # In-process position; the persisted one only advances
+                    # once the scheduler has committed the event's effect.
+                    resume_token = change["_id"]
+                    if change["operationType"] == "drop":
+                        # A full mirror swapped in a new snapshot; the
+                        # "invalidate" that follows stands for the whole swap.
+                        continue
+                    if change["operationType"] == "invalidate":
+                        SNAPSHOT_SWAPS.inc(database=db.key)
+                        log.info("Collection snapshot replaced; resyncing the full tree", extra={"database": db.key})
+                    sync.scheduler.submit(change)
         except OperationFailure as exc:
-            # code 286 (ChangeStreamHistoryLost) cannot be resumed — start fresh
-            print(f"[WARN] change-stream operation failure ({exc.code}): {exc}. Restarting in 2 s …")
+            if exc.code == CHANGE_STREAM_HISTORY_LOST:
+                # The oplog rolled past our token: the missed events are gone,
+                # so reconcile against the full tree and start from "now".
+                STREAM_ERRORS.inc(kind="history_lost")
+                log.warning(
+                    "Change-stream history lost; falling back to a full back-fill",
+                    extra={"database": db.key, "error": str(exc)},
+                )
+                resume_token, needs_backfill = None, True
+                continue
+            STREAM_ERRORS.inc(kind="operation_failure")
+            log.warning(
+                "Change-stream operation failure; resuming in 2 s",
+                extra={"database": db.key, "code": exc.code, "error": str(exc)},
+            )
             await asyncio.sleep(2)
         except PyMongoError as exc:
-            # Generic PyMongo errors: log and retry
-            print(f"[WARN] PyMongo error while tailing change-stream: {exc}. Retrying in 5 s …")
+            # Generic PyMongo errors: log and resume from the last seen event
+            STREAM_ERRORS.inc(kind="pymongo")
+            log.warning(
+                "PyMongo error while tailing change-stream; resuming in 5 s", extra={"database": db.key, "error": str(exc)}
+            )
             await asyncio.sleep(5)
         except Exception as exc:
             # Catch-all so the task never dies
-            print(f"[ERROR] Unexpected error in change-stream loop: {exc}. Retrying in 5 s …")
+            STREAM_ERRORS.inc(kind="unexpected")
+            log.error(
+                "Unexpected error in change-stream loop; retrying in 5 s", extra={"database": db.key, "error": str(exc)}
+            )
             await asyncio.sleep(5)
 
 
+async def watch_all_databases():
+    """One watcher per mirrored database, sharing the Mongo client and the
+    Neo4j driver. A watcher that fails to start is retried on its own."""
+
+    # Imported here so uvicorn serves /healthz before the driver is loaded.
+    from neo4j import AsyncGraphDatabase
+
+    mongo_client = AsyncIOMotorClient(MONGO_URI)
+    mongo_db = mongo_client[MONGO_DB]
+    neo4j_driver = AsyncGraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+
+    async def supervise(sync: DatabaseSync):
+        while True:
+            try:
+                await watch_areas_collection(sync, mongo_db, neo4j_driver)
+            except Exception as exc:
+                STREAM_ERRORS.inc(kind="unexpected")
+                log.error("Watcher failed to start; retrying in 5 s", extra={"database": sync.db.key, "error": str(exc)})
+                await asyncio.sleep(5)
+
+    await asyncio.gather(*(supervise(sync) for sync in _syncs.values()))
+
+
 # -------------------- FastAPI startup -----------------------------------
 
 @app.on_event("startup")
 async def startup_event():
-    asyncio.create_task(watch_areas_collection()) 
\ No newline at end of file
+    asyncio.create_task(watch_all_databases())
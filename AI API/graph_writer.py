@@ -0,0 +1,267 @@
+"""Batched Neo4j writer for the Conjunction → Group → Area tree.
+
+The nested tree (same shape as ``/areas-structured``) is flattened into
+per-label node rows and per-relationship edge rows, which are then written
+with parameterised ``UNWIND $rows`` statements, ``batch_size`` rows per
+explicit write transaction. Shared by the graph-sync worker and the scripts.
+"""
+
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from instrumentation import histogram, timed
+
+WRITE_SECONDS = histogram("neo4j_write_seconds", "Time spent writing the tree to Neo4j", ["kind"])
+
+LABELS = ["Conjunction", "Group", "Area"]  # depth 0,1,2(+)
+
+DEFAULT_BATCH_SIZE = int(os.environ.get("NEO4J_BATCH_SIZE", "1000"))
+
+# (parent_label, child_label, rel_type)
+EdgeKey = Tuple[str, str, str]
+
+
+def label_for_depth(depth: int, labels: Sequence[str] = LABELS) -> str:
+    return labels[depth] if depth < len(labels) else labels[-1]
+
+
+def rel_type_for(child_label: str, labels: Sequence[str] = LABELS) -> str:
+    if child_label == labels[1]:
+        return "HAS_GROUP"
+    if child_label == labels[2]:
+        return "HAS_AREA"
+    return "HAS_CHILD"
+
+
+def flatten_tree(
+    roots: Iterable[Dict[str, Any]],
+    labels: Sequence[str] = LABELS,
+) -> Tuple[Dict[str, List[Dict]], Dict[EdgeKey, List[Dict]]]:
+    """Flatten nested roots into ``({label: [node rows]}, {edge key: [edge rows]})``.
+
+    Node rows are ``{"id", "name"}``; edge rows are ``{"pid", "cid"}``. The walk
+    is iterative, so tree depth is not bounded by the recursion limit.
+    """
+    nodes: Dict[str, List[Dict]] = {lbl: [] for lbl in labels}
+    edges: Dict[EdgeKey, List[Dict]] = {}
+    seen_nodes = set()
+    seen_edges = set()
+
+    stack = [(root, 0, None) for root in reversed(list(roots))]
+    while stack:
+        node, depth, parent = stack.pop()
+        label = label_for_depth(depth, labels)
+        node_id = node["id"]
+
+        if (label, node_id) not in seen_nodes:
+            seen_nodes.add((label, node_id))
+            nodes[label].append({"id": node_id, "name": node.get("Name") or node.get("name")})
+
+        if parent is not None:
+            parent_label, parent_id = parent
+            key = (parent_label, label, rel_type_for(label, labels))
+            if (key, parent_id, node_id) not in seen_edges:
+                seen_edges.add((key, parent_id, node_id))
+                edges.setdefault(key, []).append({"pid": parent_id, "cid": node_id})
+
+        for child in reversed(node.get("children", [])):
+            stack.append((child, depth + 1, (label, node_id)))
+
+    return nodes, edges
+
+
+def _batches(rows: List[Dict], batch_size: int):
+    for i in range(0, len(rows), batch_size):
+        yield rows[i:i + batch_size]
+
+
+# -------------------- Cypher (transaction functions) ---------------------
+
+async def merge_nodes(tx, label: str, rows: List[Dict]):
+    """MERGE a batch of ``{"id", "name"}`` rows as ``label`` nodes."""
+    await tx.run(
+        f"UNWIND $rows AS row MERGE (n:{label} {{id: row.id}}) SET n.name = row.name",
+        rows=rows,
+    )
+
+
+async def merge_edges(tx, key: EdgeKey, rows: List[Dict]):
+    """MERGE a batch of ``{"pid", "cid"}`` rows as ``key`` relationships."""
+    parent_label, child_label, rel = key
+    await tx.run(
+        f"UNWIND $rows AS row "
+        f"MATCH (p:{parent_label} {{id: row.pid}}) "
+        f"MATCH (c:{child_label} {{id: row.cid}}) "
+        f"MERGE (p)-[:{rel}]->(c)",
+        rows=rows,
+    )
+
+
+async def ensure_constraints(session, labels: Sequence[str] = LABELS):
+    for lbl in labels:
+        await session.run(
+            f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{lbl}) REQUIRE n.id IS UNIQUE"
+        )
+
+
+@timed(WRITE_SECONDS, kind="full")
+async def write_tree(
+    session,
+    roots: Iterable[Dict[str, Any]],
+    batch_size: Optional[int] = None,
+    labels: Sequence[str] = LABELS,
+) -> int:
+    """MERGE the whole tree into Neo4j and return the number of nodes written.
+
+    All nodes are written before any edge so the edge MATCHes always find
+    both endpoints. Each batch is its own managed write transaction.
+    """
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    nodes, edges = flatten_tree(roots, labels)
+
+    for label, rows in nodes.items():
+        for batch in _batches(rows, batch_size):
+            await session.execute_write(merge_nodes, label, batch)
+
+    for key, rows in edges.items():
+        for batch in _batches(rows, batch_size):
+            await session.execute_write(merge_edges, key, batch)
+
+    return sum(len(rows) for rows in nodes.values())
+
+
+# -------------------- snapshots & structural diff ------------------------
+#
+# A snapshot is the flattened graph as plain sets so two syncs can be
+# compared cheaply:  {"nodes": {(label, id): name}, "edges": {(key, pid, cid)}}
+
+def snapshot_tree(roots: Iterable[Dict[str, Any]], labels: Sequence[str] = LABELS) -> Dict[str, Any]:
+    nodes, edges = flatten_tree(roots, labels)
+    return {
+        "nodes": {(label, row["id"]): row["name"] for label, rows in nodes.items() for row in rows},
+        "edges": {(key, row["pid"], row["cid"]) for key, rows in edges.items() for row in rows},
+    }
+
+
+def tree_edge_keys(labels: Sequence[str] = LABELS) -> List[EdgeKey]:
+    """Every edge key ``flatten_tree`` can produce for ``labels``."""
+    pairs = list(zip(labels, labels[1:])) + [(labels[-1], labels[-1])]
+    return [(parent, child, rel_type_for(child, labels)) for parent, child in pairs]
+
+
+async def read_graph_snapshot(tx, labels: Sequence[str] = LABELS) -> Dict[str, Any]:
+    """Snapshot of what Neo4j holds under ``labels``: every node with one of
+    them and the tree relationships between those nodes. Other relationship
+    types (e.g. edges added through the API) are not part of it."""
+    nodes = {}
+    for label in labels:
+        result = await tx.run(f"MATCH (n:{label}) WHERE n.id IS NOT NULL RETURN n.id AS id, n.name AS name")
+        async for record in result:
+            nodes[(label, record["id"])] = record["name"]
+    edges = set()
+    for key in tree_edge_keys(labels):
+        parent_label, child_label, rel = key
+        result = await tx.run(
+            f"MATCH (p:{parent_label})-[:{rel}]->(c:{child_label}) "
+            f"WHERE p.id IS NOT NULL AND c.id IS NOT NULL RETURN p.id AS pid, c.id AS cid"
+        )
+        async for record in result:
+            edges.add((key, record["pid"], record["cid"]))
+    return {"nodes": nodes, "edges": edges}
+
+
+def empty_snapshot() -> Dict[str, Any]:
+    return {"nodes": {}, "edges": set()}
+
+
+def snapshot_to_doc(snapshot: Dict[str, Any]) -> Dict[str, List]:
+    """JSON/BSON-friendly form of a snapshot (lists instead of tuples/sets)."""
+    return {
+        "nodes": [[label, nid, name] for (label, nid), name in snapshot["nodes"].items()],
+        "edges": [[*key, pid, cid] for key, pid, cid in snapshot["edges"]],
+    }
+
+
+def snapshot_from_doc(doc: Dict[str, List]) -> Dict[str, Any]:
+    return {
+        "nodes": {(label, nid): name for label, nid, name in doc.get("nodes", [])},
+        "edges": {((pl, cl, rel), pid, cid) for pl, cl, rel, pid, cid in doc.get("edges", [])},
+    }
+
+
+def diff_snapshots(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Structural delta between two snapshots.
+
+    Returns row lists grouped the same way ``flatten_tree`` groups them:
+    ``removed_edges`` / ``added_edges`` by edge key, ``removed_nodes`` /
+    ``upserted_nodes`` (added + renamed) by label, plus a ``stats`` dict with
+    added / removed / renamed / reparented counts. A node that moves to a
+    different depth changes label, so it shows up as removed + added.
+    """
+    old_nodes, new_nodes = old["nodes"], new["nodes"]
+
+    removed_nodes: Dict[str, List[str]] = {}
+    for label, nid in old_nodes.keys() - new_nodes.keys():
+        removed_nodes.setdefault(label, []).append(nid)
+
+    upserted_nodes: Dict[str, List[Dict]] = {}
+    added = renamed = 0
+    for (label, nid), name in new_nodes.items():
+        if (label, nid) not in old_nodes:
+            added += 1
+        elif old_nodes[(label, nid)] != name:
+            renamed += 1
+        else:
+            continue
+        upserted_nodes.setdefault(label, []).append({"id": nid, "name": name})
+
+    removed_edges: Dict[EdgeKey, List[Dict]] = {}
+    for key, pid, cid in old["edges"] - new["edges"]:
+        removed_edges.setdefault(key, []).append({"pid": pid, "cid": cid})
+
+    added_edges: Dict[EdgeKey, List[Dict]] = {}
+    for key, pid, cid in new["edges"] - old["edges"]:
+        added_edges.setdefault(key, []).append({"pid": pid, "cid": cid})
+
+    # A surviving node whose incoming edge changed has been re-parented.
+    reparented = {
+        (key[1], row["cid"])
+        for key, rows in added_edges.items()
+        for row in rows
+        if (key[1], row["cid"]) in old_nodes
+    }
+
+    return {
+        "removed_edges": removed_edges,
+        "removed_nodes": removed_nodes,
+        "upserted_nodes": upserted_nodes,
+        "added_edges": added_edges,
+        "stats": {
+            "added": added,
+            "removed": sum(len(ids) for ids in removed_nodes.values()),
+            "renamed": renamed,
+            "reparented": len(reparented),
+        },
+    }
+
+
+def diff_is_empty(diff: Dict[str, Any]) -> bool:
+    return not any(diff[k] for k in ("removed_edges", "removed_nodes", "upserted_nodes", "added_edges"))
+
+
+@timed(WRITE_SECONDS, kind="diff")
+async def apply_diff(tx, diff: Dict[str, Any]):
+    """Apply a ``diff_snapshots`` delta inside one write transaction."""
+    for (parent_label, child_label, rel), rows in diff["removed_edges"].items():
+        await tx.run(
+            f"UNWIND $rows AS row "
+            f"MATCH (p:{parent_label} {{id: row.pid}})-[r:{rel}]->(c:{child_label} {{id: row.cid}}) "
+            f"DELETE r",
+            rows=rows,
+        )
+    for label, ids in diff["removed_nodes"].items():
+        await tx.run(f"UNWIND $ids AS id MATCH (n:{label} {{id: id}}) DETACH DELETE n", ids=ids)
+    for label, rows in diff["upserted_nodes"].items():
+        await merge_nodes(tx, label, rows)
+    for key, rows in diff["added_edges"].items():
+        await merge_edges(tx, key, rows)
@@ -0,0 +1,259 @@
+"""Build the Conjunction → Group → Area tree from mirrored Notion pages.
+
+Shared by the API (``/areas-structured``) and the graph-sync worker, which
+runs it in-process on documents read from its own Mongo connection.
+"""
+
+import os
+from typing import Dict, List, Optional
+
+from instrumentation import counter, get_logger, histogram, timed
+
+log = get_logger("hierarchy")
+
+BUILD_SECONDS = histogram("hierarchy_build_seconds", "Time to build the Areas hierarchy from pages")
+RELATION_ANOMALIES = counter(
+    "hierarchy_relation_anomalies_total", "Sub-item cycles broken and multi-parent pages seen", ["kind"]
+)
+
+# -------------------- Notion page field extraction -----------------------
+
+# Keys of the public node dicts, in output order
+PUBLIC_FIELDS = ("Name", "Symbol", "Category", "id")
+
+# Placement of pages that are a Sub-item of several parents: "first" or "all"
+MULTI_PARENT_POLICY = os.environ.get("HIERARCHY_MULTI_PARENT", "first")
+
+
+def plain_text_from_rich_text(rich_items: List[Dict]) -> str:
+    """Helper to concatenate plain_text from Notion rich_text array."""
+    return "".join(rt.get("plain_text", "") for rt in rich_items or [])
+
+
+def extract_simple_fields(page: Dict) -> Dict:
+    """Extract public fields from a Notion page object."""
+    props = page.get("properties", {})
+    simple = {}
+    # Extract Name (first title-type property)
+    for prop_name, prop_val in props.items():
+        if prop_val.get("type") == "title":
+            simple["Name"] = plain_text_from_rich_text(prop_val["title"])
+            break
+    # Extract Symbol (rich_text or select named "Symbol" if exists)
+    if "Symbol" in props:
+        sym_prop = props["Symbol"]
+        if sym_prop.get("type") == "rich_text":
+            simple["Symbol"] = plain_text_from_rich_text(sym_prop["rich_text"])
+        elif sym_prop.get("type") == "select":
+            simple["Symbol"] = (sym_prop["select"] or {}).get("name")
+    # Extract Category (select or rich_text named "Category")
+    if "Category" in props:
+        cat_prop = props["Category"]
+        if cat_prop.get("type") == "select":
+            simple["Category"] = (cat_prop["select"] or {}).get("name")
+        elif cat_prop.get("type") == "rich_text":
+            simple["Category"] = plain_text_from_rich_text(cat_prop["rich_text"])
+    # Fallback: include page id for reference
+    simple["id"] = page.get("id")
+    return simple
+
+
+def level_name(page: Dict) -> str:
+    level_prop = page.get("properties", {}).get("Level")
+    if level_prop and level_prop.get("type") == "select" and level_prop.get("select"):
+        return level_prop["select"].get("name", "")
+    return ""
+
+
+def is_sub_area(page: Dict) -> bool:
+    return "sub" in level_name(page).lower()
+
+
+def number_value(page: Dict) -> float:
+    """Return numeric order from '#' property if present, else infinity."""
+    num_prop = page.get("properties", {}).get("#")
+    if num_prop and num_prop.get("type") == "number" and num_prop.get("number") is not None:
+        return num_prop["number"]
+    return float("inf")
+
+
+def sub_item_ids(page: Dict):
+    """Ids from the 'Sub-item' relation, or None if the page has no such relation."""
+    rel_prop = page.get("properties", {}).get("Sub-item")
+    if rel_prop and rel_prop.get("type") == "relation":
+        return [rel.get("id") for rel in rel_prop.get("relation", [])]
+    return None
+
+
+def normalize_page(page: Dict) -> Dict:
+    """Compact per-page document with exactly what the hierarchy needs.
+
+    Public fields as ``extract_simple_fields`` returns them, plus ``level``,
+    ``is_sub_area``, ``number`` (None when unset) and ``sub_items`` (None when
+    the page has no 'Sub-item' relation).
+    """
+    number = number_value(page)
+    return {
+        **extract_simple_fields(page),
+        "level": level_name(page),
+        "is_sub_area": is_sub_area(page),
+        "number": None if number == float("inf") else number,
+        "sub_items": sub_item_ids(page),
+    }
+
+
+# -------------------- tree building -------------------------------------
+
+@timed(BUILD_SECONDS)
+def build_relation_hierarchy(
+    pages: List[Dict],
+    multi_parent: Optional[str] = None,
+    report: Optional[Dict[str, List]] = None,
+) -> List[Dict]:
+    """Build tree using 'Sub-item' relation graph, excluding Sub-Areas.
+
+    ``pages`` are normalized page documents (see ``normalize_page``). The
+    build is iterative, so depth is not bounded by the recursion limit, and
+    sort keys are computed once per page.
+
+    A page listed as Sub-item of several parents is placed according to
+    ``multi_parent`` (default HIERARCHY_MULTI_PARENT): "first" keeps it only
+    at its first position in output order, "all" repeats it under every parent.
+    Relations that would close a cycle are dropped; a cycle nobody else points
+    into is attached as a root at its first-sorting member. Both are logged
+    and, if ``report`` is given, recorded in ``report["multi_parent"]`` and
+    ``report["cycles"]``.
+    """
+    policy = multi_parent or MULTI_PARENT_POLICY
+    if policy not in ("first", "all"):
+        raise ValueError(f"unknown multi-parent policy {policy!r}")
+    report = report if report is not None else {}
+    report.setdefault("multi_parent", [])
+    report.setdefault("cycles", [])
+
+    by_id: Dict[str, Dict] = {p["id"]: p for p in pages if not p["is_sub_area"]}
+    # Children (and roots) are ordered by '#' and then by Name.
+    inf = float("inf")
+    keys = {
+        pid: (inf if p["number"] is None else p["number"], p.get("Name") or "")
+        for pid, p in by_id.items()
+    }
+
+    # ---- relation graph (only pages with a Sub-item relation or a parent) --
+    parents: Dict[str, List[str]] = {}
+    kids: Dict[str, List[str]] = {}
+    for pid, page in by_id.items():
+        sub_items = page["sub_items"]
+        if not sub_items:
+            if sub_items is not None:
+                kids[pid] = []
+            continue
+        cids = [cid for cid in sub_items if cid in by_id]
+        if len(cids) > 1:
+            cids = sorted(dict.fromkeys(cids), key=keys.__getitem__)
+        kids[pid] = cids
+        for cid in cids:
+            if cid in parents:
+                parents[cid].append(pid)
+            else:
+                parents[cid] = [pid]
+
+    # ---- iterative depth-first construction --------------------------------
+    roots: List[Dict] = []
+    placed_under: Dict[str, Optional[str]] = {}
+    seen_cycles = set()
+    check_every_node = policy == "all"
+
+    def cycle_through(pid: str, frame) -> Optional[List[str]]:
+        """Ancestors from ``pid`` down to the current parent, if ``pid`` is one."""
+        path = []
+        while frame is not None:
+            ancestor, frame = frame
+            path.append(ancestor)
+            if ancestor == pid:
+                return path[::-1]
+        return None
+
+    def emit_from(root_id: str):
+        # frame = (parent id, parent's frame): the ancestry of this occurrence
+        stack = [(root_id, None, None)]
+        while stack:
+            pid, parent, frame = stack.pop()
+            if check_every_node or pid in placed_under:
+                cycle = cycle_through(pid, frame)
+                if cycle is not None:
+                    if frozenset(cycle) not in seen_cycles:
+                        seen_cycles.add(frozenset(cycle))
+                        report["cycles"].append(cycle)
+                    continue
+                if not check_every_node:
+                    continue
+            if pid not in placed_under:
+                placed_under[pid] = frame[0] if frame else None
+
+            page = by_id[pid]
+            node = {}
+            for k in PUBLIC_FIELDS:
+                if k in page:
+                    node[k] = page[k]
+            if parent is None:
+                roots.append(node)
+            elif "children" in parent:
+                parent["children"].append(node)
+            else:
+                parent["children"] = [node]
+
+            children = kids.get(pid)
+            if children:
+                child_frame = (pid, frame)
+                stack.extend((cid, node, child_frame) for cid in reversed(children))
+
+    for pid in sorted((pid for pid in kids if pid not in parents), key=keys.__getitem__):
+        emit_from(pid)
+
+    # Whatever is left is only reachable through a cycle: walk up the
+    # parents until a page repeats and start from the cycle's first member.
+    for pid in sorted((pid for pid in kids if pid not in placed_under), key=keys.__getitem__):
+        if pid in placed_under:
+            continue
+        chain, seen, cur = [], set(), pid
+        while cur not in seen:
+            seen.add(cur)
+            chain.append(cur)
+            cur = min(parents[cur], key=keys.__getitem__)
+        cycle = chain[chain.index(cur):]
+        emit_from(min(cycle, key=keys.__getitem__))
+
+    for cid, pids in parents.items():
+        if len(pids) > 1:
+            report["multi_parent"].append(
+                {"id": cid, "parents": sorted(pids, key=keys.__getitem__), "kept": placed_under.get(cid)}
+            )
+
+    if report["cycles"] or report["multi_parent"]:
+        RELATION_ANOMALIES.inc(len(report["cycles"]), kind="cycle")
+        RELATION_ANOMALIES.inc(len(report["multi_parent"]), kind="multi_parent")
+        log.warning(
+            "Sub-item relations: cycles broken / pages with several parents",
+            extra={"cycles": len(report["cycles"]), "multi_parent": len(report["multi_parent"]), "policy": policy},
+        )
+    return roots
+
+
+# -------------------- Mongo reads ---------------------------------------
+
+async def read_normalized_pages(collection) -> List[Dict]:
+    """Read only the compact ``normalized`` sub-documents, with sub-areas
+    excluded server-side.
+
+    Documents mirrored before the compact form existed come back without it;
+    those are fetched in full and normalized here.
+    """
+    cursor = collection.find({"normalized.is_sub_area": {"$ne": True}}, {"normalized": 1})
+    docs = [d async for d in cursor]
+    pages = [d["normalized"] for d in docs if "normalized" in d]
+    legacy_ids = [d["_id"] for d in docs if "normalized" not in d]
+    if legacy_ids:
+        async for page in collection.find({"_id": {"$in": legacy_ids}}):
+            pages.append(normalize_page(page))
+    return pages
@@ -0,0 +1,202 @@
+"""Single-flight scheduling of Notion → Mongo mirror runs.
+
+Webhooks arrive in bursts, but a mirror run always pages the whole change
+set, so running them side by side only multiplies Notion load and lets their
+writes interleave. ``MirrorScheduler.request()`` therefore starts a run only
+when none is in progress; requests that arrive during a run set a *dirty*
+flag, which buys exactly one follow-up run once the current one finishes.
+
+Across uvicorn workers / instances the same rule is enforced through a lease
+document in ``sync_state``::
+
+    {"_id": "notion_mirror_lease", "owner": ..., "expires_at": <epoch s>, "dirty": bool, "full": bool}
+
+A worker runs only while it owns an unexpired lease (renewed by a heartbeat).
+A worker that finds the lease held marks it dirty instead (and ``full`` if a
+full mirror was asked for), and the holder re-runs before releasing; lease
+release is conditional on the flag being clear, so a request is never lost
+between the two.
+"""
+
+import os
+import time
+import uuid
+import socket
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from instrumentation import counter, get_logger
+
+log = get_logger("mirror_scheduler")
+
+MIRROR_LEASE_ID = "notion_mirror_lease"
+MIRROR_LEASE_SECONDS = float(os.environ.get("MIRROR_LEASE_SECONDS", "60"))
+
+MIRROR_REQUESTS = counter(
+    "notion_mirror_requests_total", "Mirror requests, by what became of them", ["outcome"]
+)
+
+
+class MirrorScheduler:
+    def __init__(
+        self,
+        run: Callable[[bool], Awaitable[None]],
+        state_collection,
+        lease_id: str = MIRROR_LEASE_ID,
+        lease_seconds: float = MIRROR_LEASE_SECONDS,
+        owner: Optional[str] = None,
+    ):
+        self._run = run
+        self._state = state_collection
+        self.lease_id = lease_id
+        self.lease_seconds = lease_seconds
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._task: Optional[asyncio.Task] = None
+        self._dirty = False
+        self._full = False
+        self._lease_lost = False
+
+        self.runs = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def request(self, full: bool = False):
+        """Ask for a mirror run; never blocks the caller."""
+        self._full = self._full or full
+        if self.running:
+            self._dirty = True
+            MIRROR_REQUESTS.inc(outcome="coalesced")
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def wait_idle(self):
+        while self.running:
+            await asyncio.shield(self._task)
+
+    async def close(self):
+        """Stop any run in progress and hand the lease back."""
+        if self.running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    # ---- lease ------------------------------------------------------------
+
+    async def _acquire(self) -> bool:
+        now = time.time()
+        try:
+            previous = await self._state.find_one_and_update(
+                {
+                    "_id": self.lease_id,
+                    "$or": [{"owner": None}, {"expires_at": {"$lt": now}}, {"owner": self.owner}],
+                },
+                {"$set": {"owner": self.owner, "expires_at": now + self.lease_seconds, "dirty": False, "full": False}},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError:
+            # The lease exists and someone else holds it.
+            return False
+        # A full mirror asked of an expired holder is ours to run now.
+        self._full = self._full or bool((previous or {}).get("full"))
+        return True
+
+    async def _mark_dirty(self, full: bool) -> bool:
+        """Flag the holder's lease dirty (and full); False if nobody holds it any more."""
+        fields = {"dirty": True, "full": True} if full else {"dirty": True}
+        result = await self._state.update_one(
+            {"_id": self.lease_id, "owner": {"$nin": [None, self.owner]}, "expires_at": {"$gte": time.time()}},
+            {"$set": fields},
+        )
+        return result.matched_count == 1
+
+    async def _release(self) -> bool:
+        """Release the lease unless it was marked dirty; True when released."""
+        doc = await self._state.find_one_and_update(
+            {"_id": self.lease_id, "owner": self.owner, "dirty": False},
+            {"$set": {"owner": None, "expires_at": None}},
+        )
+        return doc is not None
+
+    async def _renew(self) -> bool:
+        result = await self._state.update_one(
+            {"_id": self.lease_id, "owner": self.owner},
+            {"$set": {"expires_at": time.time() + self.lease_seconds}},
+        )
+        return result.matched_count == 1
+
+    async def _heartbeat(self, run_task: asyncio.Task):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await self._renew():
+                log.error("Lost the mirror lease mid-run; stopping this run")
+                self._lease_lost = True
+                run_task.cancel()
+                return
+
+    # ---- run loop ---------------------------------------------------------
+
+    async def _loop(self):
+        try:
+            while True:
+                if not await self._acquire():
+                    if await self._mark_dirty(self._full):
+                        self._full = False
+                        MIRROR_REQUESTS.inc(outcome="deferred")
+                        log.info("Mirror already running elsewhere; marked it dirty")
+                        return
+                    # The holder released in between: try to take over.
+                    continue
+
+                MIRROR_REQUESTS.inc(outcome="started")
+                while True:
+                    self._dirty = False
+                    full, self._full = self._full, False
+                    await self._run_once(full)
+                    if self._dirty:
+                        continue
+                    if await self._release():
+                        break
+                    # Marked dirty by another worker: clear it and go again,
+                    # unless the lease was lost altogether.
+                    previous = await self._state.find_one_and_update(
+                        {"_id": self.lease_id, "owner": self.owner},
+                        {"$set": {"dirty": False, "full": False, "expires_at": time.time() + self.lease_seconds}},
+                    )
+                    if previous is None:
+                        break
+                    self._full = self._full or bool(previous.get("full"))
+                    MIRROR_REQUESTS.inc(outcome="rerun")
+                return
+        except asyncio.CancelledError:
+            await self._state.update_one(
+                {"_id": self.lease_id, "owner": self.owner}, {"$set": {"owner": None, "expires_at": None}}
+            )
+            raise
+        except Exception as exc:
+            log.error("Mirror scheduler failed", extra={"error": str(exc)})
+
+    async def _run_once(self, full: bool):
+        self._lease_lost = False
+        run_task = asyncio.create_task(self._run(full))
+        heartbeat = asyncio.create_task(self._heartbeat(run_task))
+        try:
+            await run_task
+            self.runs += 1
+        except asyncio.CancelledError:
+            # Only a heartbeat cancel ends just this run; close() (or any
+            # outer cancel) also cancels run_task and must stop the loop.
+            if not self._lease_lost:
+                raise
+        except Exception as exc:
+            log.error("Mirror run failed", extra={"error": str(exc)})
+        finally:
+            heartbeat.cancel()
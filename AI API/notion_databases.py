@@ -0,0 +1,104 @@
+"""Which Notion databases are mirrored, and where each one lives.
+
+``NOTION_DATABASES`` is a JSON list, one object per database::
+
+    [{"key": "areas", "database_id": "…"},
+     {"key": "projects", "database_id": "…", "label_prefix": "Project"}]
+
+* ``key``          – short name; keys its state documents and metrics
+* ``database_id``  – the Notion database
+* ``collection``   – Mongo collection of its pages (default: ``key``)
+* ``label_prefix`` – prepended to the tree labels in Neo4j, so every
+                     database gets its own label namespace (default: none
+                     for the first database, ``key`` title-cased otherwise)
+
+Without ``NOTION_DATABASES`` the single ``NOTION_DATABASE_ID`` is mirrored
+as before, into ``areas`` with the plain labels. The first database is the
+*primary* one: it backs ``/areas-structured`` and keeps the original,
+unsuffixed ``sync_state`` ids, so existing deployments carry on unchanged.
+"""
+
+import os
+import re
+import json
+from typing import Dict, List, Optional
+
+from graph_writer import LABELS
+
+PRIMARY_KEY = "areas"
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class NotionDatabase:
+    def __init__(
+        self,
+        key: str,
+        database_id: str,
+        collection: Optional[str] = None,
+        label_prefix: Optional[str] = None,
+        primary: bool = False,
+    ):
+        if not _IDENTIFIER.match(key):
+            raise ValueError(f"database key must be an identifier, got {key!r}")
+        self.key = key
+        self.database_id = database_id
+        self.collection = collection or key
+        self.primary = primary
+        self.label_prefix = ("" if primary else key.title().replace("_", "")) if label_prefix is None else label_prefix
+        if self.label_prefix and not _IDENTIFIER.match(self.label_prefix):
+            # Labels are interpolated into Cypher.
+            raise ValueError(f"label_prefix must be an identifier, got {self.label_prefix!r}")
+
+    @property
+    def staging_collection(self) -> str:
+        return f"{self.collection}_staging"
+
+    @property
+    def labels(self) -> List[str]:
+        return [self.label_prefix + label for label in LABELS]
+
+    def state_id(self, base: str) -> str:
+        """``sync_state`` id for this database's copy of ``base``."""
+        return base if self.primary else f"{base}:{self.key}"
+
+    def owns(self, database_id: Optional[str]) -> bool:
+        return bool(database_id) and database_id.replace("-", "") == self.database_id.replace("-", "")
+
+
+def load_databases(raw: Optional[str] = None, default_id: Optional[str] = None) -> List[NotionDatabase]:
+    """Parse ``NOTION_DATABASES`` (or fall back to ``NOTION_DATABASE_ID``)."""
+    raw = os.environ.get("NOTION_DATABASES") if raw is None else raw
+    if not raw:
+        default_id = default_id or os.environ.get("NOTION_DATABASE_ID")
+        return [NotionDatabase(PRIMARY_KEY, default_id, primary=True)] if default_id else []
+
+    databases = []
+    for i, spec in enumerate(json.loads(raw)):
+        databases.append(
+            NotionDatabase(
+                spec["key"],
+                spec["database_id"],
+                spec.get("collection"),
+                spec.get("label_prefix"),
+                primary=(i == 0),
+            )
+        )
+    for field in ("key", "collection"):
+        values = [getattr(db, field) for db in databases]
+        if len(set(values)) != len(values):
+            raise ValueError(f"NOTION_DATABASES has duplicate {field}s")
+    if len({db.label_prefix for db in databases}) != len(databases):
+        raise ValueError("NOTION_DATABASES needs a distinct label_prefix per database")
+    return databases
+
+
+def graph_labels(databases: Optional[List[NotionDatabase]] = None) -> List[str]:
+    """Tree labels of every mirrored database (default: ``load_databases()``);
+    the plain ``LABELS`` when nothing is configured."""
+    databases = load_databases() if databases is None else databases
+    return [label for db in databases for label in db.labels] or list(LABELS)
+
+
+def by_notion_id(databases: List[NotionDatabase]) -> Dict[str, NotionDatabase]:
+    return {db.database_id.replace("-", ""): db for db in databases}
@@ -0,0 +1,161 @@
+"""Async, rate-limited access to the Notion API.
+
+Wraps ``notion_client.AsyncClient`` over one shared ``httpx.AsyncClient``
+connection pool. Every request first takes a token from a ``TokenBucket``
+sized to Notion's request quota (an average of three requests per second);
+429 responses honour ``Retry-After`` and pause the whole bucket, and 5xx /
+transport errors are retried with exponential backoff.
+
+``NOTION_BASE_URL`` (or ``base_url=``) points the client at a local fake
+server for tests and benchmarks.
+"""
+
+import os
+import time
+import random
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+import httpx
+from notion_client import AsyncClient
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+from instrumentation import counter, get_logger
+
+log = get_logger("notion")
+
+NOTION_REQUESTS = counter("notion_requests_total", "Requests sent to the Notion API")
+NOTION_RETRIES = counter("notion_retries_total", "Notion requests retried, by failure", ["status"])
+NOTION_PAGES = counter("notion_pages_fetched_total", "Pages received from databases.query")
+
+NOTION_REQUESTS_PER_SECOND = float(os.environ.get("NOTION_REQUESTS_PER_SECOND", "3"))
+NOTION_MAX_RETRIES = int(os.environ.get("NOTION_MAX_RETRIES", "6"))
+NOTION_BASE_URL = os.environ.get("NOTION_BASE_URL")
+
+
+class TokenBucket:
+    """Async token bucket; ``pause()`` blocks every caller (used for 429s)."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+def _retry_after(exc: HTTPResponseError) -> Optional[float]:
+    value = getattr(exc, "headers", {}).get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class NotionSource:
+    def __init__(
+        self,
+        token: str,
+        limiter: Optional[TokenBucket] = None,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        max_retries: int = NOTION_MAX_RETRIES,
+    ):
+        self.limiter = limiter or TokenBucket(NOTION_REQUESTS_PER_SECOND)
+        self.max_retries = max_retries
+        self._http = http_client or httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+        )
+        options: Dict[str, Any] = {"auth": token}
+        base_url = base_url or NOTION_BASE_URL
+        if base_url:
+            options["base_url"] = base_url
+        self.client = AsyncClient(client=self._http, **options)
+
+        self.requests = 0
+        self.retries = 0
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    async def _call(self, endpoint, **kwargs) -> Dict:
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            self.requests += 1
+            NOTION_REQUESTS.inc()
+            try:
+                return await endpoint(**kwargs)
+            except (HTTPResponseError, RequestTimeoutError, httpx.TransportError) as exc:
+                status = getattr(exc, "status", None)
+                retryable = status is None or status == 429 or status >= 500
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = _retry_after(exc) if status == 429 else None
+                if delay is None:
+                    delay = min(30.0, 0.5 * 2 ** attempt) * (0.5 + random.random() / 2)
+                if status == 429:
+                    self.limiter.pause(delay)
+                log.warning(
+                    "Notion request failed; retrying",
+                    extra={"status": status or type(exc).__name__, "delay_s": round(delay, 2)},
+                )
+                attempt += 1
+                self.retries += 1
+                NOTION_RETRIES.inc(status=status or type(exc).__name__)
+                await asyncio.sleep(delay)
+
+    async def iter_database(self, database_id: str, page_size: int = 100, **query) -> AsyncIterator[List[Dict]]:
+        """Yield ``databases.query`` result batches as they arrive.
+
+        The next page is requested as soon as a batch has been received, so
+        Notion round-trips overlap with whatever the consumer does with it.
+        """
+        def fetch(cursor: Optional[str] = None) -> asyncio.Task:
+            kwargs = {"database_id": database_id, "page_size": page_size, **query}
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            return asyncio.create_task(self._call(self.client.databases.query, **kwargs))
+
+        pending: Optional[asyncio.Task] = fetch()
+        try:
+            while pending is not None:
+                response = await pending
+                pending = fetch(response["next_cursor"]) if response.get("has_more") else None
+                results = response.get("results", [])
+                NOTION_PAGES.inc(len(results))
+                yield results
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def query_database(self, database_id: str, **query) -> List[Dict]:
+        pages: List[Dict] = []
+        async for batch in self.iter_database(database_id, **query):
+            pages.extend(batch)
+        return pages
+
+    async def retrieve_page(self, page_id: str) -> Dict:
+        return await self._call(self.client.pages.retrieve, page_id=page_id)
+
+    async def retrieve_pages(self, page_ids: Iterable[str]) -> List[Dict]:
+        """Fetch several pages concurrently; the limiter paces the requests."""
+        return list(await asyncio.gather(*(self.retrieve_page(pid) for pid in page_ids)))
@@ -0,0 +1,109 @@
+"""Page-targeted Notion → Mongo sync driven by webhook events.
+
+Notion webhook events name the page they are about (``entity.id``) and what
+happened to it (``type``, e.g. ``page.properties_updated`` or
+``page.deleted``). ``classify_event`` turns an event into one of:
+
+* ``("upsert", page_id)`` / ``("delete", page_id)`` – touch one document;
+* ``("full", None)`` – schema-level change, re-mirror the whole database;
+* ``("ignore", None)`` – nothing in the mirror depends on it (comments,
+  ``*.content_updated``, which the matching ``page.*`` events cover, …).
+
+``PageSyncQueue`` collects the page ids, keeping only the latest action per
+page, and hands them to ``apply`` in batches from a single background task,
+so a burst of edits to one page costs one Notion request and one Mongo write.
+"""
+
+import os
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from instrumentation import counter, get_logger
+
+log = get_logger("page_sync")
+
+PAGE_SYNC_BATCH_SIZE = int(os.environ.get("PAGE_SYNC_BATCH_SIZE", "50"))
+
+PAGE_EVENTS = counter("notion_webhook_events_total", "Notion webhook events, by resulting action", ["action"])
+PAGE_SYNC_PAGES = counter("page_sync_pages_total", "Pages handed to the page sync, by outcome", ["outcome"])
+
+# Page events whose page is gone from the database as far as the mirror goes.
+_DELETE_EVENTS = {"page.deleted"}
+# Schema-level events change how every page should be read.
+_FULL_EVENTS = {
+    f"{entity}.{change}"
+    for entity in ("database", "data_source")
+    for change in ("schema_updated", "created", "deleted", "undeleted")
+}
+# Row changes; each changed page also gets its own page.* event.
+_COVERED_BY_PAGE_EVENTS = {"database.content_updated", "data_source.content_updated"}
+
+Action = Tuple[str, Optional[str]]
+
+
+def classify_event(event: Dict[str, Any]) -> Action:
+    """Map one Notion webhook event to the mirror work it calls for."""
+    kind = event.get("type") or ""
+    entity = event.get("entity") or {}
+
+    if kind in _FULL_EVENTS:
+        return "full", None
+    if kind in _COVERED_BY_PAGE_EVENTS:
+        return "ignore", None
+    if kind.startswith("page.") and entity.get("type", "page") == "page" and entity.get("id"):
+        return ("delete" if kind in _DELETE_EVENTS else "upsert"), entity["id"]
+    if kind.startswith("comment."):
+        return "ignore", None
+    # Unknown event shapes: fall back to a regular (incremental) mirror run.
+    return "mirror", None
+
+
+class PageSyncQueue:
+    def __init__(
+        self,
+        apply: Callable[[Dict[str, str]], Awaitable[None]],
+        batch_size: int = PAGE_SYNC_BATCH_SIZE,
+    ):
+        self._apply = apply
+        self.batch_size = batch_size
+        # page id -> "upsert" | "delete"; insertion order is arrival order.
+        self._pending: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, page_id: str, action: str = "upsert"):
+        """Queue ``page_id``; a later event for the same page replaces this one."""
+        if page_id in self._pending:
+            PAGE_SYNC_PAGES.inc(outcome="coalesced")
+            del self._pending[page_id]
+        self._pending[page_id] = action
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def wait_idle(self):
+        while self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
+
+    async def close(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _loop(self):
+        while self._pending:
+            ids = list(self._pending)[: self.batch_size]
+            batch = {pid: self._pending.pop(pid) for pid in ids}
+            try:
+                await self._apply(batch)
+                PAGE_SYNC_PAGES.inc(len(batch), outcome="applied")
+            except Exception as exc:
+                PAGE_SYNC_PAGES.inc(len(batch), outcome="failed")
+                log.error("Page sync batch failed", extra={"pages": len(batch), "error": str(exc)})
+            # Let events that arrived meanwhile join the next batch.
+            await asyncio.sleep(0)
@@ -1,27 +1,48 @@
+import sys
 import json
 from pathlib import Path
 
 DATA_PATH = Path(__file__).parent / "sample_areas.json"
 
-with DATA_PATH.open() as f:
-    data = json.load(f)
-
 conjunctions = []  # list of (id, name)
 groups = []        # list of (id, name, parent_id)
 areas = []         # list of (id, name, parent_id)
 
-def walk(node, depth, parent_id=None):
+def add(node_id, name, depth, parent_id=None):
     if depth == 0:
-        conjunctions.append((node["id"], node["Name"]))
+        conjunctions.append((node_id, name))
     elif depth == 1:
-        groups.append((node["id"], node["Name"], parent_id))
+        groups.append((node_id, name, parent_id))
     else:
-        areas.append((node["id"], node["Name"], parent_id))
+        areas.append((node_id, name, parent_id))
+
+def walk(node, depth, parent_id=None):
+    add(node["id"], node["Name"], depth, parent_id)
     for child in node.get("children", []):
         walk(child, depth + 1, node["id"])
 
-for root in data:
-    walk(root, 0)
+def ndjson_lines(source):
+    """Lines of an NDJSON export (file path or /areas-structured?format=ndjson URL)."""
+    if source.startswith(("http://", "https://")):
+        import httpx
+        with httpx.stream("GET", source, params={"format": "ndjson"}, timeout=60.0) as r:
+            r.raise_for_status()
+            yield from r.iter_lines()
+    else:
+        with open(source) as f:
+            yield from f
+
+if len(sys.argv) > 1:
+    # Flat rows arrive one at a time; nothing nested is ever held in memory.
+    for line in ndjson_lines(sys.argv[1]):
+        if line.strip():
+            row = json.loads(line)
+            add(row["id"], row["Name"], row["depth"], row["parent_id"])
+else:
+    with DATA_PATH.open() as f:
+        data = json.load(f)
+    for root in data:
+        walk(root, 0)
 
 print("Conjunctions (count =", len(conjunctions), "):")
 for cid, name in conjunctions:
@@ -33,4 +54,4 @@ for gid, name, parent in groups:
 
 print("\nAreas (count =", len(areas), "):")
 for aid, name, parent in areas:
-    print(f"  - {name} ({aid}) <- parent Group {parent}") 
\ No newline at end of file
+    print(f"  - {name} ({aid}) <- parent Group {parent}")
@@ -1,66 +1,92 @@
+"""Load the Areas hierarchy from Mongo into Neo4j.
+
+    python scripts/initial_graph_load.py                      # batched MERGE (default)
+    python scripts/initial_graph_load.py --mode csv           # CSV + LOAD CSV
+    python scripts/initial_graph_load.py --mode admin --out-dir ./import
+                                                              # files for neo4j-admin
+
+``--mode csv`` writes into NEO4J_IMPORT_DIR (Neo4j's import directory, or a
+volume mounted there); ``--mode admin`` only writes the files and prints the
+``neo4j-admin database import`` command to run against a stopped, empty
+database; it only replaces an existing database with ``--overwrite``. Each
+phase is timed.
+"""
+
 import os
+import sys
+import time
 import asyncio
+import argparse
+import subprocess
+from pathlib import Path
 from motor.motor_asyncio import AsyncIOMotorClient
 from neo4j import AsyncGraphDatabase
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from graph_bulk import NEO4J_IMPORT_DIR, admin_import_command, load_csv, write_csv  # noqa: E402
+from graph_writer import ensure_constraints, write_tree  # noqa: E402
+from hierarchy import build_relation_hierarchy, read_normalized_pages  # noqa: E402
+
 MONGO_URI = os.environ.get("MONGO_DETAILS", "mongodb://localhost:27017")
 MONGO_DB_NAME = os.environ.get("DATABASE_NAME", "areas_db")
+BATCH_SIZE = int(os.environ.get("NEO4J_BATCH_SIZE", "1000"))
 
-# Node label mapping by depth
-LABELS = ["Conjunction", "Group", "Area"]
-
-async def create_node_and_children(session, node, depth, parent_id=None):
-    label = LABELS[depth]
-    node_id = node["id"]
-    name = node.get("Name")
-    # Create node
-    await session.run(
-        f"MERGE (n:{label} {{id: $id}}) SET n.Name = $name",
-        id=node_id,
-        name=name,
-    )
-    # Create relationship to parent if not top-level
-    if parent_id is not None:
-        parent_label = LABELS[depth-1]
-        rel_type = (
-            "HAS_GROUP" if label == "Group" else
-            "HAS_AREA" if label == "Area" else
-            "HAS_CHILD"
-        )
-        await session.run(
-            f"MATCH (p:{parent_label} {{id: $parent_id}}), (c:{label} {{id: $child_id}}) "
-            f"MERGE (p)-[:{rel_type}]->(c)",
-            parent_id=parent_id,
-            child_id=node_id,
-        )
-    # Recurse for children
-    children = node.get("children", [])
-    if depth+1 < len(LABELS):
-        for child in children:
-            await create_node_and_children(session, child, depth+1, node_id)
+async def load_tree(args):
+    timings = {}
 
-async def load_tree():
+    t0 = time.perf_counter()
     mongo_client = AsyncIOMotorClient(MONGO_URI)
     mongo_db = mongo_client[MONGO_DB_NAME]
     collection = mongo_db["areas"]
-    docs = [doc async for doc in collection.find({})]
-
-    neo4j_driver = AsyncGraphDatabase.driver(
-        os.environ["NEO4J_URI"],
-        auth=(os.environ["NEO4J_USER"], os.environ["NEO4J_PASSWORD"]),
-    )
-    async with neo4j_driver.session() as session:
-        # Ensure unique constraints
-        for label in LABELS:
-            await session.run(
-                f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.id IS UNIQUE"
-            )
-        # Recursively create nodes and relationships
-        for doc in docs:
-            await create_node_and_children(session, doc, 0)
-    await neo4j_driver.close()
+    roots = build_relation_hierarchy(await read_normalized_pages(collection))
     mongo_client.close()
-    print("✔ Initial graph load complete.")
+    timings["read + build"] = time.perf_counter() - t0
+
+    if args.mode == "admin":
+        t0 = time.perf_counter()
+        manifest = write_csv(roots, args.out_dir, admin=True)
+        timings["write csv"] = time.perf_counter() - t0
+        argv = admin_import_command(manifest, args.out_dir, args.database, overwrite=args.overwrite)
+        if args.run:
+            t0 = time.perf_counter()
+            subprocess.run(argv, check=True)
+            timings["neo4j-admin import"] = time.perf_counter() - t0
+        else:
+            print("Run against the stopped database:\n  " + " \\\n    ".join(argv))
+        count = sum(rows for _, rows in manifest["nodes"].values())
+    else:
+        neo4j_driver = AsyncGraphDatabase.driver(
+            os.environ["NEO4J_URI"],
+            auth=(os.environ["NEO4J_USER"], os.environ["NEO4J_PASSWORD"]),
+        )
+        async with neo4j_driver.session() as session:
+            # Ensure unique constraints
+            await ensure_constraints(session)
+            if args.mode == "csv":
+                t0 = time.perf_counter()
+                manifest = write_csv(roots, args.out_dir)
+                timings["write csv"] = time.perf_counter() - t0
+                t0 = time.perf_counter()
+                count = await load_csv(session, manifest, batch_size=BATCH_SIZE)
+                timings["LOAD CSV"] = time.perf_counter() - t0
+            else:
+                # Batched UNWIND writes for nodes and relationships
+                t0 = time.perf_counter()
+                count = await write_tree(session, roots, batch_size=BATCH_SIZE)
+                timings["MERGE batches"] = time.perf_counter() - t0
+        await neo4j_driver.close()
+
+    print(f"✔ Initial graph load complete ({count} nodes, mode={args.mode}).")
+    for phase, seconds in timings.items():
+        print(f"  {phase:<20} {seconds:8.2f} s")
 
 if __name__ == "__main__":
-    asyncio.run(load_tree()) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["merge", "csv", "admin"], default="merge")
+    parser.add_argument("--out-dir", default=NEO4J_IMPORT_DIR or "import")
+    parser.add_argument("--database", default="neo4j", help="target database for --mode admin")
+    parser.add_argument("--run", action="store_true", help="execute neo4j-admin instead of printing it")
+    parser.add_argument(
+        "--overwrite", action="store_true", help="--mode admin: replace the target database if it already has data"
+    )
+    asyncio.run(load_tree(parser.parse_args()))
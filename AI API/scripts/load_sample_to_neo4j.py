@@ -1,32 +1,15 @@
 import os
+import sys
 import json
 from pathlib import Path
 import asyncio
 from neo4j import AsyncGraphDatabase
 
-DATA_PATH = Path(__file__).parent / "sample_areas.json"
-
-LABELS = ["Conjunction", "Group", "Area"]
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from graph_writer import ensure_constraints, write_tree  # noqa: E402
 
-async def create_node_and_children(session, node, depth, parent_id=None):
-    label = LABELS[depth] if depth < len(LABELS) else LABELS[-1]
-    node_id = node["id"]
-    name = node["Name"]
-    await session.run(
-        f"MERGE (n:{label} {{id:$id}}) SET n.name=$name",
-        id=node_id,
-        name=name,
-    )
-    if parent_id:
-        parent_label = LABELS[depth-1] if depth-1 < len(LABELS) else LABELS[-1]
-        rel = "HAS_GROUP" if label == "Group" else "HAS_AREA" if label == "Area" else "HAS_CHILD"
-        await session.run(
-            f"MATCH (p:{parent_label} {{id:$pid}}), (c:{label} {{id:$cid}}) MERGE (p)-[:{rel}]->(c)",
-            pid=parent_id,
-            cid=node_id,
-        )
-    for child in node.get("children", []):
-        await create_node_and_children(session, child, depth+1, node_id)
+DATA_PATH = Path(__file__).parent / "sample_areas.json"
+BATCH_SIZE = int(os.environ.get("NEO4J_BATCH_SIZE", "1000"))
 
 async def main():
     with DATA_PATH.open() as f:
@@ -38,18 +21,14 @@ async def main():
     )
     async with driver.session() as session:
         # constraints
-        for label in LABELS:
-            await session.run(
-                f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.id IS UNIQUE"
-            )
+        await ensure_constraints(session)
         # optional: clear existing graph
         detach = os.environ.get("CLEAR_GRAPH", "0") in {"1","true","True"}
         if detach:
             await session.run("MATCH (n) DETACH DELETE n")
         # load data
-        for root in roots:
-            await create_node_and_children(session, root, 0)
+        await write_tree(session, roots, batch_size=BATCH_SIZE)
     await driver.close()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main())
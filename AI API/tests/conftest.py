@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Make the top-level service modules (api.py, graph_writer.py, …) importable.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,78 @@
+"""Minimal in-process stand-in for the Notion REST API.
+
+Serves ``databases.query`` (with cursor pagination and a ``last_edited_time``
+``on_or_after`` filter; like Notion it leaves out archived and trashed pages)
+and ``pages.retrieve`` from an in-memory page list,
+and can answer every ``rate_limit_every``-th request with a 429. Mount it
+with ``httpx.ASGITransport`` or run it with uvicorn and point
+``NOTION_BASE_URL`` at it.
+"""
+
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def make_page(page_id: str, name: str, last_edited_time: str = "2024-01-01T00:00:00.000Z",
+              sub_items: Optional[List[str]] = None, level: str = "Area", number: Optional[float] = None) -> Dict:
+    return {
+        "object": "page",
+        "id": page_id,
+        "last_edited_time": last_edited_time,
+        "archived": False,
+        "in_trash": False,
+        "properties": {
+            "Name": {"type": "title", "title": [{"plain_text": name}]},
+            "Level": {"type": "select", "select": {"name": level}},
+            "#": {"type": "number", "number": number},
+            "Sub-item": {"type": "relation", "relation": [{"id": c} for c in sub_items or []]},
+        },
+    }
+
+
+def create_app(pages: List[Dict], rate_limit_every: int = 0, retry_after: str = "0") -> FastAPI:
+    app = FastAPI()
+    app.state.requests = 0
+    app.state.rate_limited = 0
+
+    @app.middleware("http")
+    async def rate_limit(request: Request, call_next):
+        app.state.requests += 1
+        if rate_limit_every and app.state.requests % rate_limit_every == 0:
+            app.state.rate_limited += 1
+            return JSONResponse(
+                {"object": "error", "status": 429, "code": "rate_limited", "message": "Rate limited"},
+                status_code=429,
+                headers={"Retry-After": retry_after},
+            )
+        return await call_next(request)
+
+    @app.post("/v1/databases/{database_id}/query")
+    async def query(database_id: str, request: Request):
+        body = await request.json()
+        results = [p for p in pages if not (p.get("archived") or p.get("in_trash"))]
+        since = (body.get("filter") or {}).get("last_edited_time", {}).get("on_or_after")
+        if since:
+            results = [p for p in results if p["last_edited_time"] >= since]
+        start = int(body.get("start_cursor") or 0)
+        size = int(body.get("page_size") or 100)
+        end = start + size
+        return {
+            "object": "list",
+            "results": results[start:end],
+            "has_more": end < len(results),
+            "next_cursor": str(end) if end < len(results) else None,
+        }
+
+    @app.get("/v1/pages/{page_id}")
+    async def retrieve(page_id: str):
+        for page in pages:
+            if page["id"] == page_id:
+                return page
+        return JSONResponse(
+            {"object": "error", "status": 404, "code": "object_not_found", "message": "Not found"},
+            status_code=404,
+        )
+
+    return app
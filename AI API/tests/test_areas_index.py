@@ -0,0 +1,29 @@
+import json
+from pathlib import Path
+
+from areas_index import AreasIndex
+
+SAMPLE = json.loads((Path(__file__).parent.parent / "scripts" / "sample_areas.json").read_text())
+
+
+def test_summary_ancestors_and_subtree():
+    index = AreasIndex(SAMPLE)
+    root = SAMPLE[0]
+    group = root["children"][0]
+    area = group["children"][0]
+
+    assert index.summary(area["id"])["parent_id"] == group["id"]
+    assert index.summary(area["id"])["depth"] == 2
+    assert [a["id"] for a in index.ancestors(area["id"])] == [root["id"], group["id"]]
+
+    shallow = index.subtree(root["id"], depth=1)
+    assert [c["id"] for c in shallow["children"]] == [g["id"] for g in root["children"]]
+    assert all("children" not in c for c in shallow["children"])
+
+
+def test_prefix_search_is_case_insensitive_and_limited():
+    index = AreasIndex(SAMPLE)
+    hits = index.search("gov", limit=5)
+    assert hits and all(h["Name"].lower().startswith("gov") for h in hits)
+    assert len(index.search("0", limit=3)) == 3
+    assert index.search("zzz-no-such-area") == []
@@ -0,0 +1,53 @@
+import asyncio
+
+from areas_cache import AreasTreeCache
+from areas_snapshot import read_snapshot, write_snapshot
+
+TREE = [{"id": "c1", "Name": "Conjunction", "children": [{"id": "g1", "Name": "Group", "children": []}]}]
+
+
+def test_snapshot_round_trip_and_rejects_other_files(tmp_path):
+    path = tmp_path / "areas.snap"
+    write_snapshot(str(path), b'[{"id":"c1"}]', '"abc"', 123.5)
+    snapshot = read_snapshot(str(path))
+    assert bytes(snapshot.body) == b'[{"id":"c1"}]'
+    assert (snapshot.etag, snapshot.built_at) == ('"abc"', 123.5)
+
+    (tmp_path / "other").write_bytes(b"not a snapshot at all")
+    assert read_snapshot(str(tmp_path / "other")) is None
+    assert read_snapshot(str(tmp_path / "missing")) is None
+
+
+def test_cache_serves_snapshot_then_falls_back_when_mongo_fails(tmp_path):
+    path = str(tmp_path / "areas.snap")
+
+    async def scenario():
+        async def build():
+            return TREE
+
+        warm = AreasTreeCache(build, snapshot_path=path)
+        await warm.get()
+        etag = warm.etag
+
+        mongo_up = asyncio.Event()
+
+        async def broken():
+            if not mongo_up.is_set():
+                raise ConnectionError("mongo down")
+            return TREE
+
+        cold = AreasTreeCache(broken, snapshot_path=path)
+        assert cold.load_snapshot()
+        first = await cold.get()  # served from disk, no build attempted
+        assert first.etag == etag and first.tree == TREE and first.stale_for is not None
+
+        cold.invalidate()
+        await cold.get()  # rebuild fails: the mapped copy is kept
+        assert cold.degraded and cold.body is not None and cold.stale_for is not None
+
+        mongo_up.set()
+        await cold.refresh()
+        return cold
+
+    cold = asyncio.run(scenario())
+    assert cold.stale_for is None and not cold.from_snapshot
@@ -0,0 +1,72 @@
+import asyncio
+
+from graph_sync.coalescer import CoalescingScheduler
+
+
+async def _burst(scheduler, n, gap=0.0):
+    for i in range(n):
+        scheduler.submit(i)
+        await asyncio.sleep(gap)
+
+
+def test_burst_collapses_into_one_sync_with_latest_event():
+    async def scenario():
+        seen = []
+
+        async def handler(event):
+            seen.append(event)
+
+        scheduler = CoalescingScheduler(handler, quiet_window=0.05, max_delay=1.0)
+        task = asyncio.create_task(scheduler.run())
+        await _burst(scheduler, 200)
+        await asyncio.sleep(0.01)
+        await scheduler.wait_idle()
+        task.cancel()
+        return seen, scheduler.stats()
+
+    seen, stats = asyncio.run(scenario())
+    assert seen == [199]
+    assert stats["events_received"] == 200
+    assert stats["syncs_executed"] == 1
+
+
+def test_max_delay_caps_a_never_quiet_stream():
+    async def scenario():
+        seen = []
+
+        async def handler(event):
+            seen.append(event)
+
+        scheduler = CoalescingScheduler(handler, quiet_window=0.05, max_delay=0.1)
+        task = asyncio.create_task(scheduler.run())
+        await _burst(scheduler, 30, gap=0.01)
+        await asyncio.sleep(0.01)
+        await scheduler.wait_idle()
+        task.cancel()
+        return seen
+
+    seen = asyncio.run(scenario())
+    assert 2 <= len(seen) < 30
+    assert seen[-1] == 29
+
+
+def test_failed_sync_is_retried_until_it_succeeds():
+    async def scenario():
+        seen = []
+
+        async def handler(event):
+            seen.append(event)
+            if len(seen) < 3:
+                raise ConnectionError("neo4j down")
+
+        scheduler = CoalescingScheduler(handler, quiet_window=0.01, max_delay=0.1, retry_initial=0.01)
+        task = asyncio.create_task(scheduler.run())
+        scheduler.submit("e1")
+        await asyncio.sleep(0.01)
+        await scheduler.wait_idle()
+        task.cancel()
+        return seen, scheduler.stats()
+
+    seen, stats = asyncio.run(scenario())
+    assert seen == ["e1", "e1", "e1"]
+    assert (stats["syncs_failed"], stats["syncs_retried"], stats["syncs_executed"]) == (2, 2, 1)
@@ -0,0 +1,192 @@
+import asyncio
+
+import pytest
+
+from graph_access import GraphAccess, GraphBusy, is_pageable, is_read_only
+
+
+class FakeRecord(dict):
+    def data(self):
+        return dict(self)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = iter(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def consume(self):
+        for _ in self._rows:
+            pass
+
+    async def __anext__(self):
+        try:
+            return FakeRecord(next(self._rows))
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeTx:
+    """Serves ``driver.rows``, honouring pushed-down SKIP/LIMIT parameters."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def run(self, text, params=None, **_):
+        self.driver.queries.append(text)
+        rows = self.driver.rows
+        params = params or {}
+        if "__skip" in params:
+            rows = rows[params["__skip"]:params["__skip"] + params["__limit"]]
+        return FakeResult(rows)
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+        self.closed = False
+
+    async def run(self, query, params=None):
+        self.driver.calls.append(("stream", query.timeout))
+        return await FakeTx(self.driver).run(query.text, params)
+
+    async def close(self):
+        self.closed = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def _run(self, mode, work, *args, **kwargs):
+        self.driver.calls.append((mode, work.timeout))
+        self.driver.active += 1
+        self.driver.peak = max(self.driver.peak, self.driver.active)
+        try:
+            return await work(FakeTx(self.driver), *args, **kwargs)
+        finally:
+            self.driver.active -= 1
+
+    async def execute_read(self, work, *args, **kwargs):
+        return await self._run("read", work, *args, **kwargs)
+
+    async def execute_write(self, work, *args, **kwargs):
+        return await self._run("write", work, *args, **kwargs)
+
+
+class FakeDriver:
+    def __init__(self, rows=()):
+        self.calls, self.active, self.peak = [], 0, 0
+        self.rows, self.queries = list(rows), []
+
+    def session(self, **_):
+        return FakeSession(self)
+
+
+async def slow(tx, value):
+    await asyncio.sleep(0.01)
+    return value
+
+
+def test_read_only_detection():
+    assert is_read_only("MATCH (n:Area) RETURN n.name LIMIT 5")
+    assert is_read_only("MATCH (n) WHERE n.name = 'CREATE me' RETURN n")
+    assert not is_read_only("MATCH (a),(b) MERGE (a)-[:R]->(b)")
+    assert not is_read_only("match (n) detach delete n")
+    assert not is_read_only("CALL apoc.periodic.iterate('x', 'y', {})")
+
+
+def test_concurrency_is_bounded_and_timeouts_applied():
+    driver = FakeDriver()
+    graph = GraphAccess(driver, max_concurrent=2, timeout=7)
+
+    async def scenario():
+        results = await asyncio.gather(*(graph.read(slow, i) for i in range(6)))
+        await graph.write(slow, "w", timeout=1)
+        return results
+
+    assert asyncio.run(scenario()) == list(range(6))
+    assert driver.peak == 2
+    assert driver.calls[-1] == ("write", 1)
+    assert {t for _, t in driver.calls[:-1]} == {7}
+    assert graph.metrics()["query_latency"]["count"] == 7
+
+
+def test_full_queue_is_rejected():
+    graph = GraphAccess(FakeDriver(), max_concurrent=1, queue_timeout=0.001)
+
+    async def scenario():
+        hold = asyncio.create_task(graph.read(slow, 1))
+        await asyncio.sleep(0)
+        with pytest.raises(GraphBusy):
+            await graph.read(slow, 2)
+        await hold
+
+    asyncio.run(scenario())
+    assert graph.metrics()["rejected"] == 1
+
+
+def test_pages_follow_the_cursor_and_respect_the_cap():
+    driver = FakeDriver({"n": i} for i in range(25))
+    graph = GraphAccess(driver, max_rows=10)
+    query = "MATCH (n) RETURN n ORDER BY n"
+
+    async def scenario():
+        pages, cursor = [], None
+        while True:
+            rows, cursor = await graph.query_page(query, page_size=50, cursor=cursor)
+            pages.append([r["n"] for r in rows])
+            if cursor is None:
+                return pages
+
+    pages = asyncio.run(scenario())
+    assert pages == [list(range(10)), list(range(10, 20)), list(range(20, 25))]
+    # Every page, the first included, runs the same SKIP/LIMIT statement.
+    assert all(q == query + " SKIP $__skip LIMIT $__limit" for q in driver.queries)
+    with pytest.raises(ValueError):
+        asyncio.run(graph.query_page("MATCH (m) RETURN m", cursor="bm9wZQ"))
+
+
+def test_writes_run_once_and_are_never_paged():
+    driver = FakeDriver({"n": i} for i in range(5))
+    graph = GraphAccess(driver)
+
+    rows, cursor = asyncio.run(graph.query_page("CREATE (n:X) RETURN n", page_size=1))
+    assert rows == [{"n": 0}] and cursor is None
+    assert [mode for mode, _ in driver.calls] == ["write"]
+    with pytest.raises(ValueError, match="read-only"):
+        asyncio.run(graph.query_page("CREATE (n:X) RETURN n", cursor="bm9wZQ"))
+    assert len(driver.calls) == 1
+
+
+def test_only_plain_returns_are_paged():
+    assert is_pageable("MATCH (n) RETURN n.name ORDER BY n.name")
+    assert is_pageable("CALL { MATCH (n) RETURN n } RETURN n.id")
+    assert not is_pageable("MATCH (n) RETURN n LIMIT 10")
+    assert not is_pageable("MATCH (n:A) RETURN n UNION MATCH (n:B) RETURN n")
+    assert not is_pageable("EXPLAIN MATCH (n) RETURN n")
+    assert not is_pageable("CALL db.labels()")
+
+    driver = FakeDriver({"n": i} for i in range(5))
+    graph = GraphAccess(driver)
+    rows, cursor = asyncio.run(graph.query_page("MATCH (n:A) RETURN n UNION MATCH (n:B) RETURN n", page_size=2))
+    assert len(rows) == 2 and cursor is None
+    assert "SKIP" not in driver.queries[0]
+    with pytest.raises(ValueError, match="plain RETURN"):
+        asyncio.run(graph.query_page("MATCH (n) RETURN n LIMIT 10", cursor="bm9wZQ"))
+
+
+def test_stream_yields_up_to_the_cap_and_frees_the_slot():
+    driver = FakeDriver({"n": i} for i in range(100))
+    graph = GraphAccess(driver, max_concurrent=1, max_stream_rows=30)
+
+    async def scenario():
+        records = await graph.stream("MATCH (n) RETURN n")
+        assert graph.metrics()["running"] == 1
+        return [r["n"] async for r in records]
+
+    assert asyncio.run(scenario()) == list(range(30))
+    assert graph.metrics()["running"] == 0
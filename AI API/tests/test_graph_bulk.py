@@ -0,0 +1,30 @@
+import csv
+import json
+from pathlib import Path
+
+from graph_bulk import admin_import_command, write_csv
+from graph_writer import flatten_tree
+
+SAMPLE = json.loads((Path(__file__).parent.parent / "scripts" / "sample_areas.json").read_text())
+
+
+def test_csv_files_hold_every_flattened_row(tmp_path):
+    nodes, edges = flatten_tree(SAMPLE)
+    manifest = write_csv(SAMPLE, tmp_path)
+
+    for label, (name, count) in manifest["nodes"].items():
+        with open(tmp_path / name) as f:
+            assert [r["id"] for r in csv.DictReader(f)] == [r["id"] for r in nodes[label]]
+    for key, (name, count) in manifest["edges"].items():
+        with open(tmp_path / name) as f:
+            assert list(csv.DictReader(f)) == edges[key]
+
+
+def test_admin_mode_uses_id_spaces(tmp_path):
+    manifest = write_csv(SAMPLE, tmp_path, admin=True)
+    with open(tmp_path / manifest["edges"][("Group", "Area", "HAS_AREA")][0]) as f:
+        assert f.readline().strip() == ":START_ID(Group),:END_ID(Area)"
+    argv = admin_import_command(manifest, tmp_path)
+    assert f"--relationships=HAS_AREA={tmp_path / 'rels_Group_HAS_AREA_Area.csv'}" in argv
+    assert "--overwrite-destination" not in argv
+    assert "--overwrite-destination" in admin_import_command(manifest, tmp_path, overwrite=True)
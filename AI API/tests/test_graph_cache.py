@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from graph_cache import QueryCache, params_key
+from graph_queries import BUILTIN_QUERIES, QueryRegistry
+
+
+def test_lru_evicts_least_recently_used_and_expires_entries():
+    cache = QueryCache(max_entries=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == (True, 1)
+    cache.put("c", 3)  # "b" is the least recently used
+    assert cache.get("b") == (False, None)
+    assert len(cache) == 2
+
+    expired = QueryCache(max_entries=2, ttl=0)
+    expired.put("a", 1)
+    assert expired.get("a") == (False, None)
+
+
+def test_concurrent_misses_share_one_load_and_versions_separate_keys():
+    async def scenario():
+        cache = QueryCache()
+        loads = []
+
+        async def load():
+            loads.append(1)
+            await asyncio.sleep(0.01)
+            return ["row"]
+
+        key = ("named", "node", params_key({"id": "x"}))
+        results = await asyncio.gather(*(cache.get_or_load(key + (1,), load) for _ in range(5)))
+        again = await cache.get_or_load(key + (1,), load)
+        bumped = await cache.get_or_load(key + (2,), load)
+        return loads, results, again, bumped
+
+    loads, results, again, bumped = asyncio.run(scenario())
+    assert len(loads) == 2
+    assert [hit for _, hit in results].count(False) == 1
+    assert again == (["row"], True)
+    assert bumped == (["row"], False)
+
+
+def test_named_query_binding():
+    registry = QueryRegistry(BUILTIN_QUERIES)
+    search = registry.get("search")
+    bound = search.bind({"prefix": "gov"})
+    assert bound["prefix"] == "gov" and bound["limit"] == 20
+    with pytest.raises(ValueError, match="missing"):
+        registry.get("node").bind({})
+    with pytest.raises(ValueError, match="unknown"):
+        registry.get("node").bind({"id": "x", "depth": 2})
+    assert params_key({"b": 1, "a": 2}) == params_key({"a": 2, "b": 1})
@@ -0,0 +1,93 @@
+import re
+import copy
+import json
+import asyncio
+from pathlib import Path
+
+from graph_writer import (
+    diff_is_empty,
+    diff_snapshots,
+    read_graph_snapshot,
+    snapshot_from_doc,
+    snapshot_to_doc,
+    snapshot_tree,
+)
+
+SAMPLE = json.loads((Path(__file__).parent.parent / "scripts" / "sample_areas.json").read_text())
+
+
+def test_identical_trees_produce_empty_diff():
+    assert diff_is_empty(diff_snapshots(snapshot_tree(SAMPLE), snapshot_tree(copy.deepcopy(SAMPLE))))
+
+
+def test_rename_only_touches_one_node():
+    tree = copy.deepcopy(SAMPLE)
+    area = tree[0]["children"][0]["children"][0]
+    area["Name"] = area["Name"] + "!"
+
+    diff = diff_snapshots(snapshot_tree(SAMPLE), snapshot_tree(tree))
+
+    assert diff["stats"] == {"added": 0, "removed": 0, "renamed": 1, "reparented": 0}
+    assert diff["upserted_nodes"] == {"Area": [{"id": area["id"], "name": area["Name"]}]}
+    assert not diff["added_edges"] and not diff["removed_edges"]
+
+
+def test_reparent_and_remove_subtree():
+    tree = copy.deepcopy(SAMPLE)
+    groups = tree[0]["children"]
+    moved = groups[0]["children"].pop(0)
+    groups[1]["children"].append(moved)
+    removed_group = groups.pop()
+
+    diff = diff_snapshots(snapshot_tree(SAMPLE), snapshot_tree(tree))
+
+    assert diff["stats"]["reparented"] == 1
+    assert diff["stats"]["removed"] == 1 + len(removed_group.get("children", []))
+    assert removed_group["id"] in diff["removed_nodes"]["Group"]
+
+
+def test_snapshot_doc_round_trip():
+    snapshot = snapshot_tree(SAMPLE)
+    doc = json.loads(json.dumps(snapshot_to_doc(snapshot)))
+    assert snapshot_from_doc(doc) == snapshot
+
+
+class GraphTx:
+    """Answers ``read_graph_snapshot``'s queries from a snapshot."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    async def run(self, query):
+        edge = re.match(r"MATCH \(p:(\w+)\)-\[:(\w+)\]->\(c:(\w+)\)", query)
+        if edge:
+            key = (edge[1], edge[3], edge[2])
+            rows = [{"pid": pid, "cid": cid} for k, pid, cid in self.snapshot["edges"] if k == key]
+        else:
+            label = re.match(r"MATCH \(n:(\w+)\)", query)[1]
+            rows = [{"id": nid, "name": name} for (lbl, nid), name in self.snapshot["nodes"].items() if lbl == label]
+        return _Rows(rows)
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = iter(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._rows)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def test_graph_snapshot_exposes_orphans_left_in_neo4j():
+    held = snapshot_tree(SAMPLE)
+    assert asyncio.run(read_graph_snapshot(GraphTx(held))) == held
+
+    held["nodes"][("Group", "orphan")] = "Left behind"
+    diff = diff_snapshots(asyncio.run(read_graph_snapshot(GraphTx(held))), snapshot_tree(SAMPLE))
+    assert diff["removed_nodes"] == {"Group": ["orphan"]}
+    assert diff["stats"]["removed"] == 1
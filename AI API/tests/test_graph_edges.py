@@ -0,0 +1,55 @@
+import asyncio
+
+from graph_edges import upsert_edges
+
+LABELS = {"c1": "Conjunction", "g1": "Group", "g2": "Group", "a1": "Area", "a2": "Area"}
+
+
+class StubGraph:
+    """Resolves ids from LABELS and records each write chunk."""
+
+    def __init__(self, existing=(), fail_rel=None):
+        self.existing = set(existing)
+        self.fail_rel = fail_rel
+        self.writes = []
+
+    async def read(self, work, ids):
+        return {i: LABELS[i] for i in ids if i in LABELS}
+
+    async def write(self, work, key, rows):
+        self.writes.append((key, [r["i"] for r in rows]))
+        if key[2] == self.fail_rel:
+            raise RuntimeError("boom")
+        return {r["i"]: (r["s"], r["t"]) not in self.existing for r in rows}
+
+
+def test_items_are_grouped_chunked_and_reported_in_order():
+    items = [
+        {"source_id": "g1", "target_id": "a1", "rel_type": "RELATED_TO"},
+        {"source_id": "g1", "target_id": "a2", "rel_type": "RELATED_TO", "properties": {"w": 1}},
+        {"source_id": "g2", "target_id": "a1", "rel_type": "RELATED_TO"},
+        {"source_id": "c1", "target_id": "g1", "rel_type": "SEE_ALSO"},
+        {"source_id": "g1", "target_id": "nope", "rel_type": "RELATED_TO"},
+        {"source_id": "g1", "target_id": "a1", "rel_type": "BAD TYPE) DETACH DELETE (x"},
+        "not an object",
+    ]
+    graph = StubGraph(existing={("g1", "a2")})
+    results = asyncio.run(upsert_edges(graph, items, chunk_size=2))
+
+    assert [r["status"] for r in results] == [
+        "created", "updated", "created", "created", "not_found", "invalid", "invalid",
+    ]
+    assert graph.writes == [
+        (("Group", "Area", "RELATED_TO"), [0, 1]),
+        (("Group", "Area", "RELATED_TO"), [2]),
+        (("Conjunction", "Group", "SEE_ALSO"), [3]),
+    ]
+
+
+def test_failed_chunk_only_fails_its_items():
+    items = [
+        {"source_id": "g1", "target_id": "a1", "rel_type": "BROKEN"},
+        {"source_id": "g1", "target_id": "a2", "rel_type": "FINE"},
+    ]
+    results = asyncio.run(upsert_edges(StubGraph(fail_rel="BROKEN"), items))
+    assert [(r["status"], r.get("error")) for r in results] == [("error", "boom"), ("created", None)]
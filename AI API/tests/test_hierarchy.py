@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+
+from hierarchy import build_relation_hierarchy, normalize_page
+
+SAMPLE = json.loads((Path(__file__).parent.parent / "scripts" / "sample_areas.json").read_text())
+
+
+def page(pid, name, sub_items=(), number=None, level="Area"):
+    return {"id": pid, "Name": name, "level": level, "is_sub_area": "sub" in level.lower(),
+            "number": number, "sub_items": list(sub_items)}
+
+
+def pages_from_tree(roots):
+    out, stack = [], list(roots)
+    while stack:
+        node = stack.pop()
+        children = node.get("children", [])
+        out.append(page(node["id"], node["Name"], [c["id"] for c in children]))
+        stack.extend(children)
+    return out
+
+
+def test_rebuilds_sample_tree():
+    def by_name(nodes):
+        return sorted(
+            ({**n, "children": by_name(n["children"])} if "children" in n else n for n in nodes),
+            key=lambda n: n["Name"],
+        )
+
+    assert by_name(build_relation_hierarchy(pages_from_tree(SAMPLE))) == by_name(SAMPLE)
+
+
+def test_orders_by_number_then_name_and_drops_sub_areas():
+    pages = [
+        page("r", "Root", ["b", "a", "c", "s"]),
+        page("a", "A", number=2),
+        page("b", "B", number=1),
+        page("c", "C"),
+        page("s", "Sub", level="Sub-Area"),
+    ]
+    (root,) = build_relation_hierarchy(pages)
+    assert [c["id"] for c in root["children"]] == ["b", "a", "c"]
+
+
+def test_multi_parent_policies():
+    pages = [page("p1", "P1", ["x"], number=1), page("p2", "P2", ["x"], number=2), page("x", "X")]
+
+    report = {}
+    first = build_relation_hierarchy(pages, multi_parent="first", report=report)
+    assert [len(r.get("children", [])) for r in first] == [1, 0]
+    assert report["multi_parent"] == [{"id": "x", "parents": ["p1", "p2"], "kept": "p1"}]
+
+    both = build_relation_hierarchy(pages, multi_parent="all")
+    assert [r["children"][0]["id"] for r in both] == ["x", "x"]
+    assert both[0]["children"][0] is not both[1]["children"][0]
+
+
+def test_cycles_are_broken_and_reported():
+    pages = [
+        page("r", "Root", ["a"]),
+        page("a", "A", ["b"]),
+        page("b", "B", ["a"]),          # a <-> b below a root
+        page("x", "X", ["y"], number=1),
+        page("y", "Y", ["x"], number=2),  # x <-> y with nothing above it
+    ]
+    report = {}
+    roots = build_relation_hierarchy(pages, report=report)
+
+    assert [r["id"] for r in roots] == ["r", "x"]
+    assert roots[0]["children"][0]["children"][0] == {"Name": "B", "id": "b"}
+    assert roots[1]["children"] == [{"Name": "Y", "id": "y"}]
+    assert sorted(map(sorted, report["cycles"])) == [["a", "b"], ["x", "y"]]
+
+
+def test_deep_chain_does_not_hit_recursion_limit():
+    depth = 50_000
+    pages = [page(str(i), f"n{i}", [str(i + 1)] if i + 1 < depth else []) for i in range(depth)]
+    node = build_relation_hierarchy(pages)[0]
+    for _ in range(depth - 1):
+        node = node["children"][0]
+    assert node["id"] == str(depth - 1)
+
+
+def test_normalize_page_round_trip():
+    raw = {
+        "id": "p",
+        "properties": {
+            "Name": {"type": "title", "title": [{"plain_text": "Page"}]},
+            "Level": {"type": "select", "select": {"name": "Group"}},
+            "#": {"type": "number", "number": 3},
+            "Symbol": {"type": "select", "select": None},
+            "Sub-item": {"type": "relation", "relation": [{"id": "c"}]},
+        },
+    }
+    assert normalize_page(raw) == {
+        "Name": "Page", "Symbol": None, "id": "p", "level": "Group",
+        "is_sub_area": False, "number": 3, "sub_items": ["c"],
+    }
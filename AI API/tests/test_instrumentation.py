@@ -0,0 +1,54 @@
+import asyncio
+import json
+
+from instrumentation import Registry, get_logger, timed
+
+
+def test_render_counters_gauges_and_histograms():
+    registry = Registry()
+    requests = registry.counter("demo_requests_total", "Requests", ["status"])
+    inflight = registry.gauge("demo_inflight", "In flight")
+    latency = registry.histogram("demo_seconds", "Latency", buckets=(0.1, 1.0))
+
+    requests.inc(status="200")
+    requests.inc(2, status="500")
+    inflight.set(3)
+    inflight.dec()
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    text = registry.render()
+    assert "# TYPE demo_requests_total counter" in text
+    assert 'demo_requests_total{status="500"} 2' in text
+    assert "demo_inflight 2" in text
+    assert 'demo_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{le="1"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+    assert "demo_seconds_sum 5.55" in text
+
+
+def test_timed_observes_sync_and_async_calls_even_when_they_raise():
+    latency = Registry().histogram("demo_call_seconds", "Calls", ["fn"])
+
+    @timed(latency, fn="sync")
+    def add(a, b):
+        return a + b
+
+    @timed(latency, fn="async")
+    async def fail():
+        raise RuntimeError
+
+    assert add(1, 2) == 3
+    try:
+        asyncio.run(fail())
+    except RuntimeError:
+        pass
+    assert latency.count(fn="sync") == 1 and latency.count(fn="async") == 1
+
+
+def test_json_logs_carry_extra_fields(capsys):
+    get_logger("test").warning("Something happened", extra={"pages": 3})
+    entry = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert entry["level"] == "WARNING"
+    assert entry["msg"] == "Something happened"
+    assert entry["pages"] == 3
@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import asyncio
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+# api reads these at import time; nothing connects to them here. Importing
+# benchmarks.run_suite sets more defaults, so restore the environment after.
+_environ = dict(os.environ)
+for _name, _value in {"NEO4J_URI": "bolt://localhost:7687", "NEO4J_USER": "neo4j", "NEO4J_PASSWORD": "test"}.items():
+    os.environ.setdefault(_name, _value)
+
+import api  # noqa: E402
+from benchmarks.run_suite import _mongomock_compat  # noqa: E402
+from fake_notion import make_page  # noqa: E402
+from notion_databases import load_databases  # noqa: E402
+
+os.environ.clear()
+os.environ.update(_environ)
+
+
+class NotFound(Exception):
+    status = 404
+
+
+class FakeSource:
+    """Notion as the mirror sees it: ``iter_database`` leaves out removed pages
+    and applies the ``on_or_after`` filter; ``on_batch`` runs between batches."""
+
+    def __init__(self, pages_by_db, batch_size=2, on_batch=None):
+        self.pages_by_db = pages_by_db
+        self.batch_size = batch_size
+        self.on_batch = on_batch
+
+    async def iter_database(self, database_id, filter=None, sorts=None):
+        since = (filter or {}).get("last_edited_time", {}).get("on_or_after")
+        pages = [
+            p for p in self.pages_by_db[database_id]
+            if not (p["archived"] or p["in_trash"]) and (since is None or p["last_edited_time"] >= since)
+        ]
+        for i in range(0, len(pages), self.batch_size):
+            yield [dict(p) for p in pages[i:i + self.batch_size]]
+            if self.on_batch:
+                await self.on_batch(i // self.batch_size)
+
+    async def retrieve_page(self, page_id):
+        for pages in self.pages_by_db.values():
+            for page in pages:
+                if page["id"] == page_id:
+                    return dict(page)
+        raise NotFound(page_id)
+
+
+class CacheSpy:
+    def __init__(self):
+        self.invalidations = 0
+
+    def invalidate(self):
+        self.invalidations += 1
+
+    def schedule_refresh(self):
+        pass
+
+
+@pytest.fixture
+def mirror(monkeypatch):
+    _mongomock_compat()
+    monkeypatch.setenv("NOTION_TOKEN", "secret")
+    databases = load_databases(raw=json.dumps([
+        {"key": "areas", "database_id": "db-areas"},
+        {"key": "projects", "database_id": "db-projects"},
+    ]))
+    monkeypatch.setattr(api, "NOTION_DATABASES", databases)
+    monkeypatch.setattr(api.app, "mongodb", mongomock_motor.AsyncMongoMockClient()["test"], raising=False)
+    monkeypatch.setattr(api.app, "areas_cache", CacheSpy(), raising=False)
+    monkeypatch.setattr(api.app, "mirror_slots", None, raising=False)
+    return databases
+
+
+def _pages(prefix, n, parent):
+    pages = [make_page(f"{prefix}{i}", f"Page {i}", f"2024-01-01T00:0{i}:00.000Z") for i in range(n)]
+    for page in pages:
+        page["parent"] = {"database_id": parent}
+    return pages
+
+
+async def _ids(collection):
+    return sorted([doc["_id"] async for doc in collection.find({}, {"_id": 1})])
+
+
+def test_full_mirror_swaps_in_snapshot_and_reapplies_mid_run_deletes(mirror):
+    areas, _ = mirror
+    pages = _pages("a", 5, "db-areas")
+
+    async def delete_fetched_page(batch):
+        if batch == 0:
+            # a1 is already in staging; another worker applies its delete.
+            pages[1]["archived"] = True
+            await api._sync_pages({"a1": "delete"})
+
+    api.app.notion_source = FakeSource({"db-areas": pages}, on_batch=delete_fetched_page)
+
+    async def scenario():
+        live = api.app.mongodb["areas"]
+        await live.insert_one({"_id": "vanished"})
+        await api._full_mirror(api.app.notion_source, areas)
+        names = await api.app.mongodb.list_collection_names()
+        state = await api.app.mongodb["sync_state"].find_one({"_id": "notion_mirror"})
+        return await _ids(live), names, state
+
+    ids, names, state = asyncio.run(scenario())
+    assert ids == ["a0", "a2", "a3", "a4"]
+    assert "areas_staging" not in names
+    assert state["snapshot_pages"] == 5 and state["last_full_sync_at"]
+    # The follow-up incremental run starts from when the full run began.
+    assert state["last_edited_time"] > "2024-01-01T00:04:00.000Z"
+
+
+def test_incremental_mirror_applies_edits_and_advances_the_high_water_mark(mirror):
+    areas, _ = mirror
+    pages = _pages("a", 3, "db-areas")
+    pages[2]["last_edited_time"] = "2024-02-01T00:00:00.000Z"
+    pages[2]["properties"]["Name"]["title"][0]["plain_text"] = "Renamed"
+    pages.append(_pages("new", 1, "db-areas")[0] | {"last_edited_time": "2024-02-01T00:00:00.000Z"})
+    api.app.notion_source = FakeSource({"db-areas": pages})
+
+    async def scenario():
+        db = api.app.mongodb
+        await db["areas"].insert_many([{"_id": "a0", "stale": True}, {"_id": "a2", "stale": True}])
+        await db["sync_state"].insert_one({
+            "_id": "notion_mirror", "last_edited_time": "2024-01-01T00:01:00.000Z", "last_full_sync_at": time.time(),
+        })
+        await api._mirror_database(areas)
+        state = await db["sync_state"].find_one({"_id": "notion_mirror"})
+        return {doc["_id"]: doc async for doc in db["areas"].find()}, state
+
+    docs, state = asyncio.run(scenario())
+    # a0 predates the high-water mark; a1 sits on the boundary and is re-read.
+    assert sorted(docs) == ["a0", "a1", "a2", "new0"]
+    assert docs["a0"]["stale"] and "stale" not in docs["a2"]
+    assert docs["a2"]["normalized"]["Name"] == "Renamed"
+    assert state["last_edited_time"] == "2024-02-01T00:00:00.000Z"
+
+
+def test_page_events_go_to_the_owning_database(mirror):
+    pages = _pages("a", 2, "db-areas")
+    project = _pages("p", 1, "db-projects")[0]
+    api.app.notion_source = FakeSource({"db-areas": pages, "db-projects": [project]})
+
+    async def scenario():
+        db = api.app.mongodb
+        await db["areas"].insert_many([{"_id": "a0"}, {"_id": "moved"}, {"_id": "gone"}])
+        moved = _pages("moved", 1, "db-projects")[0] | {"id": "moved"}
+        api.app.notion_source.pages_by_db["db-projects"].append(moved)
+        await api._sync_pages({"a1": "upsert", "p0": "upsert", "moved": "upsert", "gone": "upsert"})
+        tombstones = {doc["_id"] async for doc in db["page_tombstones"].find()}
+        return await _ids(db["areas"]), await _ids(db["projects"]), tombstones
+
+    areas_ids, project_ids, tombstones = asyncio.run(scenario())
+    assert areas_ids == ["a0", "a1"]
+    assert project_ids == ["moved", "p0"]
+    # "gone" 404s and is tombstoned everywhere; "moved" where it left, not where it landed.
+    assert {"areas:gone", "projects:gone", "areas:moved"} <= tombstones
+    assert "projects:moved" not in tombstones
+    assert api.app.areas_cache.invalidations == 1
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from mirror_scheduler import MirrorScheduler  # noqa: E402
+
+
+def _state():
+    return mongomock_motor.AsyncMongoMockClient()["test"]["sync_state"]
+
+
+def test_burst_runs_once_plus_one_follow_up():
+    async def scenario():
+        runs = []
+        release = asyncio.Event()
+
+        async def run(full):
+            runs.append(full)
+            await release.wait()
+
+        scheduler = MirrorScheduler(run, _state(), owner="a")
+        for i in range(10):
+            scheduler.request(full=(i == 3))
+            await asyncio.sleep(0)
+        release.set()
+        await scheduler.wait_idle()
+        return runs
+
+    # The first run started with no full request; the follow-up carries it.
+    assert asyncio.run(scenario()) == [False, True]
+
+
+def test_second_worker_defers_to_the_lease_holder():
+    async def scenario():
+        state = _state()
+        calls = {"a": 0, "b": 0}
+        release = asyncio.Event()
+
+        def runner(name):
+            async def run(full):
+                calls[name] += 1
+                await release.wait()
+            return run
+
+        a = MirrorScheduler(runner("a"), state, owner="a")
+        b = MirrorScheduler(runner("b"), state, owner="b")
+        a.request()
+        await asyncio.sleep(0.01)
+        b.request()
+        await b.wait_idle()
+        assert (await state.find_one({"_id": "notion_mirror_lease"}))["dirty"] is True
+
+        release.set()
+        await a.wait_idle()
+        lease = await state.find_one({"_id": "notion_mirror_lease"})
+        return calls, lease
+
+    calls, lease = asyncio.run(scenario())
+    # b never ran; a ran once more on b's behalf and then released the lease.
+    assert calls == {"a": 2, "b": 0}
+    assert lease["owner"] is None and lease["dirty"] is False
+
+
+def test_expired_lease_can_be_taken_over():
+    async def scenario():
+        state = _state()
+        await state.insert_one({"_id": "notion_mirror_lease", "owner": "dead", "expires_at": 0, "dirty": False})
+        ran = []
+
+        async def run(full):
+            ran.append(full)
+
+        scheduler = MirrorScheduler(run, state, owner="alive")
+        scheduler.request()
+        await scheduler.wait_idle()
+        return ran
+
+    assert asyncio.run(scenario()) == [False]
+
+
+def test_full_request_deferred_to_the_holder_stays_full():
+    async def scenario():
+        state = _state()
+        runs = []
+        release = asyncio.Event()
+
+        async def run(full):
+            runs.append(full)
+            await release.wait()
+
+        a = MirrorScheduler(run, state, owner="a")
+        b = MirrorScheduler(run, state, owner="b")
+        a.request()
+        await asyncio.sleep(0.01)
+        b.request(full=True)
+        await b.wait_idle()
+        release.set()
+        await a.wait_idle()
+        return runs, await state.find_one({"_id": "notion_mirror_lease"})
+
+    runs, lease = asyncio.run(scenario())
+    assert runs == [False, True]
+    assert lease["full"] is False
+
+
+def test_close_does_not_start_the_follow_up_run():
+    async def scenario():
+        runs = []
+
+        async def run(full):
+            runs.append(full)
+            await asyncio.Event().wait()
+
+        scheduler = MirrorScheduler(run, _state(), owner="a")
+        scheduler.request()
+        await asyncio.sleep(0.01)
+        scheduler.request()  # marks the run dirty
+        await scheduler.close()
+        await asyncio.sleep(0.01)
+        return runs, scheduler.running
+
+    assert asyncio.run(scenario()) == ([False], False)
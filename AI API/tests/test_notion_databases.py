@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from notion_databases import by_notion_id, graph_labels, load_databases
+
+
+def test_single_database_fallback_keeps_original_names():
+    (db,) = load_databases(raw="", default_id="abc-123")
+    assert db.primary and db.collection == "areas" and db.staging_collection == "areas_staging"
+    assert db.labels == ["Conjunction", "Group", "Area"]
+    assert db.state_id("notion_mirror") == "notion_mirror"
+    assert load_databases(raw="", default_id="") == []
+
+
+def test_several_databases_get_their_own_collection_labels_and_state():
+    raw = json.dumps([
+        {"key": "areas", "database_id": "aaa-111"},
+        {"key": "projects", "database_id": "bbb-222", "collection": "project_pages"},
+    ])
+    areas, projects = load_databases(raw=raw)
+    assert areas.primary and not projects.primary
+    assert projects.collection == "project_pages"
+    assert projects.labels == ["ProjectsConjunction", "ProjectsGroup", "ProjectsArea"]
+    assert projects.state_id("notion_mirror") == "notion_mirror:projects"
+    assert by_notion_id([areas, projects])["bbb222"] is projects
+    assert projects.owns("bbb222") and not projects.owns("aaa-111")
+
+
+def test_rejects_clashing_databases():
+    twice = json.dumps([{"key": "a", "database_id": "1"}, {"key": "b", "database_id": "2", "collection": "a"}])
+    with pytest.raises(ValueError, match="collection"):
+        load_databases(raw=twice)
+    with pytest.raises(ValueError, match="label_prefix"):
+        load_databases(raw=json.dumps([{"key": "a", "database_id": "1"}, {"key": "b", "database_id": "2", "label_prefix": ""}]))
+    with pytest.raises(ValueError, match="identifier"):
+        load_databases(raw=json.dumps([{"key": "a", "database_id": "1", "label_prefix": "x) DETACH"}]))
+
+
+def test_graph_labels_cover_every_database():
+    raw = json.dumps([{"key": "areas", "database_id": "a"}, {"key": "projects", "database_id": "b"}])
+    labels = graph_labels(load_databases(raw=raw))
+    assert labels[:3] == ["Conjunction", "Group", "Area"]
+    assert labels[3:] == ["ProjectsConjunction", "ProjectsGroup", "ProjectsArea"]
+    assert graph_labels([]) == ["Conjunction", "Group", "Area"]
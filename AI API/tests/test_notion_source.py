@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("notion_client")
+httpx = pytest.importorskip("httpx")
+
+from fake_notion import create_app, make_page  # noqa: E402
+from notion_source import NotionSource, TokenBucket  # noqa: E402
+
+PAGES = [make_page(f"page-{i}", f"Page {i}", f"2024-01-01T00:{i % 60:02d}:00.000Z") for i in range(250)]
+
+
+def _source(app) -> NotionSource:
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    return NotionSource("secret", limiter=TokenBucket(rate=1000), base_url="http://fake-notion", http_client=http)
+
+
+def test_iter_database_streams_every_batch_through_429s():
+    app = create_app(PAGES, rate_limit_every=2)
+
+    async def scenario():
+        source = _source(app)
+        try:
+            return [batch async for batch in source.iter_database("db")], source.retries
+        finally:
+            await source.aclose()
+
+    batches, retries = asyncio.run(scenario())
+    assert [len(b) for b in batches] == [100, 100, 50]
+    assert [p["id"] for b in batches for p in b] == [p["id"] for p in PAGES]
+    assert retries == app.state.rate_limited > 0
+
+
+def test_filter_and_concurrent_page_retrieval():
+    app = create_app(PAGES)
+
+    async def scenario():
+        source = _source(app)
+        try:
+            changed = await source.query_database(
+                "db", filter={"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": "2024-01-01T00:58:00.000Z"}}
+            )
+            fetched = await source.retrieve_pages(["page-3", "page-7"])
+            return changed, fetched
+        finally:
+            await source.aclose()
+
+    changed, fetched = asyncio.run(scenario())
+    assert {p["last_edited_time"][14:16] for p in changed} == {"58", "59"}
+    assert [p["id"] for p in fetched] == ["page-3", "page-7"]
@@ -0,0 +1,41 @@
+import asyncio
+
+from page_sync import PageSyncQueue, classify_event
+
+
+def _event(kind, entity_id="p1", entity_type="page"):
+    return {"type": kind, "entity": {"id": entity_id, "type": entity_type}}
+
+
+def test_classify_event():
+    assert classify_event(_event("page.properties_updated")) == ("upsert", "p1")
+    assert classify_event(_event("page.created")) == ("upsert", "p1")
+    assert classify_event(_event("page.moved")) == ("upsert", "p1")
+    assert classify_event(_event("page.deleted")) == ("delete", "p1")
+    assert classify_event(_event("database.schema_updated", entity_type="database")) == ("full", None)
+    assert classify_event(_event("data_source.schema_updated", entity_type="data_source")) == ("full", None)
+    assert classify_event(_event("database.content_updated", entity_type="database")) == ("ignore", None)
+    assert classify_event(_event("data_source.content_updated", entity_type="data_source")) == ("ignore", None)
+    assert classify_event(_event("comment.created", entity_type="comment")) == ("ignore", None)
+    assert classify_event({"something": "else"}) == ("mirror", None)
+
+
+def test_queue_keeps_the_latest_action_per_page():
+    async def scenario():
+        batches = []
+        release = asyncio.Event()
+
+        async def apply(batch):
+            batches.append(batch)
+            await release.wait()
+
+        queue = PageSyncQueue(apply, batch_size=10)
+        queue.submit("a")
+        await asyncio.sleep(0)  # first batch is in flight
+        for pid, action in [("b", "upsert"), ("c", "upsert"), ("b", "delete"), ("a", "upsert")]:
+            queue.submit(pid, action)
+        release.set()
+        await queue.wait_idle()
+        return batches
+
+    assert asyncio.run(scenario()) == [{"a": "upsert"}, {"c": "upsert", "b": "delete", "a": "upsert"}]
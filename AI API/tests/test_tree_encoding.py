@@ -0,0 +1,18 @@
+import json
+from pathlib import Path
+
+from tree_encoding import dumps, iter_ndjson, tree_from_rows
+
+SAMPLE = json.loads((Path(__file__).parent.parent / "scripts" / "sample_areas.json").read_text())
+
+
+def test_ndjson_round_trips_the_nested_tree():
+    chunks = list(iter_ndjson(SAMPLE, rows_per_chunk=7))
+    assert len(chunks) > 1
+    rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert rows[0]["depth"] == 0 and rows[0]["parent_id"] is None
+    assert tree_from_rows(rows) == SAMPLE
+
+
+def test_dumps_matches_stdlib_json():
+    assert json.loads(dumps(SAMPLE)) == SAMPLE
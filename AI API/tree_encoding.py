@@ -0,0 +1,86 @@
+"""Serialization of the Areas tree.
+
+``dumps`` is the fast JSON encoder used for the cached ``/areas-structured``
+body (orjson when installed, stdlib json otherwise); ``loads`` reads it
+back. ``iter_ndjson`` streams the tree depth-first as newline-delimited flat
+rows, parents before their children, so consumers can process it without
+holding the nested document; ``tree_from_rows`` turns such rows back into
+the nested shape.
+"""
+
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# Columns of the flat format, in output order
+ROW_FIELDS = ("id", "parent_id", "depth", "Name", "Symbol", "Category")
+
+
+def dumps(data: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Compact UTF-8 JSON, matching what Starlette's JSONResponse emits.
+
+    ``default`` converts otherwise unsupported values, as in ``json.dumps``.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=default)
+    return json.dumps(
+        data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"), default=default
+    ).encode("utf-8")
+
+
+def loads(data) -> Any:
+    """Parse JSON from ``bytes`` or a ``memoryview`` (e.g. a mapped file)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data))
+
+
+def iter_rows(roots: List[Dict]) -> Iterator[Dict]:
+    """Depth-first pre-order rows: ``id, parent_id, depth, Name, Symbol, Category``."""
+    stack = [(root, None, 0) for root in reversed(roots)]
+    while stack:
+        node, parent_id, depth = stack.pop()
+        yield {
+            "id": node["id"],
+            "parent_id": parent_id,
+            "depth": depth,
+            "Name": node.get("Name"),
+            "Symbol": node.get("Symbol"),
+            "Category": node.get("Category"),
+        }
+        for child in reversed(node.get("children", [])):
+            stack.append((child, node["id"], depth + 1))
+
+
+def iter_ndjson(roots: List[Dict], rows_per_chunk: int = 1000) -> Iterator[bytes]:
+    """Yield the flat rows as NDJSON, ``rows_per_chunk`` lines per chunk."""
+    chunk: List[bytes] = []
+    for row in iter_rows(roots):
+        chunk.append(dumps(row))
+        if len(chunk) >= rows_per_chunk:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+def tree_from_rows(rows: Iterable[Dict]) -> List[Dict]:
+    """Rebuild the nested tree from pre-order rows (as ``iter_rows`` emits them)."""
+    roots: List[Dict] = []
+    # Stack of the nodes on the current path, indexed by depth
+    path: List[Dict] = []
+    for row in rows:
+        node = {k: row[k] for k in ("Name", "Symbol", "Category") if row.get(k) is not None}
+        node["id"] = row["id"]
+        depth = row["depth"]
+        del path[depth:]
+        if depth == 0:
+            roots.append(node)
+        else:
+            path[-1].setdefault("children", []).append(node)
+        path.append(node)
+    return roots